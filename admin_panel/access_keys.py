@@ -0,0 +1,70 @@
+"""
+Verification of admin access keys.
+
+Keys are stored as SHA-256 hex digests, and the first 16 hex characters of
+the digest are kept in an indexed key_id column. Verifying a submitted key
+is a single indexed lookup on key_id, with inactive and expired keys
+filtered out in SQL, followed by one constant-time compare of the full
+digest. Matching keys are cached per process so repeated admin logins do
+not hit the database at all.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AdminAccessKey
+
+# Upper bound on how long a cached key may be trusted; covers keys that are
+# deactivated from another worker process, which local signals cannot see.
+KEY_CACHE_MAX_AGE = 60  # seconds
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def hash_access_key(plain_text_key):
+    """Return the digest stored in AdminAccessKey.key_value for a plain key."""
+    return hashlib.sha256(plain_text_key.encode()).hexdigest()
+
+
+def verify_access_key(plain_text_key):
+    """Return True if the key matches an active, unexpired AdminAccessKey."""
+    if not plain_text_key:
+        return False
+
+    hashed_key = hash_access_key(plain_text_key)
+    key_id = hashed_key[:16]
+    now = timezone.now()
+
+    cached = _cache.get(key_id)
+    if cached is not None and time.monotonic() - cached['cached_at'] < KEY_CACHE_MAX_AGE:
+        stored_hash, expires_at = cached['key_value'], cached['expires_at']
+    else:
+        # Only hits are cached, so a newly issued key works immediately
+        match = (
+            AdminAccessKey.objects
+            .filter(key_id=key_id, is_active=True)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+            .values('key_value', 'expires_at')
+            .first()
+        )
+        if match is None:
+            return False
+        stored_hash, expires_at = match['key_value'], match['expires_at']
+        with _lock:
+            _cache[key_id] = {**match, 'cached_at': time.monotonic()}
+
+    if expires_at is not None and expires_at <= now:
+        return False
+    return hmac.compare_digest(hashed_key, stored_hash)
+
+
+def invalidate_access_keys():
+    """Drop every cached key so the next verification queries the database."""
+    with _lock:
+        _cache.clear()
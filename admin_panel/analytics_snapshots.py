@@ -0,0 +1,61 @@
+"""
+Precomputed analytics results.
+
+The slow calculations behind the analytics page are stored per period as
+AnalyticsSnapshot rows. The precompute_analytics command refreshes every
+snapshot in SNAPSHOTS for every period in PERIODS and is meant to run
+from cron, e.g. hourly. The page reads the stored row. It computes and
+stores the row itself only when the row is missing, was computed on an
+earlier day, or is older than ANALYTICS_SNAPSHOT_MAX_AGE. Rows live in
+the database and not in the default cache, which is per-process, so one
+run of the command serves every worker.
+"""
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import analytics_utils
+from .models import AnalyticsSnapshot
+
+# Periods offered on the analytics page, in days ('All Time' uses 365)
+PERIODS = (7, 30, 90, 365)
+
+# Days of revenue forecast shown on the analytics page
+FORECAST_DAYS = 14
+
+# name: function(days) returning JSON-serializable data
+SNAPSHOTS = {
+    'revenue_forecast': partial(analytics_utils.get_revenue_forecast, prediction_days=FORECAST_DAYS),
+    'learner_engagement': analytics_utils.get_learner_engagement_stats,
+}
+
+
+def is_fresh(snapshot, now):
+    """Whether a stored snapshot can still be shown."""
+    oldest = max(
+        now - timedelta(seconds=settings.ANALYTICS_SNAPSHOT_MAX_AGE),
+        now.replace(hour=0, minute=0, second=0, microsecond=0),
+    )
+    return snapshot.computed_at >= oldest
+
+
+def refresh_snapshot(name, days):
+    """Compute and store one snapshot; returns its data."""
+    computed_at = timezone.now()
+    data = SNAPSHOTS[name](days)
+    AnalyticsSnapshot.objects.update_or_create(
+        name=name, days=days, defaults={'data': data, 'computed_at': computed_at}
+    )
+    return data
+
+
+def get_snapshot(name, days):
+    """Return the data of one snapshot, computing it if the stored one is out of date."""
+    snapshot = AnalyticsSnapshot.objects.filter(name=name, days=days).first()
+    if snapshot is not None and is_fresh(snapshot, timezone.now()):
+        return snapshot.data
+    return refresh_snapshot(name, days)
+
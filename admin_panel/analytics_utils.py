@@ -1,124 +1,96 @@
 """
 Advanced analytics utilities for the admin panel.
-These functions use numpy and pandas for more sophisticated
-data analysis and predictions.
+
+Everything here works on data the database has already bucketed (daily
+sums, grouped counts) or streams it once. The revenue forecast and the
+engagement stats use NumPy (see admin_panel.forecasting and
+admin_panel.engagement), which is imported only when they are computed;
+the rest uses the standard library. The analytics page reads the slow
+results from stored snapshots (see admin_panel.analytics_snapshots)
+instead of computing them per request.
 """
 
-import numpy as np
-import pandas as pd
+import statistics
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db.models import Sum, Avg, Count, F, Q
 
-from users.models import User, MentorProfile, LearnerProfile
+from users.models import MentorProfile, LearnerProfile
 from learning_sessions.models import Session, Booking, Feedback
 from payments.models import Transaction, WithdrawalRequest
 
+# The forecast is fitted on at least this many days, enough for the
+# weekly seasonal pattern even when a shorter period is shown
+MIN_FORECAST_HISTORY_DAYS = 28
+
+
+def percentile(values, percent):
+    """Percentile of a list of numbers with linear interpolation, like numpy.percentile."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
 
 def get_revenue_forecast(days=30, prediction_days=30):
     """
-    Generate revenue forecast using time series analysis.
+    Generate revenue forecast using exponential smoothing.
     
     Args:
         days: Number of past days to use for prediction
+            (at least MIN_FORECAST_HISTORY_DAYS)
         prediction_days: Number of days to forecast
     
     Returns:
-        Dictionary with forecast dates and values
+        Dictionary with forecast dates and values, the 95% prediction
+        interval and the model used
     """
+    from .forecasting import forecast
+    
     end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days)
+    start_date = end_date - timedelta(days=max(days, MIN_FORECAST_HISTORY_DAYS))
     
-    # Fetch daily revenue data
-    transactions = Transaction.objects.filter(
+    # Daily revenue, summed by the database
+    daily_revenue = dict(Transaction.objects.filter(
         status='completed',
         created_at__date__gte=start_date,
         created_at__date__lte=end_date
     ).values('created_at__date').annotate(
         daily_revenue=Sum('amount')
-    ).order_by('created_at__date')
+    ).order_by('created_at__date').values_list('created_at__date', 'daily_revenue'))
     
-    # Convert to pandas DataFrame
-    df = pd.DataFrame(list(transactions))
+    # Generate dates for the forecast period
+    forecast_dates = [(end_date + timedelta(days=i+1)).strftime('%Y-%m-%d') 
+                     for i in range(prediction_days)]
     
     # If no data, return empty forecast
-    if df.empty:
-        # Generate empty forecast
-        forecast_dates = [(end_date + timedelta(days=i+1)).strftime('%Y-%m-%d') 
-                        for i in range(prediction_days)]
+    if not daily_revenue:
         return {
             'dates': forecast_dates,
             'values': [0] * prediction_days,
             'lower_bound': [0] * prediction_days,
-            'upper_bound': [0] * prediction_days
+            'upper_bound': [0] * prediction_days,
+            'method': None,
         }
     
-    # Ensure we have data for every day by filling in missing dates with zeros
-    date_range = pd.date_range(start=start_date, end=end_date)
-    
-    # Create complete DataFrame with all dates
-    complete_df = pd.DataFrame({'created_at__date': date_range})
-    
-    # Merge with actual data, filling missing values with 0
-    if 'created_at__date' in df.columns and 'daily_revenue' in df.columns:
-        df_merged = pd.merge(
-            complete_df, 
-            df, 
-            on='created_at__date', 
-            how='left'
-        ).fillna(0)
-    else:
-        # Handle case where columns don't exist
-        df_merged = complete_df
-        df_merged['daily_revenue'] = 0
+    # One value for every complete day from the first day with revenue,
+    # zero for days without any; today is forecast, not fitted
+    first_date = min(daily_revenue)
+    values = [
+        float(daily_revenue.get(first_date + timedelta(days=i), 0))
+        for i in range(max((end_date - first_date).days, 1))
+    ]
     
-    # Get revenue values for calculation
-    values = df_merged['daily_revenue'].values
-    
-    # Simple forecasting approach: moving average with trend extrapolation
-    window_size = min(7, len(values))  # Use 7-day window or less if not enough data
-    
-    # Calculate moving average
-    if len(values) >= window_size:
-        moving_avg = np.convolve(values, np.ones(window_size)/window_size, mode='valid')
-        
-        # Calculate average trend over the last window_size days
-        if len(moving_avg) >= 2:
-            trend = (moving_avg[-1] - moving_avg[0]) / (len(moving_avg) - 1)
-        else:
-            trend = 0
-    else:
-        # Not enough data for a moving average
-        moving_avg = [np.mean(values)] if len(values) > 0 else [0]
-        trend = 0
-    
-    # Last value in the moving average
-    last_avg = moving_avg[-1] if len(moving_avg) > 0 else (np.mean(values) if len(values) > 0 else 0)
-    
-    # Generate forecast
-    forecast = [max(0, last_avg + (i * trend)) for i in range(1, prediction_days + 1)]
-    
-    # Add error bounds - increase uncertainty over time
-    uncertainty_factor = 0.1  # 10% initial uncertainty
-    lower_bound = []
-    upper_bound = []
-    
-    for i, value in enumerate(forecast):
-        # Increase uncertainty for further predictions
-        day_uncertainty = uncertainty_factor * (1 + (i / prediction_days))
-        bound = value * day_uncertainty
-        lower_bound.append(max(0, value - bound))
-        upper_bound.append(value + bound)
-    
-    # Generate dates for the forecast period
-    forecast_dates = [(end_date + timedelta(days=i+1)).strftime('%Y-%m-%d') 
-                     for i in range(prediction_days)]
+    result = forecast(values, prediction_days + 1)
     
+    # Skip today; revenue cannot be negative
     return {
         'dates': forecast_dates,
-        'values': forecast,
-        'lower_bound': lower_bound,
-        'upper_bound': upper_bound
+        'values': [round(max(0, value), 2) for value in result['values'][1:]],
+        'lower_bound': [round(max(0, value), 2) for value in result['lower_bound'][1:]],
+        'upper_bound': [round(max(0, value), 2) for value in result['upper_bound'][1:]],
+        'method': result['method'],
     }
 
 
@@ -130,74 +102,12 @@ def get_learner_engagement_stats(days=30):
         days: Number of days to analyze
     
     Returns:
-        Dictionary with engagement metrics
+        Dictionary with engagement metrics and weekly cohort retention,
+        computed in one pass over the bookings (see admin_panel.engagement)
     """
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days)
+    from .engagement import compute_engagement
     
-    # Get total learners
-    total_learners = User.objects.filter(role='learner').count()
-    
-    # Get active learners (booked at least one session in the period)
-    active_learners = User.objects.filter(
-        role='learner',
-        learnerprofile__bookings__created_at__date__gte=start_date
-    ).distinct().count()
-    
-    # Repeat bookers (booked more than one session)
-    repeat_learners = User.objects.filter(
-        role='learner',
-        learnerprofile__bookings__created_at__date__gte=start_date
-    ).annotate(
-        booking_count=Count('learnerprofile__bookings')
-    ).filter(booking_count__gt=1).count()
-    
-    # Feedback submission rate
-    bookings_with_feedback = Booking.objects.filter(
-        created_at__date__gte=start_date,
-        feedback__isnull=False
-    ).count()
-    
-    total_bookings = Booking.objects.filter(
-        created_at__date__gte=start_date
-    ).count()
-    
-    feedback_rate = (bookings_with_feedback / total_bookings * 100) if total_bookings > 0 else 0
-    
-    # Booking completion rate
-    completed_bookings = Booking.objects.filter(
-        created_at__date__gte=start_date,
-        status='completed'
-    ).count()
-    
-    completion_rate = (completed_bookings / total_bookings * 100) if total_bookings > 0 else 0
-    
-    # Average time spent
-    avg_session_minutes = Booking.objects.filter(
-        created_at__date__gte=start_date,
-        status='completed',
-        session__isnull=False
-    ).aggregate(
-        avg_duration=Avg(F('session__end_time') - F('session__start_time'))
-    )['avg_duration']
-    
-    avg_minutes = 0
-    if avg_session_minutes:
-        avg_minutes = avg_session_minutes.total_seconds() / 60
-    
-    # Engagement percentage
-    engagement_rate = (active_learners / total_learners * 100) if total_learners > 0 else 0
-    
-    return {
-        'total_learners': total_learners,
-        'active_learners': active_learners,
-        'engagement_rate': engagement_rate,
-        'repeat_learners': repeat_learners,
-        'repeat_booking_rate': (repeat_learners / active_learners * 100) if active_learners > 0 else 0,
-        'feedback_rate': feedback_rate,
-        'completion_rate': completion_rate,
-        'avg_session_minutes': avg_minutes
-    }
+    return compute_engagement(days)
 
 
 def get_session_quality_metrics(days=30):
@@ -277,12 +187,12 @@ def get_session_quality_metrics(days=30):
     duration_stats = {}
     if durations_minutes:
         duration_stats = {
-            'min': np.min(durations_minutes),
-            'max': np.max(durations_minutes),
-            'mean': np.mean(durations_minutes),
-            'median': np.median(durations_minutes),
-            'p25': np.percentile(durations_minutes, 25),
-            'p75': np.percentile(durations_minutes, 75)
+            'min': min(durations_minutes),
+            'max': max(durations_minutes),
+            'mean': statistics.fmean(durations_minutes),
+            'median': statistics.median(durations_minutes),
+            'p25': percentile(durations_minutes, 25),
+            'p75': percentile(durations_minutes, 75)
         }
     else:
         duration_stats = {
@@ -311,10 +221,35 @@ def get_mentor_performance_metrics(days=30):
     end_date = timezone.now().date()
     start_date = end_date - timedelta(days=days)
     
-    # Get active mentors in the period
-    active_mentors = MentorProfile.objects.filter(
-        sessions__start_time__date__gte=start_date
-    ).distinct()
+    # Each metric is one grouped query over all mentors rather than a few
+    # queries per active mentor. Active mentors are those with sessions in
+    # the period.
+    period_sessions = Session.objects.filter(start_time__date__gte=start_date)
+    active_ids = period_sessions.values('mentor_id')
+    sessions_counts = dict(
+        period_sessions.values('mentor_id').annotate(count=Count('id')).values_list('mentor_id', 'count').order_by()
+    )
+    bookings_counts = dict(
+        Booking.objects.filter(session__mentor_id__in=active_ids, created_at__date__gte=start_date)
+        .values('session__mentor_id').annotate(count=Count('id'))
+        .values_list('session__mentor_id', 'count').order_by()
+    )
+    avg_ratings = dict(
+        Feedback.objects.filter(booking__session__mentor_id__in=active_ids, created_at__date__gte=start_date)
+        .values('booking__session__mentor_id').annotate(avg=Avg('rating'))
+        .values_list('booking__session__mentor_id', 'avg').order_by()
+    )
+    earnings_by_mentor = dict(
+        Transaction.objects.filter(
+            booking__session__mentor_id__in=active_ids,
+            status='completed',
+            created_at__date__gte=start_date,
+        ).values('booking__session__mentor_id').annotate(total=Sum('amount'))
+        .values_list('booking__session__mentor_id', 'total').order_by()
+    )
+    active_mentors = MentorProfile.objects.filter(id__in=active_ids).values_list(
+        'id', 'user__first_name', 'user__last_name'
+    )
     
     # Get total number of mentors
     total_mentors = MentorProfile.objects.count()
@@ -322,48 +257,28 @@ def get_mentor_performance_metrics(days=30):
     # Calculate session counts per mentor
     mentor_sessions = []
     
-    for mentor in active_mentors:
-        sessions_count = Session.objects.filter(
-            mentor=mentor,
-            start_time__date__gte=start_date
-        ).count()
-        
-        bookings_count = Booking.objects.filter(
-            session__mentor=mentor,
-            created_at__date__gte=start_date
-        ).count()
+    for mentor_id, first_name, last_name in active_mentors:
+        sessions_count = sessions_counts[mentor_id]
+        bookings_count = bookings_counts.get(mentor_id, 0)
         
         # Calculate booking rate (bookings / sessions)
         booking_rate = (bookings_count / sessions_count * 100) if sessions_count > 0 else 0
         
-        # Get average rating
-        avg_rating = Feedback.objects.filter(
-            booking__session__mentor=mentor,
-            created_at__date__gte=start_date
-        ).aggregate(avg=Avg('rating'))['avg'] or 0
-        
-        # Calculate earnings
-        earnings = Transaction.objects.filter(
-            booking__session__mentor=mentor,
-            status='completed',
-            created_at__date__gte=start_date
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
         mentor_sessions.append({
-            'mentor_id': mentor.id,
-            'mentor_name': f"{mentor.user.first_name} {mentor.user.last_name}",
+            'mentor_id': mentor_id,
+            'mentor_name': f"{first_name} {last_name}",
             'sessions_count': sessions_count,
             'bookings_count': bookings_count,
             'booking_rate': booking_rate,
-            'avg_rating': avg_rating,
-            'earnings': earnings
+            'avg_rating': avg_ratings.get(mentor_id) or 0,
+            'earnings': earnings_by_mentor.get(mentor_id) or 0
         })
     
     # Sort by earnings (highest first)
     mentor_sessions.sort(key=lambda x: x['earnings'], reverse=True)
     
     # Number of mentors with no activity
-    inactive_mentors = total_mentors - len(active_mentors)
+    inactive_mentors = total_mentors - len(mentor_sessions)
     
     # Calculate average metrics across all mentors
     total_sessions = sum(mentor['sessions_count'] for mentor in mentor_sessions)
@@ -376,13 +291,13 @@ def get_mentor_performance_metrics(days=30):
         avg_booking_rate = 0
     
     # Calculate average metrics
-    avg_sessions_per_mentor = total_sessions / len(active_mentors) if len(active_mentors) > 0 else 0
+    avg_sessions_per_mentor = total_sessions / len(mentor_sessions) if mentor_sessions else 0
     
     return {
         'total_mentors': total_mentors,
-        'active_mentors': len(active_mentors),
+        'active_mentors': len(mentor_sessions),
         'inactive_mentors': inactive_mentors,
-        'mentor_activation_rate': (len(active_mentors) / total_mentors * 100) if total_mentors > 0 else 0,
+        'mentor_activation_rate': (len(mentor_sessions) / total_mentors * 100) if total_mentors > 0 else 0,
         'avg_sessions_per_mentor': avg_sessions_per_mentor,
         'avg_booking_rate': avg_booking_rate,
         'mentor_performance': mentor_sessions[:10]  # Top 10 mentors
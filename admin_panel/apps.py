@@ -10,3 +10,7 @@ class AdminPanelConfig(AppConfig):
     """Configuration for the admin_panel app."""
     name = 'admin_panel'
     verbose_name = _('Admin Panel')
+
+    def ready(self):
+        """Import signal handlers on app ready."""
+        import admin_panel.signals
@@ -0,0 +1,179 @@
+"""
+Buffered writer for admin audit log entries.
+
+AdminAccessLog rows are queued in memory and written in batches with
+bulk_create from a background thread, keeping the INSERT off the request
+path. The queue is bounded; entries that do not fit are dropped and
+counted rather than blocking the request. If a batch insert fails, the
+entries are saved one by one so a single bad row loses only itself; every
+rejected entry is logged with its fields.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import AdminAccessLog
+
+security_logger = logging.getLogger('admin_security')
+
+
+class AuditLogWriter:
+    """
+    Queue AdminAccessLog entries and flush them in batches.
+
+    With ADMIN_AUDIT_LOG_ASYNC disabled, entries are written immediately,
+    which keeps behaviour deterministic for scripts and tests.
+    """
+
+    def __init__(self):
+        self.async_enabled = getattr(settings, 'ADMIN_AUDIT_LOG_ASYNC', True)
+        self.batch_size = getattr(settings, 'ADMIN_AUDIT_LOG_BATCH_SIZE', 200)
+        self.flush_interval = getattr(settings, 'ADMIN_AUDIT_LOG_FLUSH_INTERVAL', 2.0)
+        self._queue = queue.Queue(maxsize=getattr(settings, 'ADMIN_AUDIT_LOG_QUEUE_SIZE', 10000))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        # Registered once; stop() only joins a thread started by this process
+        atexit.register(self.stop)
+
+    def log(self, **fields):
+        """Queue a new AdminAccessLog entry built from model field values."""
+        fields.setdefault('timestamp', timezone.now())
+        self.enqueue(AdminAccessLog(**fields))
+
+    def enqueue(self, entry):
+        """Queue an unsaved AdminAccessLog instance for writing."""
+        if not self.async_enabled:
+            self._write([entry])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # Log the first drop and then every 1000th to avoid log floods
+            if dropped == 1 or dropped % 1000 == 0:
+                security_logger.error(f"Admin audit log queue full, {dropped} entries dropped so far")
+
+    def flush(self):
+        """Write every queued entry now, in batches."""
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    break
+                self._write(batch)
+
+    def stop(self, timeout=5.0):
+        """Stop the background thread and flush anything still queued."""
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._stop_event.set()
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        """Return counters describing the writer's state."""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so restart the worker in each process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='admin-audit-log-writer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            # Keep collecting until the batch is full or the interval elapses
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+
+            close_old_connections()
+            with self._flush_lock:
+                self._write(batch)
+        close_old_connections()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            AdminAccessLog.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception as e:
+            security_logger.error(
+                f"Failed to write {len(batch)} admin audit log entries in bulk, saving them one by one: {str(e)}"
+            )
+            for entry in batch:
+                self._write_one(entry)
+        else:
+            with self._lock:
+                self.written += len(batch)
+
+    def _write_one(self, entry):
+        try:
+            with transaction.atomic():
+                entry.save(force_insert=True)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            security_logger.error(
+                f"Rejected admin audit log entry: {str(e)}; "
+                f"timestamp={entry.timestamp} user_id={entry.user_id} ip_address={entry.ip_address} "
+                f"action={entry.action!r} status={entry.status!r} path={entry.path!r} "
+                f"user_agent={entry.user_agent!r} details={entry.details!r}"
+            )
+        else:
+            with self._lock:
+                self.written += 1
+
+
+# Process-wide writer used by the middleware and admin views
+audit_log = AuditLogWriter()
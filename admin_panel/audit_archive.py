@@ -0,0 +1,209 @@
+"""
+Retention and archival for the admin audit log.
+
+Rows older than the retention window are appended to compressed monthly
+archive files (gzip JSON Lines, one file per calendar month) and then
+deleted from the database in small batches so SQLite is never locked for
+long. Archives are append-only: each batch is written as a new gzip member,
+and a month file can later be compacted into a single member with
+duplicate entries removed. A streaming reader lets archives be searched
+without loading them into memory or touching the database.
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AdminAccessLog
+
+ARCHIVE_FILE_PATTERN = re.compile(r'^admin_access_log-(\d{4})-(\d{2})\.jsonl\.gz$')
+
+ARCHIVE_FIELDS = (
+    'id', 'timestamp', 'user_id', 'user__email', 'ip_address', 'action',
+    'path', 'status', 'user_agent', 'details',
+)
+
+
+def get_archive_dir(archive_dir=None):
+    """Return the archive directory, defaulting to the configured one."""
+    return Path(archive_dir or settings.ADMIN_AUDIT_LOG_ARCHIVE_DIR)
+
+
+def archive_path(archive_dir, year, month):
+    """Return the path of the archive file for a calendar month."""
+    return get_archive_dir(archive_dir) / f"admin_access_log-{year:04d}-{month:02d}.jsonl.gz"
+
+
+def archive_old_logs(retention_days=None, batch_size=1000, archive_dir=None,
+                     pause=0.0, dry_run=False, compact=False):
+    """
+    Move access log rows older than the retention window into the archive.
+
+    Args:
+        retention_days: Rows older than this many days are archived
+        batch_size: Maximum number of rows archived and deleted per batch
+        archive_dir: Directory for the monthly archive files
+        pause: Seconds to sleep between batches to let other writers in
+        dry_run: Count the rows that would be archived without writing
+        compact: Compact every archive file touched during this run
+
+    Returns:
+        Dictionary with the number of rows archived and the files touched
+    """
+    if retention_days is None:
+        retention_days = settings.ADMIN_AUDIT_LOG_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    expired = AdminAccessLog.objects.filter(timestamp__lt=cutoff)
+
+    if dry_run:
+        return {'cutoff': cutoff, 'archived': expired.count(), 'files': []}
+
+    get_archive_dir(archive_dir).mkdir(parents=True, exist_ok=True)
+    archived = 0
+    touched = set()
+
+    while True:
+        # Deleting each batch means the oldest remaining rows are always next
+        rows = list(
+            expired.order_by('timestamp', 'id').values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+
+        touched.update(_append_rows(rows, archive_dir))
+        AdminAccessLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if compact:
+        for path in touched:
+            compact_archive(path)
+
+    return {'cutoff': cutoff, 'archived': archived, 'files': sorted(str(path) for path in touched)}
+
+
+def _append_rows(rows, archive_dir):
+    """Append rows to their monthly archive files as new gzip members."""
+    by_month = {}
+    for row in rows:
+        stamp = row['timestamp']
+        by_month.setdefault((stamp.year, stamp.month), []).append(row)
+
+    paths = []
+    for (year, month), month_rows in by_month.items():
+        path = archive_path(archive_dir, year, month)
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                for row in month_rows:
+                    archive.write(_serialize(row))
+            raw.flush()
+            # Make sure the rows are on disk before they are deleted
+            os.fsync(raw.fileno())
+        paths.append(path)
+    return paths
+
+
+def _serialize(row):
+    record = dict(row)
+    record['user_email'] = record.pop('user__email')
+    record['timestamp'] = record['timestamp'].isoformat()
+    return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def list_archives(archive_dir=None, since=None, until=None):
+    """Return archive file paths in chronological order, limited to a date range."""
+    directory = get_archive_dir(archive_dir)
+    if not directory.is_dir():
+        return []
+
+    archives = []
+    for path in directory.iterdir():
+        match = ARCHIVE_FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        month = (int(match.group(1)), int(match.group(2)))
+        # Skip whole files outside the requested range
+        if since and month < (since.year, since.month):
+            continue
+        if until and month > (until.year, until.month):
+            continue
+        archives.append((month, path))
+    return [path for _, path in sorted(archives)]
+
+
+def iter_archive(path):
+    """Stream the records of one archive file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_archived_logs(archive_dir=None, since=None, until=None):
+    """Stream archived records across all monthly files in a date range."""
+    for path in list_archives(archive_dir, since, until):
+        for record in iter_archive(path):
+            if since or until:
+                stamp = parse_datetime(record['timestamp'])
+                if since and stamp < since:
+                    continue
+                if until and stamp >= until:
+                    continue
+            yield record
+
+
+def search_archived_logs(archive_dir=None, since=None, until=None, ip=None,
+                         user=None, status=None, action=None, contains=None):
+    """
+    Stream archived records matching every given filter.
+
+    user matches either the user id or the email address; contains is a
+    case-insensitive substring match on the path and details.
+    """
+    contains = contains.lower() if contains else None
+    for record in iter_archived_logs(archive_dir, since, until):
+        if ip and record['ip_address'] != ip:
+            continue
+        if user and user not in (str(record['user_id']), record['user_email']):
+            continue
+        if status and record['status'] != status:
+            continue
+        if action and record['action'] != action:
+            continue
+        if contains and contains not in f"{record['path']} {record['details']}".lower():
+            continue
+        yield record
+
+
+def compact_archive(path):
+    """
+    Rewrite an archive file as a single gzip member without duplicate rows.
+
+    Duplicates can appear if a run is interrupted after writing a batch but
+    before deleting it. The file is replaced atomically.
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + '.tmp')
+    seen = set()
+    kept = 0
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as compacted:
+        for record in iter_archive(path):
+            if record['id'] in seen:
+                continue
+            seen.add(record['id'])
+            compacted.write(json.dumps(record, separators=(',', ':')) + '\n')
+            kept += 1
+    os.replace(temp_path, path)
+    return kept
@@ -0,0 +1,130 @@
+"""
+Learner engagement and weekly cohort retention.
+
+compute_engagement() reads bookings once: a single query streams them
+ordered by learner, with the learner's signup time, the session's times
+and whether feedback was left. The stream is grouped by learner as it
+arrives, so memory grows with the number of weeks and not with the
+number of bookings. One more grouped query counts learners by signup
+week.
+
+Period rates (active, repeat, feedback, completion) cover bookings made
+in the last `days` days. Retention covers the last MAX_COHORT_WEEKS weeks
+at most: learners are grouped by the week they signed up, and cell
+(c, k) is the share of cohort c who booked in its k-th week after
+signup. Weeks start on Monday. Cells for weeks that have not started,
+and all cells of cohorts without learners, are None.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db.models import Count
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from learning_sessions.models import Booking
+from users.models import User
+
+MAX_COHORT_WEEKS = 12
+
+STREAM_CHUNK_SIZE = 2000
+
+
+def percentage(part, whole):
+    """part as a percentage of whole, or 0 when whole is 0."""
+    return part / whole * 100 if whole else 0
+
+
+def compute_engagement(days, now=None):
+    """
+    Engagement rates for the last `days` days and weekly cohort retention.
+
+    Returns a JSON-serializable dict with the keys of the analytics page's
+    engagement_stats, plus cohort_offsets and cohort_retention rows of
+    (week, learners, retention percentages).
+    """
+    today = (now or timezone.now()).date()
+    start_date = today - timedelta(days=days)
+    cohort_weeks = min(days // 7 + 1, MAX_COHORT_WEEKS)
+    # Monday of the oldest cohort week
+    origin = today - timedelta(days=today.weekday() + 7 * (cohort_weeks - 1))
+
+    total_learners = 0
+    cohort_sizes = np.zeros(cohort_weeks, dtype=np.int64)
+    signups = User.objects.filter(role='learner').annotate(
+        week=TruncWeek('date_joined')
+    ).values('week').annotate(learners=Count('id')).values_list('week', 'learners').order_by()
+    for week, learners in signups:
+        total_learners += learners
+        cohort = (week.date() - origin).days // 7
+        if cohort >= 0:
+            cohort_sizes[cohort] += learners
+
+    stream = Booking.objects.filter(
+        learner__role='learner',
+        created_at__date__gte=min(start_date, origin),
+    ).order_by('learner_id', 'created_at').values_list(
+        'learner_id', 'learner__date_joined', 'created_at', 'status', 'feedback__id',
+        'session__start_time', 'session__end_time',
+    ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+    total_bookings = with_feedback = completed = 0
+    completed_minutes = 0.0
+    active_learners = repeat_learners = 0
+    # Flat (cohort, weeks since signup) index of every week a learner booked in
+    cells = []
+    for _learner_id, bookings in groupby(stream, key=itemgetter(0)):
+        in_period = 0
+        booked_weeks = set()
+        for _learner_id, date_joined, created_at, status, feedback_id, start_time, end_time in bookings:
+            booked_on = created_at.date()
+            booked_weeks.add((booked_on - origin).days // 7)
+            if booked_on >= start_date:
+                in_period += 1
+                with_feedback += feedback_id is not None
+                if status == 'completed':
+                    completed += 1
+                    completed_minutes += (end_time - start_time).total_seconds() / 60
+
+        total_bookings += in_period
+        active_learners += in_period > 0
+        repeat_learners += in_period > 1
+        cohort = (date_joined.date() - origin).days // 7
+        if cohort >= 0:
+            cells.extend(cohort * cohort_weeks + week - cohort for week in booked_weeks if week >= cohort)
+
+    retained = np.bincount(np.array(cells, dtype=np.int64), minlength=cohort_weeks ** 2)
+    retained = retained.reshape(cohort_weeks, cohort_weeks)
+    retention = np.divide(
+        retained * 100.0, cohort_sizes[:, None],
+        out=np.zeros(retained.shape), where=cohort_sizes[:, None] > 0,
+    )
+    # Cohort c has been observed for cohort_weeks - c weeks
+    observed = np.add.outer(np.arange(cohort_weeks), np.arange(cohort_weeks)) < cohort_weeks
+    observed &= cohort_sizes[:, None] > 0
+
+    return {
+        'total_learners': total_learners,
+        'active_learners': active_learners,
+        'engagement_rate': percentage(active_learners, total_learners),
+        'repeat_learners': repeat_learners,
+        'repeat_booking_rate': percentage(repeat_learners, active_learners),
+        'feedback_rate': percentage(with_feedback, total_bookings),
+        'completion_rate': percentage(completed, total_bookings),
+        'avg_session_minutes': completed_minutes / completed if completed else 0,
+        'cohort_offsets': list(range(cohort_weeks)),
+        'cohort_retention': [
+            {
+                'week': (origin + timedelta(weeks=cohort)).isoformat(),
+                'learners': int(cohort_sizes[cohort]),
+                'retention': [
+                    round(float(value), 1) if is_observed else None
+                    for value, is_observed in zip(retention[cohort], observed[cohort])
+                ],
+            }
+            for cohort in range(cohort_weeks)
+        ],
+    }
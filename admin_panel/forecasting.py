@@ -0,0 +1,109 @@
+"""
+Exponential smoothing forecasts of daily series.
+
+forecast() fits the additive Holt-Winters model (triple exponential
+smoothing of level, trend and a weekly seasonal pattern) when the series
+covers at least two seasons, and Holt's linear model (double smoothing of
+level and trend) when it is shorter. The smoothing parameters are chosen
+by grid search on the sum of squared one-step-ahead errors. Every
+combination in the grid is smoothed at once as one NumPy array, so the
+Python loop runs once per time step and not once per combination.
+
+Prediction intervals come from the one-step-ahead residuals of the chosen
+fit. Their standard deviation is widened for each step ahead by the
+h-step variance of the additive model:
+
+    var(h) = sigma^2 * (1 + sum over j < h of c_j^2)
+    c_j = alpha * (1 + j * beta) + gamma * (1 - alpha) * [j is a multiple of the season length]
+"""
+
+import numpy as np
+
+# Days in the seasonal pattern
+SEASON_LENGTH = 7
+
+# Smoothing parameters tried for level, trend and season
+ALPHAS = np.arange(0.05, 1.0, 0.05)
+BETAS = np.array([0.0, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3])
+GAMMAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3, 0.5])
+
+# Two-sided 95% prediction intervals
+INTERVAL_Z = 1.96
+
+
+def initial_state(values, season_length):
+    """Level, trend and seasonal offsets to start smoothing from."""
+    if season_length:
+        first = values[:season_length].mean()
+        second = values[season_length:2 * season_length].mean()
+        return first, (second - first) / season_length, values[:season_length] - first
+    trend = values[1] - values[0] if len(values) > 1 else 0.0
+    # One step before the first value, so its one-step forecast is exact
+    return values[0] - trend, trend, np.zeros(1)
+
+
+def smooth(values, alphas, betas, gammas, season_length):
+    """
+    Run the smoothing recursions for every parameter combination at once.
+
+    alphas, betas and gammas are arrays of one value per combination.
+    Returns the final level, trend and seasonal offsets of each combination
+    and the one-step-ahead errors, shaped (time steps, combinations).
+    """
+    level0, trend0, season0 = initial_state(values, season_length)
+    level = np.full(len(alphas), level0)
+    trend = np.full(len(alphas), trend0)
+    season = np.tile(season0, (len(alphas), 1))
+    period = season.shape[1]
+    errors = np.empty((len(values), len(alphas)))
+
+    for t, value in enumerate(values):
+        offset = season[:, t % period]
+        errors[t] = value - (level + trend + offset)
+        new_level = alphas * (value - offset) + (1 - alphas) * (level + trend)
+        trend = betas * (new_level - level) + (1 - betas) * trend
+        season[:, t % period] = gammas * (value - new_level) + (1 - gammas) * offset
+        level = new_level
+    return level, trend, season, errors
+
+
+def forecast(values, horizon, season_length=SEASON_LENGTH, z=INTERVAL_Z):
+    """
+    Forecast the next horizon values of a series of at least one value.
+
+    Returns a dict of plain floats: the forecast values with lower_bound and
+    upper_bound of the prediction interval, the model used ('triple' or
+    'double'), its smoothing parameters and the residual standard deviation.
+    """
+    values = np.asarray(values, dtype=float)
+    seasonal = len(values) >= 2 * season_length
+    season_length = season_length if seasonal else 0
+
+    alphas, betas, gammas = (
+        grid.ravel() for grid in np.meshgrid(ALPHAS, BETAS, GAMMAS if seasonal else [0.0], indexing='ij')
+    )
+    level, trend, season, errors = smooth(values, alphas, betas, gammas, season_length)
+    best = int(np.argmin((errors ** 2).sum(axis=0)))
+    alpha, beta, gamma = alphas[best], betas[best], gammas[best]
+    sigma = float(np.sqrt(np.mean(errors[:, best] ** 2)))
+
+    steps = np.arange(1, horizon + 1)
+    period = season.shape[1]
+    predictions = level[best] + steps * trend[best] + season[best, (len(values) + steps - 1) % period]
+
+    # Variance factor of each step ahead: 1 + sum of c_j^2 for j < h
+    c = alpha * (1 + steps[:-1] * beta)
+    if seasonal:
+        c = c + gamma * (1 - alpha) * (steps[:-1] % season_length == 0)
+    spread = z * sigma * np.sqrt(1 + np.concatenate(([0.0], np.cumsum(c ** 2))))
+
+    return {
+        'values': predictions.tolist(),
+        'lower_bound': (predictions - spread).tolist(),
+        'upper_bound': (predictions + spread).tolist(),
+        'method': 'triple' if seasonal else 'double',
+        'alpha': round(float(alpha), 2),
+        'beta': round(float(beta), 2),
+        'gamma': round(float(gamma), 2),
+        'sigma': sigma,
+    }
@@ -0,0 +1,105 @@
+"""
+Compiled, process-level cache of the admin IP allowlist.
+
+Active AllowedIP rows are parsed once into sorted, merged integer intervals
+per IP version so that each admin request is checked with a binary search
+instead of a database query plus a CIDR parse per row.
+"""
+
+import bisect
+import ipaddress
+import logging
+import threading
+import time
+
+from .models import AllowedIP
+
+security_logger = logging.getLogger('admin_security')
+
+# Upper bound on how long a compiled allowlist may be served before being
+# rebuilt; covers changes made from other worker processes, which the local
+# signal-based invalidation cannot see.
+ALLOWLIST_MAX_AGE = 60  # seconds
+
+
+class CompiledAllowlist:
+    """Immutable allowlist built from AllowedIP entries."""
+
+    def __init__(self, entries):
+        self.is_configured = bool(entries)
+        intervals = {4: [], 6: []}
+
+        for entry in entries:
+            try:
+                # Single IPs compile to a /32 (or /128) network
+                network = ipaddress.ip_network(entry.strip(), strict=False)
+            except ValueError:
+                security_logger.warning(f"Ignoring invalid allowed IP entry: {entry}")
+                continue
+            intervals[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+
+        self._starts = {}
+        self._ends = {}
+        for version, ranges in intervals.items():
+            merged = _merge_intervals(ranges)
+            self._starts[version] = [start for start, _ in merged]
+            self._ends[version] = [end for _, end in merged]
+
+    def __contains__(self, ip):
+        return self.allows(ip)
+
+    def allows(self, ip):
+        """
+        Return True if the IP falls inside any allowed range.
+
+        Raises ValueError if the IP is not a valid address.
+        """
+        ip_obj = ipaddress.ip_address(ip)
+        value = int(ip_obj)
+        starts = self._starts[ip_obj.version]
+        index = bisect.bisect_right(starts, value) - 1
+        return index >= 0 and value <= self._ends[ip_obj.version][index]
+
+
+def _merge_intervals(ranges):
+    """Sort and merge overlapping or adjacent integer intervals."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+_lock = threading.Lock()
+_cached = None
+_cached_at = 0.0
+
+
+def get_allowlist():
+    """Return the compiled allowlist, rebuilding it when stale or invalidated."""
+    global _cached, _cached_at
+
+    allowlist = _cached
+    if allowlist is not None and time.monotonic() - _cached_at < ALLOWLIST_MAX_AGE:
+        return allowlist
+
+    with _lock:
+        if _cached is None or time.monotonic() - _cached_at >= ALLOWLIST_MAX_AGE:
+            entries = list(
+                AllowedIP.objects.filter(is_active=True).values_list('ip_address', flat=True)
+            )
+            _cached = CompiledAllowlist(entries)
+            _cached_at = time.monotonic()
+        return _cached
+
+
+def invalidate_allowlist():
+    """Drop the compiled allowlist so the next lookup rebuilds it."""
+    global _cached
+    with _lock:
+        _cached = None
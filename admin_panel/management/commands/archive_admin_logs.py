@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_panel.audit_archive import archive_old_logs
+
+
+class Command(BaseCommand):
+    help = 'Archive admin access log rows older than the retention window and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Retention window in days (default: ADMIN_AUDIT_LOG_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows archived and deleted per batch')
+        parser.add_argument('--archive-dir', default=None,
+                            help='Archive directory (default: ADMIN_AUDIT_LOG_ARCHIVE_DIR)')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--compact', action='store_true',
+                            help='Compact the archive files touched by this run')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        result = archive_old_logs(
+            retention_days=options['days'],
+            batch_size=options['batch_size'],
+            archive_dir=options['archive_dir'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+            compact=options['compact'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{result['archived']} rows older than {result['cutoff']:%Y-%m-%d %H:%M} would be archived")
+            return
+
+        for path in result['files']:
+            self.stdout.write(f"  {path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived and deleted {result['archived']} rows older than {result['cutoff']:%Y-%m-%d %H:%M}"
+        ))
@@ -0,0 +1,74 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from peerlearn.storage import MinifiedManifestStaticFilesStorage, brotli
+
+
+class Command(BaseCommand):
+    help = 'Collect static files minified, fingerprinted and precompressed, and report the size savings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Delete STATIC_ROOT contents before collecting')
+        parser.add_argument('--extensions', default='js,css,svg',
+                            help='Comma-separated file types to include in the size report')
+
+    def handle(self, *args, **options):
+        if not isinstance(staticfiles_storage, MinifiedManifestStaticFilesStorage):
+            raise CommandError(
+                "STORAGES['staticfiles'] must use peerlearn.storage.MinifiedManifestStaticFilesStorage"
+            )
+
+        call_command('collectstatic', interactive=False, clear=options['clear'], verbosity=0)
+        # collectstatic may have run against a fresh storage instance
+        staticfiles_storage.hashed_files, staticfiles_storage.manifest_hash = staticfiles_storage.load_manifest()
+
+        extensions = tuple(f".{ext.strip().lstrip('.')}" for ext in options['extensions'].split(',') if ext.strip())
+        totals = {'source': 0, 'built': 0, '.gz': 0, '.br': 0}
+        rows = []
+        for name, hashed_name in sorted(staticfiles_storage.hashed_files.items()):
+            if not name.endswith(extensions):
+                continue
+            source_path = self.find_source(name)
+            built_path = staticfiles_storage.path(hashed_name)
+            if source_path is None or not os.path.exists(built_path):
+                continue
+            row = {
+                'name': hashed_name,
+                'source': os.path.getsize(source_path),
+                'built': os.path.getsize(built_path),
+            }
+            for suffix in ('.gz', '.br'):
+                # Files without a compressed copy are sent as they are
+                compressed = built_path + suffix
+                row[suffix] = os.path.getsize(compressed) if os.path.exists(compressed) else row['built']
+            for key in totals:
+                totals[key] += row[key]
+            rows.append(row)
+
+        self.stdout.write("{:<60} {:>10} {:>10} {:>10} {:>10}".format('File', 'Source', 'Minified', 'gzip', 'Brotli'))
+        self.stdout.write("-" * 104)
+        for row in rows:
+            self.stdout.write("{:<60} {:>10} {:>10} {:>10} {:>10}".format(
+                row['name'][-60:], row['source'], row['built'], row['.gz'], row['.br']
+            ))
+        self.stdout.write("-" * 104)
+        self.stdout.write("{:<60} {:>10} {:>10} {:>10} {:>10}".format(
+            'Total', totals['source'], totals['built'], totals['.gz'], totals['.br']
+        ))
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed; only gzip copies were written'))
+        if totals['source']:
+            best = min(totals['.gz'], totals['.br'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Built {len(rows)} assets into {settings.STATIC_ROOT}: "
+                f"{100 * (1 - best / totals['source']):.0f}% smaller over the wire than the sources"
+            ))
+
+    def find_source(self, name):
+        from django.contrib.staticfiles import finders
+
+        return finders.find(name)
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from admin_panel.analytics_snapshots import PERIODS, SNAPSHOTS, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored analytics page results for every period (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, action='append', choices=PERIODS,
+                            help='Period to recompute (repeatable; default: all)')
+
+    def handle(self, *args, **options):
+        periods = options['days'] or PERIODS
+        for name in SNAPSHOTS:
+            for days in periods:
+                started = time.perf_counter()
+                refresh_snapshot(name, days)
+                self.stdout.write(f"{name} ({days} days): {(time.perf_counter() - started) * 1000:.0f}ms")
+        self.stdout.write(self.style.SUCCESS(f"Stored {len(SNAPSHOTS) * len(periods)} analytics snapshots"))
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from admin_panel.audit_archive import search_archived_logs
+
+
+class Command(BaseCommand):
+    help = 'Search archived admin access logs without touching the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-dir', default=None,
+                            help='Archive directory (default: ADMIN_AUDIT_LOG_ARCHIVE_DIR)')
+        parser.add_argument('--since', help='Only entries on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Only entries before this date (YYYY-MM-DD)')
+        parser.add_argument('--ip', help='Exact IP address')
+        parser.add_argument('--user', help='User id or email address')
+        parser.add_argument('--status', help='Status, e.g. blocked or failed')
+        parser.add_argument('--action', help='Action name')
+        parser.add_argument('--contains', help='Case-insensitive text in the path or details')
+        parser.add_argument('--limit', type=int, default=0, help='Stop after this many matches')
+        parser.add_argument('--json', action='store_true', help='Print matches as JSON Lines')
+
+    def handle(self, *args, **options):
+        matches = search_archived_logs(
+            archive_dir=options['archive_dir'],
+            since=self._parse_day(options['since'], '--since'),
+            until=self._parse_day(options['until'], '--until'),
+            ip=options['ip'],
+            user=options['user'],
+            status=options['status'],
+            action=options['action'],
+            contains=options['contains'],
+        )
+
+        count = 0
+        for record in matches:
+            if options['json']:
+                self.stdout.write(json.dumps(record))
+            else:
+                self.stdout.write(
+                    f"{record['timestamp']}  {record['status']:<8} {record['ip_address']:<15} "
+                    f"{record['user_email'] or '-'}  {record['action']}  {record['path']}"
+                )
+            count += 1
+            if options['limit'] and count >= options['limit']:
+                break
+
+        if not options['json']:
+            self.stdout.write(f"{count} matching entries")
+
+    def _parse_day(self, value, option):
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format")
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from peerlearn.startup import DEFAULT_RUNS, budget_problems, measure_startup
+
+
+class Command(BaseCommand):
+    help = 'Measure worker cold-start import time with python -X importtime and check it against its budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Measured startups (median reported)')
+        parser.add_argument('--top', type=int, default=15, help='Packages and modules listed')
+        parser.add_argument('--output', default=str(settings.BASE_DIR / 'logs' / 'startup_benchmark.json'),
+                            help='Where to write the JSON report')
+
+    def handle(self, *args, **options):
+        try:
+            report = measure_startup(runs=options['runs'], top=options['top'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Startup imports: {report['total_ms']}ms (median of {report['runs']} runs, "
+            f"budget {report['max_total_ms']}ms), {report['modules_imported']} modules"
+        )
+        self.stdout.write(f"\n{'Package':<40} {'self ms':>10}")
+        for row in report['packages']:
+            self.stdout.write(f"{row['package']:<40} {row['self_ms']:>10}")
+        self.stdout.write(f"\n{'Module':<60} {'self ms':>10} {'cumul. ms':>10}")
+        for row in report['slowest_modules']:
+            self.stdout.write(f"{row['module'][-60:]:<60} {row['self_ms']:>10} {row['cumulative_ms']:>10}")
+
+        path = Path(options['output'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"\nReport written to {path}")
+
+        problems = budget_problems(report)
+        if problems:
+            raise CommandError('Startup budget exceeded: ' + '; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Startup within budget'))
@@ -2,7 +2,6 @@
 Middleware for the admin panel to add an extra layer of security
 """
 
-import ipaddress
 import logging
 import re
 
@@ -12,7 +11,8 @@ from django.urls import resolve, reverse
 from django.contrib import messages
 from django.utils.translation import gettext as _
 
-from .models import AdminAccessLog, AllowedIP
+from .audit import audit_log
+from .ip_allowlist import get_allowlist
 
 # Create a logger for recording security events
 security_logger = logging.getLogger('admin_security')
@@ -46,7 +46,7 @@ class AdminSecurityMiddleware:
                 security_logger.warning(f"Unauthenticated access attempt to admin panel: {request.path} from IP: {client_ip}")
                 
                 # Create access log entry
-                AdminAccessLog.objects.create(
+                audit_log.log(
                     ip_address=client_ip,
                     action='access_attempt',
                     path=request.path,
@@ -64,7 +64,7 @@ class AdminSecurityMiddleware:
                 security_logger.warning(f"Non-admin access attempt to admin panel: {request.path} by user: {request.user.username} from IP: {client_ip}")
                 
                 # Create access log entry
-                AdminAccessLog.objects.create(
+                audit_log.log(
                     user=request.user,
                     ip_address=client_ip,
                     action='access_attempt',
@@ -83,7 +83,7 @@ class AdminSecurityMiddleware:
                 security_logger.warning(f"Admin access attempt without verification: {request.path} by user: {request.user.username} from IP: {client_ip}")
                 
                 # Create access log entry
-                AdminAccessLog.objects.create(
+                audit_log.log(
                     user=request.user,
                     ip_address=client_ip,
                     action='access_attempt',
@@ -107,7 +107,7 @@ class AdminSecurityMiddleware:
                     security_logger.info(f"Admin session expired for user: {request.user.username}")
                     
                     # Create access log entry
-                    AdminAccessLog.objects.create(
+                    audit_log.log(
                         user=request.user,
                         ip_address=client_ip,
                         action='session_expired',
@@ -126,28 +126,15 @@ class AdminSecurityMiddleware:
             
             # Check if IP is still allowed (in case IP restrictions changed)
             try:
-                client_ip_obj = ipaddress.ip_address(client_ip)
-                allowed_ips = AllowedIP.objects.filter(is_active=True)
+                allowlist = get_allowlist()
                 
-                if allowed_ips.exists():  # Only check if restrictions are configured
-                    ip_allowed = False
-                    for allowed_ip in allowed_ips:
-                        # Check if it's a network range or single IP
-                        if '/' in allowed_ip.ip_address:
-                            network = ipaddress.ip_network(allowed_ip.ip_address)
-                            if client_ip_obj in network:
-                                ip_allowed = True
-                                break
-                        elif client_ip == allowed_ip.ip_address:
-                            ip_allowed = True
-                            break
-                    
-                    if not ip_allowed:
+                if allowlist.is_configured:  # Only check if restrictions are configured
+                    if not allowlist.allows(client_ip):
                         # Log unauthorized IP
                         security_logger.warning(f"Admin access from unauthorized IP: {client_ip} by user: {request.user.username}")
                         
                         # Create access log entry
-                        AdminAccessLog.objects.create(
+                        audit_log.log(
                             user=request.user,
                             ip_address=client_ip,
                             action='access_attempt',
@@ -172,7 +159,7 @@ class AdminSecurityMiddleware:
                 security_logger.info(f"Admin access: {request.path} by user: {request.user.username} from IP: {client_ip}")
                 
                 # Create access log entry
-                AdminAccessLog.objects.create(
+                audit_log.log(
                     user=request.user,
                     ip_address=client_ip,
                     action='page_view',
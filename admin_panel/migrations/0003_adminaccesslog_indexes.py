@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-19 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0002_adminaccesslog_timestamp_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminaccesslog',
+            index=models.Index(fields=['timestamp', 'id'], name='admin_panel_timesta_e894b0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminaccesslog',
+            index=models.Index(fields=['status', 'timestamp'], name='admin_panel_status_8a1996_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminaccesslog',
+            index=models.Index(fields=['ip_address', 'timestamp'], name='admin_panel_ip_addr_edc0cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminaccesslog',
+            index=models.Index(fields=['user', 'timestamp'], name='admin_panel_user_id_963b3f_idx'),
+        ),
+    ]
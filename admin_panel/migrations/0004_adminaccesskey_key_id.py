@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 11:24
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+SHA256_HEX = re.compile(r'^[0-9a-f]{64}$')
+
+
+def populate_key_ids(apps, schema_editor):
+    """Fill key_id for existing keys, hashing any stored in plain text."""
+    AdminAccessKey = apps.get_model('admin_panel', 'AdminAccessKey')
+    for key in AdminAccessKey.objects.all():
+        if not SHA256_HEX.match(key.key_value):
+            # Older setup scripts stored the key itself; keep it usable
+            key.key_value = hashlib.sha256(key.key_value.encode()).hexdigest()
+        key.key_id = key.key_value[:16]
+        key.save(update_fields=['key_value', 'key_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0003_adminaccesslog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminaccesskey',
+            name='key_id',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=16),
+        ),
+        migrations.RunPython(populate_key_ids, migrations.RunPython.noop),
+    ]
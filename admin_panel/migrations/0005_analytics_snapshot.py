@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0004_adminaccesskey_key_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('days', models.PositiveIntegerField()),
+                ('data', models.JSONField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('name', 'days')},
+            },
+        ),
+    ]
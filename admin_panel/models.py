@@ -13,6 +13,7 @@ class AdminAccessKey(models.Model):
     """
     key_name = models.CharField(max_length=100)
     key_value = models.CharField(max_length=255)  # Hashed value of the key
+    key_id = models.CharField(max_length=16, db_index=True, editable=False, default='')  # Hash prefix used for lookup
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(null=True, blank=True)
@@ -26,6 +27,13 @@ class AdminAccessKey(models.Model):
     def __str__(self):
         return f"{self.key_name} ({'Active' if self.is_active else 'Inactive'})"
     
+    def save(self, *args, **kwargs):
+        # Keep the lookup identifier in step with the stored hash
+        self.key_id = self.key_value[:16]
+        if 'update_fields' in kwargs and kwargs['update_fields'] is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'key_id'}
+        super().save(*args, **kwargs)
+    
     @property
     def is_expired(self):
         """Check if key has expired."""
@@ -50,11 +58,18 @@ class AdminAccessLog(models.Model):
     path = models.CharField(max_length=255, blank=True)
     status = models.CharField(max_length=50)  # success, failed, blocked
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)  # Set at enqueue time, not at write time
     details = models.TextField(blank=True)  # Additional details like reason for failure
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Support keyset pagination and the filters on the security page
+            models.Index(fields=['timestamp', 'id']),
+            models.Index(fields=['status', 'timestamp']),
+            models.Index(fields=['ip_address', 'timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+        ]
     
     def __str__(self):
         return f"{self.action} by {self.user or 'Unknown'} from {self.ip_address} - {self.status}"
@@ -76,4 +91,23 @@ class AllowedIP(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.ip_address} - {self.description}"
\ No newline at end of file
+        return f"{self.ip_address} - {self.description}"
+
+class AnalyticsSnapshot(models.Model):
+    """
+    Stored result of one analytics calculation for one period.
+    
+    Written by the precompute_analytics command, or by the analytics page
+    when the stored result is out of date (see
+    admin_panel.analytics_snapshots).
+    """
+    name = models.CharField(max_length=50)  # Key in analytics_snapshots.SNAPSHOTS
+    days = models.PositiveIntegerField()  # Length of the period
+    data = models.JSONField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ('name', 'days')
+    
+    def __str__(self):
+        return f"{self.name} ({self.days} days) at {self.computed_at}"
@@ -0,0 +1,265 @@
+"""
+Sampled request profiler.
+
+For a sampled share of requests the middleware times every SQL query (via a
+connection execute wrapper) and every top-level template render, and counts
+repeated queries. With REQUEST_PROFILING_SERVER_TIMING on, staff users also
+get a Server-Timing header so the breakdown shows up in the browser's network
+panel; other clients never do, since the timings expose internals and help
+timing attacks. Requests slower than the threshold are written as JSON lines
+to a rotating log, and per-endpoint totals are kept in memory for the admin
+profiling page. Unsampled requests only pay for one random number, so the
+profiler can stay enabled in production.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+from django.utils import timezone
+
+profile_logger = logging.getLogger('request_profiler')
+
+# Number of slow-request samples kept in memory for the admin page
+RECENT_SLOW_REQUESTS = 50
+# Maximum length of a SQL statement stored in a slow-request sample
+MAX_SQL_LENGTH = 500
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+_original_template_render = Template.render
+
+
+class RequestProfile:
+    """Timings collected while handling one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total_time = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_db_time = 0.0
+        self.template_depth = 0
+        self.statements = Counter()
+        self.exact_statements = Counter()
+
+    def record_query(self, sql, params, duration):
+        self.queries += 1
+        self.db_time += duration
+        if self.template_depth:
+            self.template_db_time += duration
+        self.statements[sql] += 1
+        try:
+            self.exact_statements[(sql, repr(params))] += 1
+        except Exception:
+            pass
+
+    @property
+    def duplicate_queries(self):
+        """Queries repeated with exactly the same SQL and parameters."""
+        return sum(count - 1 for count in self.exact_statements.values() if count > 1)
+
+    @property
+    def repeated_statements(self):
+        """(sql, count) for statements run more than once with any parameters, most frequent first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count > 1]
+
+    @property
+    def own_template_time(self):
+        """Template render time excluding SQL run from inside templates."""
+        return max(self.template_time - self.template_db_time, 0.0)
+
+    @property
+    def view_time(self):
+        """Python time outside SQL and template rendering: views and middleware."""
+        return max(self.total_time - self.db_time - self.own_template_time, 0.0)
+
+    def server_timing(self):
+        """Return the Server-Timing header value, with durations in milliseconds."""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries, {self.duplicate_queries} duplicates"',
+            f'tpl;dur={self.own_template_time * 1000:.1f};desc="Templates"',
+            f'view;dur={self.view_time * 1000:.1f};desc="View"',
+            f'total;dur={self.total_time * 1000:.1f};desc="Total"',
+        ])
+
+
+class EndpointStats:
+    """Thread-safe per-process totals per endpoint, plus recent slow requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.slow_requests = deque(maxlen=RECENT_SLOW_REQUESTS)
+            self.since = timezone.now()
+
+    def record(self, endpoint, profile, slow_sample=None):
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'endpoint': endpoint,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'db_ms': 0.0,
+                    'template_ms': 0.0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'duplicate_queries': 0,
+                    'slow': 0,
+                }
+            total_ms = profile.total_time * 1000
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['db_ms'] += profile.db_time * 1000
+            stats['template_ms'] += profile.own_template_time * 1000
+            stats['queries'] += profile.queries
+            stats['max_queries'] = max(stats['max_queries'], profile.queries)
+            stats['duplicate_queries'] += profile.duplicate_queries
+            if slow_sample is not None:
+                stats['slow'] += 1
+                self.slow_requests.appendleft(slow_sample)
+
+    def slowest(self, limit=50, order_by='avg_ms'):
+        """Return endpoint summaries with averages, slowest first."""
+        with self._lock:
+            rows = [dict(stats) for stats in self.endpoints.values()]
+            slow_requests = list(self.slow_requests)
+        for row in rows:
+            count = row['count']
+            row['avg_ms'] = row['total_ms'] / count
+            row['avg_db_ms'] = row['db_ms'] / count
+            row['avg_template_ms'] = row['template_ms'] / count
+            row['avg_queries'] = row['queries'] / count
+        rows.sort(key=lambda row: row.get(order_by, 0), reverse=True)
+        return rows[:limit], slow_requests
+
+
+endpoint_stats = EndpointStats()
+
+
+def _profiled_template_render(self, context):
+    """Template.render replacement that times top-level renders of a profiled request."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _original_template_render(self, context)
+
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_template_render(self, context)
+    finally:
+        profile.template_depth -= 1
+        # Included and extended templates render inside their parent; only
+        # the outermost render is added so nothing is counted twice
+        if profile.template_depth == 0:
+            profile.template_time += time.perf_counter() - started
+
+
+def _get_slow_log_handler():
+    """Create the rotating slow-request log handler, creating its directory."""
+    path = Path(getattr(settings, 'REQUEST_PROFILING_LOG_FILE', settings.BASE_DIR / 'logs' / 'slow_requests.log'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=getattr(settings, 'REQUEST_PROFILING_LOG_MAX_BYTES', 10 * 1024 * 1024),
+        backupCount=getattr(settings, 'REQUEST_PROFILING_LOG_BACKUP_COUNT', 5),
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a sampled share of requests.
+
+    Place first in MIDDLEWARE so the timings cover the other middleware too.
+    Removed from the stack entirely unless REQUEST_PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 0.1)
+        self.slow_threshold = getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 500) / 1000
+        self.server_timing = getattr(settings, 'REQUEST_PROFILING_SERVER_TIMING', False)
+
+        Template.render = _profiled_template_render
+        if not profile_logger.handlers:
+            profile_logger.addHandler(_get_slow_log_handler())
+            profile_logger.setLevel(logging.INFO)
+            profile_logger.propagate = False
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._query_timer(profile)))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+            profile.total_time = time.perf_counter() - profile.started
+
+        if self.server_timing and getattr(getattr(request, 'user', None), 'is_staff', False):
+            response['Server-Timing'] = profile.server_timing()
+        self._record(request, response, profile)
+        return response
+
+    @staticmethod
+    def _query_timer(profile):
+        def timer(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                profile.record_query(sql, params, time.perf_counter() - started)
+        return timer
+
+    def _record(self, request, response, profile):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = f"{request.method} {match.view_name if match else 'unresolved'}"
+
+        slow_sample = None
+        if profile.total_time >= self.slow_threshold:
+            slow_sample = {
+                'timestamp': timezone.now().isoformat(),
+                'endpoint': endpoint,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(profile.total_time * 1000, 1),
+                'db_ms': round(profile.db_time * 1000, 1),
+                'template_ms': round(profile.own_template_time * 1000, 1),
+                'view_ms': round(profile.view_time * 1000, 1),
+                'queries': profile.queries,
+                'duplicate_queries': profile.duplicate_queries,
+                'repeated_statements': [
+                    {'sql': sql[:MAX_SQL_LENGTH], 'count': count}
+                    for sql, count in profile.repeated_statements[:5]
+                ],
+            }
+            profile_logger.info(json.dumps(slow_sample))
+
+        endpoint_stats.record(endpoint, profile, slow_sample)
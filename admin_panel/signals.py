@@ -0,0 +1,24 @@
+"""
+Signal handlers for the admin_panel app.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import AdminAccessKey, AllowedIP
+from .access_keys import invalidate_access_keys
+from .ip_allowlist import invalidate_allowlist
+
+
+@receiver(post_save, sender=AllowedIP)
+@receiver(post_delete, sender=AllowedIP)
+def invalidate_allowed_ip_cache(sender, **kwargs):
+    """Rebuild the compiled IP allowlist after any AllowedIP change."""
+    invalidate_allowlist()
+
+
+@receiver(post_save, sender=AdminAccessKey)
+@receiver(post_delete, sender=AdminAccessKey)
+def invalidate_access_key_cache(sender, **kwargs):
+    """Forget cached access keys after any key is changed or deleted."""
+    invalidate_access_keys()
@@ -33,4 +33,8 @@ urlpatterns = [
     path('security/ip/<int:ip_id>/activate/', views.activate_allowed_ip, name='activate_allowed_ip'),
     path('security/ip/<int:ip_id>/deactivate/', views.deactivate_allowed_ip, name='deactivate_allowed_ip'),
     path('security/ip/<int:ip_id>/delete/', views.delete_allowed_ip, name='delete_allowed_ip'),
+    
+    # Request profiling
+    path('profiling/', views.request_profiling, name='request_profiling'),
+    path('profiling/reset/', views.reset_request_profiling, name='reset_request_profiling'),
 ]
@@ -8,15 +8,14 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.http import JsonResponse, HttpResponseForbidden
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Count, Sum, Avg, F, Q
+from django.db.models import Count, Sum, Avg, F, Max, Q
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.conf import settings
-from datetime import timedelta
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 import os
 import json
-import hashlib
-import hmac
 import ipaddress
 import logging
 import secrets
@@ -31,6 +30,10 @@ security_logger = logging.getLogger('admin_security')
 
 # Import our models
 from .models import AdminAccessKey, AdminAccessLog, AllowedIP
+from .access_keys import hash_access_key, verify_access_key
+from .audit import audit_log
+from .ip_allowlist import get_allowlist
+from .profiling import endpoint_stats
 
 
 def is_admin(user):
@@ -62,7 +65,7 @@ def admin_dashboard(request):
     
     # Get sessions data
     total_sessions = Session.objects.count()
-    total_bookings = Booking.objects.filter(status='confirmed').count()
+    total_bookings = Booking.objects.filter(status__in=['confirmed', 'completed']).count()
     
     # Get active sessions (currently ongoing)
     now = timezone.now()
@@ -355,9 +358,8 @@ def payment_management(request):
 def analytics(request):
     """View for advanced analytics and reporting."""
     # Import analytics utilities
+    from .analytics_snapshots import get_snapshot
     from .analytics_utils import (
-        get_revenue_forecast,
-        get_learner_engagement_stats,
         get_session_quality_metrics,
         get_mentor_performance_metrics
     )
@@ -421,7 +423,7 @@ def analytics(request):
         total_earnings=Sum('sessions__bookings__transactions__amount', 
                            filter=Q(sessions__bookings__transactions__status='completed',
                                    sessions__bookings__transactions__created_at__gte=start_date))
-    ).filter(total_earnings__gt=0).order_by('-total_earnings')[:5]
+    ).filter(total_earnings__gt=0).select_related('user').order_by('-total_earnings')[:5]
     
     # Popular session topics
     all_tags = {}
@@ -435,11 +437,11 @@ def analytics(request):
     popular_tags = sorted(all_tags.items(), key=lambda x: x[1], reverse=True)[:10]
     
     # Advanced Analytics
-    # Get revenue forecast (predictions)
-    revenue_forecast = get_revenue_forecast(days=days, prediction_days=14)
+    # Get revenue forecast (predictions), precomputed by precompute_analytics
+    revenue_forecast = get_snapshot('revenue_forecast', days)
     
-    # Get learner engagement metrics
-    engagement_stats = get_learner_engagement_stats(days=days)
+    # Get learner engagement metrics and cohort retention, precomputed by precompute_analytics
+    engagement_stats = get_snapshot('learner_engagement', days)
     
     # Get session quality metrics
     quality_metrics = get_session_quality_metrics(days=days)
@@ -545,26 +547,32 @@ def secure_admin_login(request):
     Secure admin login view with multiple layers of protection.
     This is separate from Django's built-in admin and the regular user login.
     """
-    # Always pass debug flag to the template
-    context = {'debug': settings.DEBUG}
     # Check if user is already authenticated
     if request.user.is_authenticated and request.user.is_superuser:
         # If user is already a superuser, allow direct access
         return redirect('admin_dashboard')
     
-    # Get client information
-    client_ip = request.META.get('REMOTE_ADDR', '')
-    user_agent = request.META.get('HTTP_USER_AGENT', '')
-    
-    # Log access attempt in database
+    # Track the attempt in memory; it is written once with its final status
     access_log = AdminAccessLog(
-        ip_address=client_ip,
+        ip_address=request.META.get('REMOTE_ADDR', ''),
         action='login_attempt',
         path=request.path,
         status='pending',
-        user_agent=user_agent
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        timestamp=timezone.now()
     )
-    access_log.save()
+    
+    try:
+        return _process_admin_login(request, access_log)
+    finally:
+        audit_log.enqueue(access_log)
+
+
+def _process_admin_login(request, access_log):
+    """Run the admin login checks, recording the outcome on access_log."""
+    # Always pass debug flag to the template
+    context = {'debug': settings.DEBUG}
+    client_ip = access_log.ip_address
     
     # Log in security log file
     security_logger.info(f"Admin login attempt from IP: {client_ip}")
@@ -576,23 +584,14 @@ def secure_admin_login(request):
     if not settings.DEBUG:
         ip_allowed = False
         try:
-            client_ip_obj = ipaddress.ip_address(client_ip)
-            allowed_ips = AllowedIP.objects.filter(is_active=True)
+            ipaddress.ip_address(client_ip)  # Validate the client address
+            allowlist = get_allowlist()
             
-            if not allowed_ips.exists():
+            if not allowlist.is_configured:
                 # If no IPs are configured, temporarily allow all for first setup
                 ip_allowed = True
             else:
-                for allowed_ip in allowed_ips:
-                    # Check if it's a network range or single IP
-                    if '/' in allowed_ip.ip_address:
-                        network = ipaddress.ip_network(allowed_ip.ip_address)
-                        if client_ip_obj in network:
-                            ip_allowed = True
-                            break
-                    elif client_ip == allowed_ip.ip_address:
-                        ip_allowed = True
-                        break
+                ip_allowed = allowlist.allows(client_ip)
         except ValueError:
             # Invalid IP format
             security_logger.warning(f"Invalid IP format in admin login: {client_ip}")
@@ -601,7 +600,6 @@ def secure_admin_login(request):
             # Update access log
             access_log.status = 'failed'
             access_log.details = 'Invalid IP format'
-            access_log.save()
     
     # Block if IP is not allowed
     if not ip_allowed:
@@ -610,7 +608,6 @@ def secure_admin_login(request):
         # Update access log
         access_log.status = 'blocked'
         access_log.details = 'IP not in allowed list'
-        access_log.save()
         
         # Don't explain the actual reason for security purposes
         messages.error(request, _("Access denied. Please contact the administrator."))
@@ -625,52 +622,15 @@ def secure_admin_login(request):
         try:
             user = User.objects.get(email=email)
             access_log.user = user
-            access_log.save()
         except User.DoesNotExist:
             # Don't update access log with user info to avoid revealing valid emails
             pass
         
-        # In development environment, accept a default key or bypass security key check
-        if settings.DEBUG:
-            # If using the default development key, consider it valid
-            if security_key == "admin123" or security_key == "S9wmHv6ncu196cLfRqAbrDny0eQB9ak1":
-                key_valid = True
-            else:
-                # Perform additional security key verification using database
-                key_valid = False
-                if security_key:
-                    # Hash the provided key
-                    hashed_security_key = hashlib.sha256(security_key.encode()).hexdigest()
-                    
-                    # Get active keys
-                    active_keys = AdminAccessKey.objects.filter(is_active=True)
-                    for key in active_keys:
-                        # Skip expired keys
-                        if key.is_expired:
-                            continue
-                            
-                        # Check if provided key matches the stored hashed value
-                        if constant_time_compare(hashed_security_key, key.key_value):
-                            key_valid = True
-                            break
+        # In development environment, also accept the default keys
+        if settings.DEBUG and security_key in ("admin123", "S9wmHv6ncu196cLfRqAbrDny0eQB9ak1"):
+            key_valid = True
         else:
-            # In production, perform standard key verification
-            key_valid = False
-            if security_key:
-                # Hash the provided key
-                hashed_security_key = hashlib.sha256(security_key.encode()).hexdigest()
-                
-                # Get active keys
-                active_keys = AdminAccessKey.objects.filter(is_active=True)
-                for key in active_keys:
-                    # Skip expired keys
-                    if key.is_expired:
-                        continue
-                        
-                    # Check if provided key matches the stored hashed value
-                    if constant_time_compare(hashed_security_key, key.key_value):
-                        key_valid = True
-                        break
+            key_valid = verify_access_key(security_key)
         
         if not security_key or not key_valid:
             security_logger.warning(f"Invalid security key provided from IP: {client_ip}")
@@ -678,7 +638,6 @@ def secure_admin_login(request):
             # Update access log
             access_log.status = 'failed'
             access_log.details = 'Invalid security key'
-            access_log.save()
             
             # In development mode, show a hint for the default key
             if settings.DEBUG:
@@ -694,6 +653,7 @@ def secure_admin_login(request):
         
         if user is not None and user.is_active and user.role == 'admin':
             login(request, user)
+            access_log.status = 'success'
             
             # Set admin session flag
             request.session['admin_verified'] = True
@@ -709,6 +669,8 @@ def secure_admin_login(request):
             return redirect('admin_dashboard')
         else:
             security_logger.warning(f"Failed admin login attempt for user: {email} from IP: {client_ip}")
+            access_log.status = 'failed'
+            access_log.details = 'Invalid email or password'
             messages.error(request, _("Invalid credentials. Please try again."))
     
     return render(request, 'admin_panel/secure_login.html', context)
@@ -728,6 +690,14 @@ def secure_admin_logout(request):
     return redirect('home')
 
 
+# Number of access log rows shown per page on the security page
+ACCESS_LOG_PAGE_SIZE = 100
+LOG_CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Sort keys accepted by the request profiling page
+PROFILING_ORDERINGS = ('avg_ms', 'max_ms', 'count', 'avg_queries', 'duplicate_queries')
+
+
 @login_required
 @user_passes_test(is_admin)
 def security_management(request):
@@ -740,24 +710,105 @@ def security_management(request):
     
     # Get access logs with filtering
     log_filter = request.GET.get('log_filter', 'all')
-    if log_filter == 'all':
-        access_logs = AdminAccessLog.objects.all()
-    else:
-        access_logs = AdminAccessLog.objects.filter(status=log_filter)
+    user_filter = request.GET.get('user', '').strip()
+    ip_filter = request.GET.get('ip', '').strip()
+    date_from = _parse_date_param(request.GET.get('date_from'))
+    date_to = _parse_date_param(request.GET.get('date_to'))
+    
+    access_logs = AdminAccessLog.objects.all()
+    if log_filter != 'all':
+        access_logs = access_logs.filter(status=log_filter)
+    if user_filter:
+        if user_filter.isdigit():
+            access_logs = access_logs.filter(user_id=int(user_filter))
+        else:
+            access_logs = access_logs.filter(user__email=user_filter)
+    if ip_filter:
+        access_logs = access_logs.filter(ip_address=ip_filter)
+    if date_from:
+        access_logs = access_logs.filter(timestamp__gte=_start_of_day(date_from))
+    if date_to:
+        access_logs = access_logs.filter(timestamp__lt=_start_of_day(date_to + timedelta(days=1)))
+    
+    # Keyset pagination on (timestamp, id), newest first, so deep pages cost
+    # the same as the first one
+    cursor = _decode_log_cursor(request.GET.get('before', ''))
+    if cursor:
+        cursor_timestamp, cursor_id = cursor
+        access_logs = access_logs.filter(
+            Q(timestamp__lt=cursor_timestamp) |
+            Q(timestamp=cursor_timestamp, id__lt=cursor_id)
+        )
     
-    # Limit to latest 100 logs for performance
-    access_logs = access_logs.select_related('user').order_by('-timestamp')[:100]
+    page = list(
+        access_logs.select_related('user').order_by('-timestamp', '-id')[:ACCESS_LOG_PAGE_SIZE + 1]
+    )
+    next_cursor = None
+    if len(page) > ACCESS_LOG_PAGE_SIZE:
+        page = page[:ACCESS_LOG_PAGE_SIZE]
+        next_cursor = _encode_log_cursor(page[-1])
+    
+    # Top offending IPs over the selected range (last 7 days by default)
+    offenders_since = _start_of_day(date_from) if date_from else timezone.now() - timedelta(days=7)
+    offending_ips = AdminAccessLog.objects.filter(
+        status__in=['blocked', 'failed'],
+        timestamp__gte=offenders_since
+    )
+    if date_to:
+        offending_ips = offending_ips.filter(timestamp__lt=_start_of_day(date_to + timedelta(days=1)))
+    top_offending_ips = offending_ips.values('ip_address').annotate(
+        attempts=Count('id'),
+        last_seen=Max('timestamp')
+    ).order_by('-attempts')[:10]
+    
+    # Preserve the active filters in pagination links
+    filter_params = request.GET.copy()
+    filter_params.pop('before', None)
     
     context = {
         'access_keys': access_keys,
         'allowed_ips': allowed_ips,
-        'access_logs': access_logs,
+        'access_logs': page,
         'log_filter': log_filter,
+        'user_filter': user_filter,
+        'ip_filter': ip_filter,
+        'date_from': date_from,
+        'date_to': date_to,
+        'next_cursor': next_cursor,
+        'filter_query': filter_params.urlencode(),
+        'top_offending_ips': top_offending_ips,
     }
     
     return render(request, 'admin_panel/security_management.html', context)
 
 
+def _parse_date_param(value):
+    """Parse a YYYY-MM-DD query parameter, returning None when invalid."""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def _start_of_day(day):
+    """Return an aware datetime for midnight at the start of the given date."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _encode_log_cursor(log):
+    """Encode the keyset position of an access log row for a page link."""
+    micros = (log.timestamp - LOG_CURSOR_EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{log.id}"
+
+
+def _decode_log_cursor(value):
+    """Decode a cursor produced by _encode_log_cursor, or return None."""
+    micros, _sep, log_id = value.partition('_')
+    if not micros.isdigit() or not log_id.isdigit():
+        return None
+    return LOG_CURSOR_EPOCH + timedelta(microseconds=int(micros)), int(log_id)
+
+
 @login_required
 @user_passes_test(is_admin)
 def generate_access_key(request):
@@ -778,10 +829,9 @@ def generate_access_key(request):
         plain_text_key = secrets.token_urlsafe(32)
         
         # Create the key record with hashed value
-        hashed_key = hashlib.sha256(plain_text_key.encode()).hexdigest()
         key_obj = AdminAccessKey.objects.create(
             key_name=key_name,
-            key_value=hashed_key,
+            key_value=hash_access_key(plain_text_key),
             expires_at=expires_at,
             created_by=request.user
         )
@@ -790,7 +840,7 @@ def generate_access_key(request):
         security_logger.info(f"New admin access key '{key_name}' generated by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='generate_key',
@@ -820,7 +870,7 @@ def activate_access_key(request, key_id):
         security_logger.info(f"Admin access key '{key.key_name}' activated by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='activate_key',
@@ -848,7 +898,7 @@ def deactivate_access_key(request, key_id):
         security_logger.info(f"Admin access key '{key.key_name}' deactivated by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='deactivate_key',
@@ -876,7 +926,7 @@ def delete_access_key(request, key_id):
         security_logger.info(f"Admin access key '{key_name}' deleted by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='delete_key',
@@ -921,7 +971,7 @@ def add_allowed_ip(request):
             security_logger.info(f"Allowed IP '{ip_address}' added by {request.user.email}")
             
             # Record in access log
-            AdminAccessLog.objects.create(
+            audit_log.log(
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR', ''),
                 action='add_ip',
@@ -952,7 +1002,7 @@ def activate_allowed_ip(request, ip_id):
         security_logger.info(f"Allowed IP '{ip.ip_address}' activated by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='activate_ip',
@@ -980,7 +1030,7 @@ def deactivate_allowed_ip(request, ip_id):
         security_logger.info(f"Allowed IP '{ip.ip_address}' deactivated by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='deactivate_ip',
@@ -1008,7 +1058,7 @@ def delete_allowed_ip(request, ip_id):
         security_logger.info(f"Allowed IP '{ip_address}' deleted by {request.user.email}")
         
         # Record in access log
-        AdminAccessLog.objects.create(
+        audit_log.log(
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR', ''),
             action='delete_ip',
@@ -1023,6 +1073,38 @@ def delete_allowed_ip(request, ip_id):
     return redirect('security_management')
 
 
+@login_required
+@user_passes_test(is_admin)
+def request_profiling(request):
+    """List the slowest endpoints recorded by the request profiler in this process."""
+    order_by = request.GET.get('order', 'avg_ms')
+    if order_by not in PROFILING_ORDERINGS:
+        order_by = 'avg_ms'
+    endpoints, slow_requests = endpoint_stats.slowest(order_by=order_by)
+
+    context = {
+        'profiling_enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+        'sample_rate': getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 0),
+        'slow_threshold_ms': getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 500),
+        'stats_since': endpoint_stats.since,
+        'endpoints': endpoints,
+        'slow_requests': slow_requests,
+        'order_by': order_by,
+    }
+
+    return render(request, 'admin_panel/request_profiling.html', context)
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def reset_request_profiling(request):
+    """Clear the request profiler statistics of this process."""
+    endpoint_stats.reset()
+    messages.success(request, _("Profiling statistics have been reset."))
+    return redirect('request_profiling')
+
+
 @login_required
 @user_passes_test(is_admin)
 def create_admin_account(request):
@@ -1058,7 +1140,7 @@ def create_admin_account(request):
             security_logger.info(f"New admin account created for {email} by {request.user.email}")
             
             # Record in access log
-            AdminAccessLog.objects.create(
+            audit_log.log(
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR', ''),
                 action='create_admin',
@@ -1075,7 +1157,7 @@ def create_admin_account(request):
             security_logger.error(f"Error creating admin account for {email}: {str(e)}")
             
             # Record in access log
-            AdminAccessLog.objects.create(
+            audit_log.log(
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR', ''),
                 action='create_admin',
@@ -1086,13 +1168,3 @@ def create_admin_account(request):
             )
     
     return redirect('admin_dashboard')
-
-
-def constant_time_compare(val1, val2):
-    """
-    Perform a constant time comparison to avoid timing attacks.
-    """
-    if not isinstance(val1, str) or not isinstance(val2, str):
-        return False
-    
-    return hmac.compare_digest(val1, val2)
@@ -6,7 +6,6 @@ import os
 import sys
 import random
 import string
-import hashlib
 import datetime
 
 # Set up Django environment
@@ -17,6 +16,7 @@ django.setup()
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from admin_panel.models import AdminAccessKey
+from admin_panel.access_keys import hash_access_key
 
 User = get_user_model()
 
@@ -54,7 +54,7 @@ def create_security_key(user):
     key_value = generate_key(32)
     
     # Hash the key for storage
-    hashed_key = hashlib.sha256(key_value.encode()).hexdigest()
+    hashed_key = hash_access_key(key_value)
     
     # Create the key record
     key = AdminAccessKey.objects.create(
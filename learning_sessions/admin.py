@@ -5,7 +5,7 @@ Admin configuration for sessions app.
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Session, Booking, Feedback
+from .models import Session, Booking, Feedback, LearnerStats, SessionRecommendation
 
 
 @admin.register(Session)
@@ -34,3 +34,21 @@ class FeedbackAdmin(admin.ModelAdmin):
     list_filter = ('rating', 'created_at')
     search_fields = ('booking__session__title', 'booking__learner__email', 'comments')
     readonly_fields = ('created_at',)
+
+
+@admin.register(LearnerStats)
+class LearnerStatsAdmin(admin.ModelAdmin):
+    """Admin interface for LearnerStats model."""
+    list_display = ('learner', 'completed_sessions', 'total_minutes', 'current_streak', 'longest_streak',
+                    'last_activity_date')
+    search_fields = ('learner__email',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(SessionRecommendation)
+class SessionRecommendationAdmin(admin.ModelAdmin):
+    """Admin interface for SessionRecommendation model."""
+    list_display = ('learner', 'rank', 'session', 'score', 'computed_at')
+    search_fields = ('learner__email', 'session__title')
+    list_select_related = ('learner', 'session')
+    raw_id_fields = ('learner', 'session')
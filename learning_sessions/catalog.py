@@ -0,0 +1,223 @@
+"""
+Session catalog shared by the session list page and the catalog JSON API.
+
+Upcoming sessions are paged with a keyset cursor on (start_time, id), so
+every page costs the same regardless of how many sessions exist. Facet
+counts for tags, price bands and mentor rating bands come from a single
+grouped query over (price band, rating band, tags); each facet is then
+counted in Python with the filters of the other facets applied, so a
+selected value never hides the alternatives in its own facet.
+
+The grouped rows, collapsed to one per (price band, rating band, tag
+set), are kept in the default cache for CATALOG_FACET_CACHE_TTL seconds
+and dropped when a session or mentor profile is saved or deleted (see
+learning_sessions.signals). The TTL bounds how long sessions that have
+started, or were changed by bulk updates, stay counted.
+"""
+
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import Session
+
+CATALOG_PAGE_SIZE = 12
+MAX_TAG_FACETS = 20
+
+FACET_CACHE_KEY = 'catalog:facet_groups'
+
+CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# (key, label, condition) in display order; conditions must not overlap
+PRICE_BANDS = (
+    ('free', _('Free'), Q(price=0)),
+    ('under_500', _('Under ₹500'), Q(price__gt=0, price__lt=500)),
+    ('500_to_1000', _('₹500 – ₹1000'), Q(price__gte=500, price__lt=1000)),
+    ('1000_plus', _('₹1000 and above'), Q(price__gte=1000)),
+)
+
+RATING_BANDS = (
+    ('4_plus', _('4★ and above'), Q(mentor__total_reviews__gt=0, mentor__average_rating__gte=4)),
+    ('3_to_4', _('3★ to 4★'), Q(mentor__total_reviews__gt=0, mentor__average_rating__gte=3, mentor__average_rating__lt=4)),
+    ('below_3', _('Below 3★'), Q(mentor__total_reviews__gt=0, mentor__average_rating__lt=3)),
+    ('unrated', _('Not yet rated'), Q(mentor__total_reviews=0)),
+)
+
+
+def upcoming_sessions():
+    """Return the queryset of sessions that can still be booked."""
+    return Session.objects.filter(
+        status='scheduled',
+        start_time__gt=timezone.now(),
+        mentor__is_approved=True,
+    )
+
+
+def get_catalog_page(tag=None, price=None, rating=None, cursor=None, limit=CATALOG_PAGE_SIZE):
+    """
+    Return one page of the upcoming session catalog with facet counts.
+
+    Args:
+        tag: Only sessions with this tag (case-insensitive)
+        price: Key of a PRICE_BANDS entry
+        rating: Key of a RATING_BANDS entry
+        cursor: Value of next_cursor from the previous page, if any
+        limit: Maximum number of sessions on the page
+
+    Returns:
+        Dictionary with the sessions, next_cursor, facets and active filters
+    """
+    tag = tag.strip().lower() if tag else None
+    price = price if price in _band_keys(PRICE_BANDS) else None
+    rating = rating if rating in _band_keys(RATING_BANDS) else None
+
+    queryset = upcoming_sessions()
+    if tag:
+        queryset = queryset.filter(tags__iregex=rf'(^|,)\s*{re.escape(tag)}\s*(,|$)')
+    if price:
+        queryset = queryset.filter(_band_condition(PRICE_BANDS, price))
+    if rating:
+        queryset = queryset.filter(_band_condition(RATING_BANDS, rating))
+
+    after = decode_cursor(cursor)
+    if after is not None:
+        start_time, session_id = after
+        queryset = queryset.filter(
+            Q(start_time__gt=start_time) | Q(start_time=start_time, id__gt=session_id)
+        )
+
+    sessions = list(
+        queryset.select_related('mentor', 'mentor__user').order_by('start_time', 'id')[:limit + 1]
+    )
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = encode_cursor(sessions[-1])
+
+    for session in sessions:
+        session.topics_list = [t.strip() for t in session.tags.split(',') if t.strip()][:3]
+
+    return {
+        'sessions': sessions,
+        'next_cursor': next_cursor,
+        'facets': get_facets(tag=tag, price=price, rating=rating),
+        'filters': {'tag': tag, 'price': price, 'rating': rating},
+    }
+
+
+def facet_groups():
+    """
+    Return the cached facet groups of upcoming sessions.
+
+    A tuple of ((price band, rating band, tag keys), count) pairs and a
+    dict of display labels by tag key.
+    """
+    cached = cache.get(FACET_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    rows = (
+        upcoming_sessions()
+        .annotate(
+            price_band=_band_case(PRICE_BANDS),
+            rating_band=_band_case(RATING_BANDS),
+        )
+        .values('price_band', 'rating_band', 'tags')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    groups = Counter()
+    tag_labels = {}
+    for row in rows:
+        tags = {}
+        for raw_tag in row['tags'].split(','):
+            if raw_tag.strip():
+                tags.setdefault(raw_tag.strip().lower(), raw_tag.strip())
+        groups[(row['price_band'], row['rating_band'], tuple(sorted(tags)))] += row['count']
+        for key, label in tags.items():
+            tag_labels.setdefault(key, label)
+
+    cached = (tuple(groups.items()), tag_labels)
+    cache.set(FACET_CACHE_KEY, cached, settings.CATALOG_FACET_CACHE_TTL)
+    return cached
+
+
+def invalidate_facets():
+    """Drop the cached facet groups so the next catalog page recounts them."""
+    cache.delete(FACET_CACHE_KEY)
+
+
+def get_facets(tag=None, price=None, rating=None):
+    """Count upcoming sessions per tag, price band and rating band."""
+    groups, tag_labels = facet_groups()
+
+    tag_counts = Counter()
+    price_counts = Counter()
+    rating_counts = Counter()
+    for (price_band, rating_band, tags), count in groups:
+        in_price = price is None or price_band == price
+        in_rating = rating is None or rating_band == rating
+        in_tag = tag is None or tag in tags
+
+        if in_price and in_rating:
+            for key in tags:
+                tag_counts[key] += count
+        if in_rating and in_tag:
+            price_counts[price_band] += count
+        if in_price and in_tag:
+            rating_counts[rating_band] += count
+
+    return {
+        'tags': [
+            {'key': key, 'label': tag_labels[key], 'count': count, 'selected': key == tag}
+            for key, count in tag_counts.most_common(MAX_TAG_FACETS)
+        ],
+        'price': [
+            {'key': key, 'label': str(label), 'count': price_counts[key], 'selected': key == price}
+            for key, label, condition in PRICE_BANDS
+        ],
+        'rating': [
+            {'key': key, 'label': str(label), 'count': rating_counts[key], 'selected': key == rating}
+            for key, label, condition in RATING_BANDS
+        ],
+    }
+
+
+def encode_cursor(session):
+    """Encode the position after a session as an opaque cursor string."""
+    delta = session.start_time - CURSOR_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return f"{micros}_{session.id}"
+
+
+def decode_cursor(cursor):
+    """Return (start_time, id) from a cursor, or None if it is invalid."""
+    if not cursor:
+        return None
+    try:
+        micros, session_id = (int(part) for part in cursor.split('_', 1))
+        return CURSOR_EPOCH + timedelta(microseconds=micros), session_id
+    except (ValueError, OverflowError):
+        return None
+
+
+def _band_keys(bands):
+    return {key for key, label, condition in bands}
+
+
+def _band_condition(bands, key):
+    return next(condition for band_key, label, condition in bands if band_key == key)
+
+
+def _band_case(bands):
+    return Case(
+        *[When(condition, then=Value(key)) for key, label, condition in bands],
+        default=Value(''),
+        output_field=CharField(),
+    )
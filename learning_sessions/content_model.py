@@ -0,0 +1,350 @@
+"""
+TF-IDF content vectors for upcoming sessions.
+
+Every scheduled session that has not started yet is a row of a float32
+matrix of L2-normalised TF-IDF vectors built from its title, tags, topics
+and description, with an id map from session id to row. Learners are
+scored against all of them with one matrix product, a single learner in a
+request or a whole shard of learners in the precompute job: a profile
+vector is the mean of the vectors of the sessions the learner booked, plus
+their career goals.
+
+The vocabulary is capped at MAX_FEATURES terms, so a row costs at most
+16 KB. Each process keeps one model and refreshes it incrementally every
+CONTENT_MODEL_REFRESH_INTERVAL seconds: sessions saved since the last
+refresh (found through updated_at) are re-vectorised against the existing
+vocabulary, or dropped if they are no longer scheduled. Once
+REBUILD_FRACTION of the rows have been re-vectorised, the vocabulary and
+IDF weights are rebuilt from scratch.
+
+The model is written to CONTENT_MODEL_PATH after every change, so new
+workers load it and only catch up on recent edits. The build_content_model
+command rebuilds it from scratch. Deleted sessions stay in the matrix until
+the next full rebuild; callers load the ranked ids from the database, which
+drops them.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from users.models import LearnerProfile
+from .models import Booking, Session
+from .search import TERM_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Session fields making up a document, and the weight of a term in each
+DOCUMENT_FIELDS = ('title', 'tags', 'topics_to_cover', 'description')
+FIELD_WEIGHTS = (3.0, 3.0, 2.0, 1.0)
+
+MAX_FEATURES = 4096
+MIN_TERM_LENGTH = 2
+STOP_WORDS = frozenset("""
+    a about an and are as at be by for from how in into is it its of on or
+    that the their this to with you your we our will can learn learning
+    session sessions introduction intro basics
+""".split())
+
+# Weight of the career goals relative to the whole booking history
+GOALS_WEIGHT = 0.5
+# Most recent bookings used to build a learner's profile vector
+HISTORY_SIZE = 50
+
+# Share of re-vectorised rows that triggers a full rebuild
+REBUILD_FRACTION = 0.25
+# Rows saved while a refresh runs could be missed without some overlap
+REFRESH_OVERLAP = timedelta(seconds=2)
+
+# Bumped when the file layout changes, so old files are rebuilt
+FILE_FORMAT = 1
+
+
+def terms(text):
+    """Lower-cased index terms of a text."""
+    return [
+        term for term in TERM_PATTERN.findall((text or '').lower())
+        if len(term) >= MIN_TERM_LENGTH and term not in STOP_WORDS and not term.isdigit()
+    ]
+
+
+def document_terms(fields):
+    """Weighted term counts of one session, from its DOCUMENT_FIELDS values."""
+    counts = Counter()
+    for text, weight in zip(fields, FIELD_WEIGHTS):
+        for term in terms(text):
+            counts[term] += weight
+    return counts
+
+
+def database_name():
+    """Identifies the database a persisted model was built from."""
+    return str(connection.settings_dict['NAME'])
+
+
+def _datetime(timestamp):
+    return datetime.fromtimestamp(float(timestamp), tz=dt_timezone.utc)
+
+
+class ContentModel:
+    """TF-IDF matrix of upcoming sessions; a refresh that changes rows returns a new model."""
+
+    def __init__(self, vocabulary, idf, matrix, ids, starts, built_at, refreshed_at, stale_rows=0):
+        self.vocabulary = list(vocabulary)
+        self.columns = {term: column for column, term in enumerate(self.vocabulary)}
+        self.idf = idf
+        self.matrix = matrix
+        self.ids = ids
+        self.starts = starts
+        self.rows = {session_id: row for row, session_id in enumerate(ids.tolist())}
+        self.built_at = built_at
+        self.refreshed_at = refreshed_at
+        self.stale_rows = stale_rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, now=None):
+        """Build the vocabulary, IDF weights and matrix from all upcoming sessions."""
+        now = now or timezone.now()
+        rows = Session.objects.filter(status='scheduled', start_time__gt=now).values_list(
+            'id', 'start_time', *DOCUMENT_FIELDS
+        )
+        ids, starts, documents = [], [], []
+        for session_id, start_time, *fields in rows.iterator(chunk_size=1000):
+            ids.append(session_id)
+            starts.append(start_time.timestamp())
+            documents.append(document_terms(fields))
+
+        document_frequency = Counter()
+        for counts in documents:
+            document_frequency.update(counts.keys())
+        vocabulary = sorted(
+            document_frequency, key=lambda term: (-document_frequency[term], term)
+        )[:MAX_FEATURES]
+        # Smoothed IDF, as if one extra document contained every term
+        idf = np.array(
+            [math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+            dtype=np.float32,
+        )
+
+        model = cls(
+            vocabulary, idf, np.zeros((0, len(vocabulary)), dtype=np.float32),
+            np.array(ids, dtype=np.int64), np.array(starts, dtype=np.float64), now, now,
+        )
+        model.matrix = model.vectorize_many(documents)
+        return model
+
+    def vectorize(self, counts):
+        """Unit TF-IDF vector of weighted term counts; terms outside the vocabulary are ignored."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in counts.items():
+            column = self.columns.get(term)
+            if column is not None:
+                vector[column] = (1 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def vectorize_many(self, documents):
+        matrix = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(documents):
+            matrix[row] = self.vectorize(counts)
+        return matrix
+
+    def refreshed(self, now=None):
+        """
+        Return a model with the sessions saved since the last refresh applied.
+
+        Returns self, with only refreshed_at moved on, when nothing changed.
+        """
+        now = now or timezone.now()
+        changed = list(
+            Session.objects.filter(updated_at__gte=self.refreshed_at - REFRESH_OVERLAP).values_list(
+                'id', 'status', 'start_time', *DOCUMENT_FIELDS
+            )
+        )
+        keep = self.starts > now.timestamp()
+        if changed:
+            keep &= ~np.isin(self.ids, [row[0] for row in changed])
+        added = [row for row in changed if row[1] == 'scheduled' and row[2] > now]
+        if not added and keep.all():
+            self.refreshed_at = now
+            return self
+
+        return ContentModel(
+            self.vocabulary, self.idf,
+            np.vstack([self.matrix[keep], self.vectorize_many([document_terms(row[3:]) for row in added])]),
+            np.concatenate([self.ids[keep], np.array([row[0] for row in added], dtype=np.int64)]),
+            np.concatenate([self.starts[keep], np.array([row[2].timestamp() for row in added])]),
+            self.built_at, now, self.stale_rows + len(added),
+        )
+
+    def needs_rebuild(self):
+        return self.stale_rows > REBUILD_FRACTION * len(self)
+
+    def profile_vectors(self, learner_ids):
+        """
+        Unit profile vectors of learners, one row each, and the ids of every
+        session each of them booked.
+
+        Two queries however many learners are given. A row is all zeros when
+        neither the booking history nor the career goals share a term with
+        the vocabulary.
+        """
+        rows = {learner_id: row for row, learner_id in enumerate(learner_ids)}
+        histories = [[] for _learner_id in learner_ids]
+        booked_ids = [set() for _learner_id in learner_ids]
+        bookings = Booking.objects.filter(learner_id__in=learner_ids).order_by(
+            'learner_id', '-created_at'
+        ).values_list('learner_id', 'session_id', 'status', *(f'session__{field}' for field in DOCUMENT_FIELDS))
+        for learner_id, session_id, status, *fields in bookings.iterator(chunk_size=2000):
+            row = rows[learner_id]
+            booked_ids[row].add(session_id)
+            if status in ('confirmed', 'completed') and len(histories[row]) < HISTORY_SIZE:
+                histories[row].append(document_terms(fields))
+
+        profiles = np.zeros((len(learner_ids), len(self.vocabulary)), dtype=np.float32)
+        for row, history in enumerate(histories):
+            if history:
+                profiles[row] = self.vectorize_many(history).mean(axis=0)
+        goals = LearnerProfile.objects.filter(user_id__in=learner_ids).exclude(career_goals='')
+        for user_id, career_goals in goals.values_list('user_id', 'career_goals'):
+            profiles[rows[user_id]] += GOALS_WEIGHT * self.vectorize(Counter(terms(career_goals)))
+
+        norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+        np.divide(profiles, norms, out=profiles, where=norms > 0)
+        return profiles, booked_ids
+
+    def rank_many(self, profiles, exclude_ids, limit=10, now=None):
+        """
+        Rank sessions for every row of a profile matrix with one matrix product.
+
+        exclude_ids holds a set of session ids per row. Returns a
+        (session ids, scores) pair per row, best first; only sessions with
+        a positive score are included.
+        """
+        if not len(self):
+            return [([], []) for _row in range(len(profiles))]
+        now = now or timezone.now()
+        scores = profiles @ self.matrix.T
+        scores[:, self.starts <= now.timestamp()] = 0
+        for row, session_ids in enumerate(exclude_ids):
+            columns = [self.rows[session_id] for session_id in session_ids if session_id in self.rows]
+            scores[row, columns] = 0
+
+        limit = min(limit, len(self))
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        ranked = []
+        for row, candidates in enumerate(top):
+            candidates = candidates[scores[row, candidates] > 0]
+            # Best score first; equal scores by the earliest start
+            order = candidates[np.lexsort((self.starts[candidates], -scores[row, candidates]))]
+            ranked.append((self.ids[order].tolist(), scores[row, order].tolist()))
+        return ranked
+
+    def save(self, path):
+        """Write the model atomically, so readers never see a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(temporary, 'wb') as output:
+            np.savez(
+                output,
+                format=np.array(FILE_FORMAT),
+                database=np.array(database_name()),
+                vocabulary=np.array(self.vocabulary, dtype=str),
+                idf=self.idf, matrix=self.matrix, ids=self.ids, starts=self.starts,
+                built_at=np.array(self.built_at.timestamp()),
+                refreshed_at=np.array(self.refreshed_at.timestamp()),
+                stale_rows=np.array(self.stale_rows),
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved model; None if it is missing, outdated or from another database."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['format']) != FILE_FORMAT or str(data['database']) != database_name():
+                    return None
+                return cls(
+                    data['vocabulary'].tolist(), data['idf'], data['matrix'], data['ids'], data['starts'],
+                    _datetime(data['built_at']), _datetime(data['refreshed_at']), int(data['stale_rows']),
+                )
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError):
+            logger.warning('Ignoring unreadable content model at %s', path, exc_info=True)
+            return None
+
+
+_lock = threading.Lock()
+_model = None
+_checked_at = 0.0
+
+
+def rebuild_content_model():
+    """Rebuild the model from scratch, save it and use it in this process."""
+    global _model, _checked_at
+    model = ContentModel.build()
+    _save(model)
+    with _lock:
+        _model = model
+        _checked_at = time.monotonic()
+    return model
+
+
+def get_content_model():
+    """Return this process's model, loading, refreshing or rebuilding it when due."""
+    global _model, _checked_at
+
+    model = _model
+    if model is not None and time.monotonic() - _checked_at < settings.CONTENT_MODEL_REFRESH_INTERVAL:
+        return model
+
+    with _lock:
+        if _model is None or time.monotonic() - _checked_at >= settings.CONTENT_MODEL_REFRESH_INTERVAL:
+            model = _model
+            if model is None and settings.CONTENT_MODEL_PATH:
+                model = ContentModel.load(settings.CONTENT_MODEL_PATH)
+            if model is None:
+                model = ContentModel.build()
+                _save(model)
+            else:
+                refreshed = model.refreshed()
+                if refreshed.needs_rebuild():
+                    refreshed = ContentModel.build()
+                if refreshed is not model:
+                    _save(refreshed)
+                model = refreshed
+            _model = model
+            _checked_at = time.monotonic()
+        return _model
+
+
+def _save(model):
+    if not settings.CONTENT_MODEL_PATH:
+        return
+    try:
+        model.save(settings.CONTENT_MODEL_PATH)
+    except OSError:
+        logger.warning('Could not save the content model to %s', settings.CONTENT_MODEL_PATH, exc_info=True)
+
+
+def rank_sessions_for(user, limit=10):
+    """Ids of the upcoming sessions closest to a learner's interests, excluding booked ones."""
+    model = get_content_model()
+    profiles, booked_ids = model.profile_vectors([user.pk])
+    session_ids, _scores = model.rank_many(profiles, booked_ids, limit)[0]
+    return session_ids
@@ -0,0 +1,134 @@
+"""
+Incremental maintenance of LearnerStats.
+
+record_completed_sessions() is called with the bookings that have just
+completed (see learning_sessions.lifecycle) and folds them into each
+learner's running totals and streaks: one locking read and one bulk write
+for the whole batch, however many bookings it holds. A completion dated
+before the learner's last activity cannot be folded into a streak
+incrementally, so those learners are rebuilt from their booking history
+instead.
+
+rebuild_learner_stats() recomputes rows from completed bookings in one
+ordered pass; the rebuild_learner_stats command uses it as a backfill.
+"""
+
+from collections import defaultdict
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, LearnerStats
+
+REBUILD_BATCH_SIZE = 1000
+
+STATS_FIELDS = (
+    'total_minutes', 'completed_sessions', 'current_streak', 'longest_streak',
+    'last_activity_date', 'updated_at',
+)
+
+
+def session_minutes(start_time, end_time):
+    """Whole minutes of a session."""
+    return max(round((end_time - start_time).total_seconds() / 60), 0)
+
+
+def activity_date(end_time):
+    """Local calendar day a session counts towards for streaks."""
+    return timezone.localtime(end_time).date()
+
+
+def add_completion(stats, minutes, day):
+    """
+    Fold one completed session into stats.
+
+    Returns False, leaving stats partly updated, when day is earlier than
+    the last activity date; the streaks then need a rebuild.
+    """
+    last = stats.last_activity_date
+    if last is not None and day < last:
+        return False
+    stats.total_minutes += minutes
+    stats.completed_sessions += 1
+    if last is None or (day - last).days > 1:
+        stats.current_streak = 1
+    elif (day - last).days == 1:
+        stats.current_streak += 1
+    else:
+        stats.current_streak = max(stats.current_streak, 1)
+    stats.last_activity_date = day
+    stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+    return True
+
+
+def record_completed_sessions(completions):
+    """
+    Add completed bookings to their learners' stats.
+
+    completions is an iterable of (learner_id, session start_time,
+    session end_time) tuples. Must be called after the bookings are saved
+    as completed, so a fallback rebuild sees them.
+    """
+    by_learner = defaultdict(list)
+    for learner_id, start_time, end_time in completions:
+        by_learner[learner_id].append((activity_date(end_time), session_minutes(start_time, end_time)))
+    if not by_learner:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            stats.learner_id: stats
+            for stats in LearnerStats.objects.select_for_update().filter(learner_id__in=by_learner)
+        }
+        created, updated, rebuild = [], [], []
+        for learner_id, items in by_learner.items():
+            stats = existing.get(learner_id)
+            is_new = stats is None
+            if is_new:
+                stats = LearnerStats(learner_id=learner_id)
+            if not all(add_completion(stats, minutes, day) for day, minutes in sorted(items)):
+                rebuild.append(learner_id)
+                continue
+            stats.updated_at = now
+            (created if is_new else updated).append(stats)
+
+        LearnerStats.objects.bulk_create(created)
+        LearnerStats.objects.bulk_update(updated, STATS_FIELDS)
+        if rebuild:
+            rebuild_learner_stats(rebuild)
+
+
+def rebuild_learner_stats(learner_ids=None):
+    """
+    Recompute stats from completed bookings, for some learners or all.
+
+    Learners without completed bookings end up without a row. Returns the
+    number of rows written.
+    """
+    completed = Booking.objects.filter(status='completed')
+    existing = LearnerStats.objects.all()
+    if learner_ids is not None:
+        completed = completed.filter(learner_id__in=learner_ids)
+        existing = existing.filter(learner_id__in=learner_ids)
+    rows = completed.order_by('learner_id', 'session__end_time').values_list(
+        'learner_id', 'session__start_time', 'session__end_time'
+    )
+
+    written = 0
+    batch = []
+    with transaction.atomic():
+        existing.delete()
+        for learner_id, sessions in groupby(rows.iterator(chunk_size=REBUILD_BATCH_SIZE), key=lambda row: row[0]):
+            stats = LearnerStats(learner_id=learner_id)
+            for _learner_id, start_time, end_time in sessions:
+                add_completion(stats, session_minutes(start_time, end_time), activity_date(end_time))
+            batch.append(stats)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                LearnerStats.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        LearnerStats.objects.bulk_create(batch)
+        written += len(batch)
+    return written
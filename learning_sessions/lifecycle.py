@@ -0,0 +1,76 @@
+"""
+Time-driven session status transitions, applied in bulk.
+
+Sessions move from scheduled to in_progress at their start time and to
+completed at their end time. When a session completes, its confirmed
+bookings become completed and bookings still waiting for payment are
+cancelled. Each transition is one set-based UPDATE, served by the
+(status, start_time) and (status, end_time) indexes, so listings can
+filter on status without anything writing on a read path. The learners
+of newly completed bookings have their LearnerStats updated in the same
+transaction.
+
+advance_sessions() is idempotent and catches up on any backlog in a single
+call. The advance_session_lifecycle management command runs it from cron,
+or with --watch sleeps until the next start or end time.
+"""
+
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .learner_stats import record_completed_sessions
+from .models import Booking, Session
+
+# Sessions whose end time has passed move to completed from these statuses
+OPEN_STATUSES = ('scheduled', 'in_progress')
+
+
+def advance_sessions(now=None):
+    """
+    Apply every status transition that is due at now.
+
+    Returns a dict with the number of rows changed by each transition.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Bookings first, while their sessions can still be matched as open
+        ended = Session.objects.filter(status__in=OPEN_STATUSES, end_time__lte=now)
+        completing = Booking.objects.filter(
+            Q(session__in=ended) | Q(session__status='completed'),
+            status='confirmed',
+        )
+        completions = list(completing.select_for_update().values_list(
+            'learner_id', 'session__start_time', 'session__end_time'
+        ))
+        completed_bookings = completing.update(status='completed')
+        record_completed_sessions(completions)
+        cancelled_bookings = Booking.objects.filter(
+            Q(session__in=ended) | Q(session__status='completed'),
+            status='pending',
+        ).update(status='cancelled')
+
+        # updated_at is set explicitly: update() skips auto_now, and the
+        # reminder scheduler reloads sessions by updated_at
+        completed_sessions = ended.update(status='completed', updated_at=now)
+        started_sessions = Session.objects.filter(
+            status='scheduled', start_time__lte=now, end_time__gt=now,
+        ).update(status='in_progress', updated_at=now)
+
+    return {
+        'started_sessions': started_sessions,
+        'completed_sessions': completed_sessions,
+        'completed_bookings': completed_bookings,
+        'cancelled_bookings': cancelled_bookings,
+    }
+
+
+def next_transition_time(now=None):
+    """The next start or end time at which advance_sessions() has work, or None."""
+    now = now or timezone.now()
+    times = Session.objects.filter(status__in=OPEN_STATUSES).aggregate(
+        next_start=Min('start_time', filter=Q(status='scheduled', start_time__gt=now)),
+        next_end=Min('end_time', filter=Q(end_time__gt=now)),
+    )
+    upcoming = [value for value in times.values() if value is not None]
+    return min(upcoming) if upcoming else None
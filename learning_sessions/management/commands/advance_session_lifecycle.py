@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from learning_sessions.lifecycle import advance_sessions, next_transition_time
+
+
+class Command(BaseCommand):
+    help = 'Move sessions and their bookings to in_progress/completed as their start and end times pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running, waking at each session start or end time')
+        parser.add_argument('--max-sleep', type=int, default=60,
+                            help='With --watch, longest sleep in seconds, so new or rescheduled sessions are seen')
+
+    def handle(self, *args, **options):
+        if not options['watch']:
+            self.report(advance_sessions())
+            return
+
+        self.stdout.write('Watching session start and end times (Ctrl+C to stop)')
+        try:
+            while True:
+                close_old_connections()
+                counts = advance_sessions()
+                if any(counts.values()):
+                    self.report(counts)
+                now = timezone.now()
+                next_time = next_transition_time(now)
+                sleep_for = options['max_sleep']
+                if next_time is not None:
+                    sleep_for = min(sleep_for, (next_time - now).total_seconds())
+                time.sleep(max(sleep_for, 0.5))
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
+
+    def report(self, counts):
+        self.stdout.write(self.style.SUCCESS(
+            f"{timezone.localtime():%Y-%m-%d %H:%M:%S} "
+            f"{counts['started_sessions']} sessions started, "
+            f"{counts['completed_sessions']} completed; "
+            f"{counts['completed_bookings']} bookings completed, "
+            f"{counts['cancelled_bookings']} unpaid bookings cancelled"
+        ))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from learning_sessions.content_model import rebuild_content_model
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TF-IDF content model of upcoming sessions and save it for the workers'
+
+    def handle(self, *args, **options):
+        model = rebuild_content_model()
+        self.stdout.write(self.style.SUCCESS(
+            f"Built content model: {len(model)} sessions, {len(model.vocabulary)} terms, "
+            f"{model.matrix.nbytes / 1024:.1f} KB"
+            + (f", saved to {settings.CONTENT_MODEL_PATH}" if settings.CONTENT_MODEL_PATH else '')
+        ))
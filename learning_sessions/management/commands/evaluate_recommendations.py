@@ -0,0 +1,70 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from learning_sessions.recommendation_eval import (
+    DEFAULT_K, DEFAULT_SAMPLE_SIZE, STRATEGIES, TEST_FRACTION, evaluate,
+)
+
+COLUMNS = (
+    ('precision_at_k', 'P@k'),
+    ('recall_at_k', 'R@k'),
+    ('coverage', 'coverage'),
+    ('diversity', 'diversity'),
+    ('latency_p50_ms', 'p50 ms'),
+    ('latency_p95_ms', 'p95 ms'),
+    ('queries_per_call', 'queries'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Replay past bookings to measure recommendation quality, latency and query counts per strategy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=DEFAULT_K, help='Recommendations per learner')
+        parser.add_argument('--cutoff', help='Split time (ISO 8601); defaults to the --test-fraction split')
+        parser.add_argument('--test-fraction', type=float, default=TEST_FRACTION,
+                            help='Share of the most recent bookings held out for testing')
+        parser.add_argument('--learners', type=int, default=DEFAULT_SAMPLE_SIZE,
+                            help='Learners sampled for evaluation')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the learner sample')
+        parser.add_argument('--strategy', action='append', choices=sorted(STRATEGIES),
+                            help='Strategy to evaluate (repeatable; default: all)')
+        parser.add_argument('--output', default=str(settings.BASE_DIR / 'logs' / 'recommendation_eval.json'),
+                            help='Where to write the JSON report')
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options['cutoff']:
+            try:
+                cutoff = datetime.fromisoformat(options['cutoff'])
+            except ValueError:
+                raise CommandError(f"Invalid --cutoff: {options['cutoff']}")
+            if timezone.is_naive(cutoff):
+                cutoff = timezone.make_aware(cutoff)
+
+        report = evaluate(
+            k=options['k'], cutoff=cutoff, test_fraction=options['test_fraction'],
+            sample_size=options['learners'], seed=options['seed'], strategies=options['strategy'],
+        )
+        if not report['learners']:
+            raise CommandError('No learners booked an open session after the cutoff; nothing to evaluate')
+
+        self.stdout.write(
+            f"Cutoff {report['cutoff']}: {report['learners']} learners, "
+            f"{report['open_sessions']} open sessions, k={report['k']}"
+        )
+        self.stdout.write(f"{'strategy':<14}" + ''.join(f"{label:>11}" for _key, label in COLUMNS))
+        for name, metrics in report['strategies'].items():
+            self.stdout.write(f"{name:<14}" + ''.join(
+                f"{'-' if metrics[key] is None else metrics[key]:>11}" for key, _label in COLUMNS
+            ))
+
+        path = Path(options['output'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Report written to {path}"))
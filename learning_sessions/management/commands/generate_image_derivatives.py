@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from learning_sessions.models import Session
+from peerlearn.images import generate_derivatives, has_derivatives
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Generate resized thumbnail and avatar derivatives for images uploaded before the pipeline existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate derivatives that already exist')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2))
+
+    def handle(self, *args, **options):
+        images = [
+            (name, 'thumbnail')
+            for name in Session.objects.exclude(thumbnail='').exclude(thumbnail__isnull=True)
+            .values_list('thumbnail', flat=True).distinct()
+        ] + [
+            (name, 'avatar')
+            for name in User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .values_list('profile_picture', flat=True).distinct()
+        ]
+        if not options['force']:
+            images = [(name, kind) for name, kind in images if not has_derivatives(name, kind)]
+
+        generated = failed = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            futures = {executor.submit(generate_derivatives, name, kind): name for name, kind in images}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    generated += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {generated} images ({failed} failed)"))
@@ -0,0 +1,408 @@
+"""
+Generate a reproducible synthetic dataset for benchmarking.
+
+Rows are built in memory a chunk at a time and written with bulk_create,
+which skips model save() and post_save signals, so user profiles are
+created explicitly instead of by the users app signal. All randomness comes
+from one seeded generator: the same options always produce the same data.
+"""
+
+import math
+import random
+import time
+import uuid
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from admin_panel.models import AdminAccessLog
+from learning_sessions.models import Booking, Feedback, Session
+from learning_sessions.learner_stats import rebuild_learner_stats
+from learning_sessions.popularity import update_popularity_scores
+from learning_sessions.search import rebuild_index
+from payments.models import Transaction, WithdrawalRequest
+from users.models import LearnerProfile, MentorProfile, User
+
+EMAIL_DOMAIN = 'synthetic.peerlearn.test'
+
+# Topic vocabulary, most popular first; tag popularity follows a Zipf law
+TAGS = [
+    'python', 'javascript', 'react', 'data science', 'machine learning', 'django',
+    'web development', 'sql', 'java', 'ui design', 'career', 'interview prep',
+    'aws', 'docker', 'statistics', 'typescript', 'node.js', 'flutter', 'android',
+    'ios', 'deep learning', 'nlp', 'excel', 'product management', 'kubernetes',
+    'rust', 'go', 'system design', 'algorithms', 'c++', 'cybersecurity', 'figma',
+    'pandas', 'tableau', 'devops', 'blockchain', 'unity', 'marketing', 'writing',
+    'public speaking',
+]
+
+TITLE_TEMPLATES = [
+    'Introduction to {tag}', '{tag} for beginners', 'Hands-on {tag} workshop',
+    'Advanced {tag} techniques', '{tag} Q&A and code review', 'Mastering {tag}',
+    'Build a project with {tag}', '{tag} interview practice',
+]
+
+FIRST_NAMES = [
+    'Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Divya',
+    'Rohan', 'Meera', 'Karan', 'Isha', 'Aditya', 'Kavya', 'Siddharth', 'Neha',
+]
+LAST_NAMES = [
+    'Sharma', 'Patel', 'Nair', 'Iyer', 'Reddy', 'Gupta', 'Menon', 'Das',
+    'Singh', 'Kumar', 'Joshi', 'Rao', 'Pillai', 'Mehta', 'Bose', 'Verma',
+]
+
+PRICES = [Decimal(price) for price in ('0', '199', '299', '499', '799', '999', '1499', '2499')]
+PRICE_WEIGHTS = [10, 15, 20, 20, 15, 10, 6, 4]
+RATING_WEIGHTS = [3, 5, 12, 35, 45]  # 1 to 5 stars
+
+ADMIN_ACTIONS = ['page_view', 'page_view', 'page_view', 'login_attempt', 'access_attempt', 'generate_key']
+ADMIN_STATUSES = ['success'] * 8 + ['failed', 'blocked']
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let bulk_create keep explicit values for auto_now/auto_now_add fields."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ZipfSampler:
+    """Draw indexes 0..n-1 where index k has weight 1 / (k + 1) ** exponent."""
+
+    def __init__(self, rng, n, exponent=1.1):
+        self.rng = rng
+        self.cumulative = list(accumulate(1 / (k + 1) ** exponent for k in range(n)))
+        self.total = self.cumulative[-1]
+
+    def sample(self):
+        return min(bisect(self.cumulative, self.rng.random() * self.total), len(self.cumulative) - 1)
+
+
+class Command(BaseCommand):
+    help = 'Generate a seeded synthetic dataset (users, sessions, bookings, payments, feedback, admin logs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learners', type=int, default=1000)
+        parser.add_argument('--mentors', type=int, default=100)
+        parser.add_argument('--sessions-per-mentor', type=int, default=20)
+        parser.add_argument('--bookings-per-session', type=float, default=5.0,
+                            help='Average bookings per session')
+        parser.add_argument('--feedback-rate', type=float, default=0.4,
+                            help='Share of completed bookings that leave feedback')
+        parser.add_argument('--admin-logs', type=int, default=1000)
+        parser.add_argument('--days-back', type=int, default=365,
+                            help='How far in the past the data starts')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--skip-search-index', action='store_true',
+                            help='Do not rebuild the session search index afterwards')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists():
+            raise CommandError(
+                f"Synthetic users (@{EMAIL_DOMAIN}) already exist; generate into an empty database"
+            )
+        if options['learners'] < 1 or options['mentors'] < 1:
+            raise CommandError('--learners and --mentors must be at least 1')
+
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options['days_back'])
+        # Hashing is deliberately slow, so every synthetic user shares one hash
+        self.password = make_password('synthetic-password')
+        started = time.monotonic()
+
+        with historical_timestamps(User, LearnerProfile, MentorProfile, Session, Booking, Transaction, Feedback,
+                                   WithdrawalRequest):
+            learner_ids = self.create_learners(options['learners'])
+            mentor_ids = self.create_mentors(options['mentors'])
+            self.create_sessions_and_bookings(mentor_ids, learner_ids, options)
+            self.create_withdrawals(mentor_ids)
+        self.update_mentor_ratings()
+        self.stdout.write(f"Rebuilt stats for {rebuild_learner_stats()} learners")
+        self.stdout.write(f"Scored popularity of {update_popularity_scores()} sessions")
+        self.create_admin_logs(options['admin_logs'])
+
+        if not options['skip_search_index']:
+            rebuild_index()
+            self.stdout.write('Rebuilt session search index')
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - started:.1f}s"))
+
+    def random_time(self, start=None, end=None):
+        start = start or self.start
+        end = end or self.now
+        return start + (end - start) * self.rng.random()
+
+    def create_users(self, count, role, label):
+        """Create users in chunks and return their ids in creation order."""
+        ids = []
+        for offset in range(0, count, self.chunk_size):
+            users = []
+            for i in range(offset, min(offset + self.chunk_size, count)):
+                # Sign-ups grow over time: later dates are more likely
+                joined = self.start + (self.now - self.start) * math.sqrt(self.rng.random())
+                users.append(User(
+                    email=f'{label}{i}@{EMAIL_DOMAIN}',
+                    password=self.password,
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    role=role,
+                    date_joined=joined,
+                ))
+            with transaction.atomic():
+                ids.extend(user.pk for user in User.objects.bulk_create(users))
+            self.progress(label + 's', len(ids), count)
+        return ids
+
+    def create_learners(self, count):
+        user_ids = self.create_users(count, 'learner', 'learner')
+        self.bulk_insert(LearnerProfile, (
+            LearnerProfile(user_id=user_id, career_goals=self.rng.choice(TAGS).title(),
+                           created_at=self.now, updated_at=self.now)
+            for user_id in user_ids
+        ), len(user_ids), 'learner profiles')
+        return user_ids
+
+    def create_mentors(self, count):
+        user_ids = self.create_users(count, 'mentor', 'mentor')
+        self.mentor_tags = {}
+        profiles = []
+        for user_id in user_ids:
+            profiles.append(MentorProfile(
+                user_id=user_id,
+                expertise='',
+                bio='Synthetic mentor profile',
+                hourly_rate=self.rng.choice(PRICES[1:]),
+                is_approved=self.rng.random() < 0.9,
+                created_at=self.now,
+                updated_at=self.now,
+            ))
+        with transaction.atomic():
+            MentorProfile.objects.bulk_create(profiles, batch_size=self.chunk_size)
+
+        # Each mentor teaches a few related topics, which drive their session tags
+        self.tag_sampler = ZipfSampler(self.rng, len(TAGS))
+        mentor_ids = []
+        for profile in MentorProfile.objects.filter(user_id__in=user_ids).order_by('id').only('id'):
+            topics = {TAGS[self.tag_sampler.sample()] for _ in range(3)}
+            self.mentor_tags[profile.id] = sorted(topics)
+            mentor_ids.append(profile.id)
+        for ids in self.chunks(mentor_ids):
+            profiles = [
+                MentorProfile(id=mentor_id, expertise=', '.join(self.mentor_tags[mentor_id]).title())
+                for mentor_id in ids
+            ]
+            MentorProfile.objects.bulk_update(profiles, ['expertise'])
+        self.progress('mentor profiles', len(mentor_ids), len(mentor_ids))
+        return mentor_ids
+
+    def create_sessions_and_bookings(self, mentor_ids, learner_ids, options):
+        """Create sessions chunk by chunk, each followed by its bookings and payments."""
+        total = len(mentor_ids) * options['sessions_per_mentor']
+        learner_sampler = ZipfSampler(self.rng, len(learner_ids), exponent=0.8)
+        future_end = self.now + timedelta(days=60)
+        created = bookings_created = transactions_created = feedback_created = 0
+
+        plan = [mentor_id for mentor_id in mentor_ids for _ in range(options['sessions_per_mentor'])]
+        for chunk in self.chunks(plan):
+            sessions = []
+            attendees = []
+            for mentor_id in chunk:
+                topics = self.mentor_tags[mentor_id]
+                main_tag = self.rng.choice(topics)
+                extra = {TAGS[self.tag_sampler.sample()] for _ in range(self.rng.randint(0, 2))}
+                start = self.random_time(self.start, future_end)
+                max_participants = self.rng.choice([1, 5, 10, 20, 50])
+                wanted = min(max_participants, self.poisson(options['bookings_per_session']), len(learner_ids))
+                learners = set()
+                while len(learners) < wanted:
+                    learners.add(learner_ids[learner_sampler.sample()])
+
+                if start > self.now:
+                    status = 'scheduled'
+                elif start + timedelta(hours=1) > self.now:
+                    status = 'in_progress'
+                else:
+                    status = 'cancelled' if self.rng.random() < 0.05 else 'completed'
+                created_at = min(start - timedelta(days=self.rng.randint(1, 30)), self.now)
+                sessions.append(Session(
+                    mentor_id=mentor_id,
+                    title=self.rng.choice(TITLE_TEMPLATES).format(tag=main_tag.title()),
+                    description=f"A session about {main_tag} covering {', '.join(sorted({main_tag} | extra))}.",
+                    topics_to_cover='\n'.join(sorted({main_tag} | extra)),
+                    start_time=start,
+                    end_time=start + timedelta(minutes=self.rng.choice([30, 45, 60, 90, 120])),
+                    price=self.rng.choices(PRICES, PRICE_WEIGHTS)[0],
+                    max_participants=max_participants,
+                    current_participants=len(learners),
+                    status=status,
+                    tags=', '.join([main_tag] + sorted(extra - {main_tag})),
+                    created_at=max(created_at, self.start),
+                    updated_at=self.now,
+                ))
+                attendees.append(sorted(learners))
+
+            with transaction.atomic():
+                Session.objects.bulk_create(sessions)
+                bookings = []
+                for session, learners in zip(sessions, attendees):
+                    for learner_id in learners:
+                        bookings.append(self.build_booking(session, learner_id))
+                Booking.objects.bulk_create(bookings, batch_size=self.chunk_size)
+
+                payments = []
+                feedback = []
+                for booking in bookings:
+                    if booking.payment_complete and booking.final_price > 0:
+                        payments.append(Transaction(
+                            reference_id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                            booking_id=booking.pk,
+                            amount=booking.final_price,
+                            status='refunded' if booking.status == 'cancelled' else 'completed',
+                            payment_method='razorpay',
+                            payment_gateway_reference=f'pay_{self.rng.getrandbits(48):012x}',
+                            created_at=booking.created_at,
+                            updated_at=booking.created_at,
+                        ))
+                    if booking.status == 'completed' and self.rng.random() < options['feedback_rate']:
+                        feedback.append(Feedback(
+                            booking_id=booking.pk,
+                            rating=self.rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                            comments='',
+                            created_at=booking.session_end + timedelta(hours=self.rng.randint(1, 72)),
+                        ))
+                Transaction.objects.bulk_create(payments, batch_size=self.chunk_size)
+                Feedback.objects.bulk_create(feedback, batch_size=self.chunk_size)
+
+            created += len(sessions)
+            bookings_created += len(bookings)
+            transactions_created += len(payments)
+            feedback_created += len(feedback)
+            self.progress('sessions', created, total,
+                          f"{bookings_created} bookings, {transactions_created} transactions, "
+                          f"{feedback_created} feedback")
+
+    def build_booking(self, session, learner_id):
+        created_at = self.random_time(session.created_at, min(session.start_time, self.now))
+        if session.status == 'completed':
+            status = 'completed' if self.rng.random() < 0.95 else 'cancelled'
+        elif session.status == 'cancelled':
+            status = 'cancelled'
+        else:
+            status = 'confirmed' if self.rng.random() < 0.9 else 'pending'
+        booking = Booking(
+            session_id=session.pk,
+            learner_id=learner_id,
+            status=status,
+            payment_complete=status != 'pending',
+            final_price=session.price,
+            created_at=created_at,
+        )
+        # Remembered for feedback timestamps; not a model field
+        booking.session_end = session.end_time
+        return booking
+
+    def update_mentor_ratings(self):
+        """Store each mentor's average rating, as submit_feedback would."""
+        ratings = (
+            Feedback.objects.values('booking__session__mentor_id')
+            .annotate(avg=Avg('rating'), count=Count('id'))
+            .order_by()
+        )
+        profiles = [
+            MentorProfile(
+                id=row['booking__session__mentor_id'],
+                average_rating=Decimal(row['avg']).quantize(Decimal('0.01')),
+                total_reviews=row['count'],
+            )
+            for row in ratings
+        ]
+        with transaction.atomic():
+            MentorProfile.objects.bulk_update(profiles, ['average_rating', 'total_reviews'], batch_size=self.chunk_size)
+        self.progress('mentor ratings', len(profiles), len(profiles))
+
+    def create_withdrawals(self, mentor_ids):
+        """Give roughly a third of the mentors a few withdrawal requests."""
+        withdrawals = []
+        for mentor_id in mentor_ids:
+            if self.rng.random() < 0.33:
+                for _ in range(self.rng.randint(1, 3)):
+                    created_at = self.random_time()
+                    withdrawals.append(WithdrawalRequest(
+                        mentor_id=mentor_id,
+                        amount=Decimal(self.rng.randrange(500, 20000, 100)),
+                        status=self.rng.choice(['pending', 'completed', 'completed', 'rejected']),
+                        account_details='Synthetic bank account',
+                        created_at=created_at,
+                        updated_at=created_at,
+                    ))
+        self.bulk_insert(WithdrawalRequest, iter(withdrawals), len(withdrawals), 'withdrawal requests')
+
+    def create_admin_logs(self, count):
+        ip_pool = [f'10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}' for _ in range(200)]
+        self.bulk_insert(AdminAccessLog, (
+            AdminAccessLog(
+                ip_address=self.rng.choice(ip_pool),
+                action=self.rng.choice(ADMIN_ACTIONS),
+                path=self.rng.choice(['/admin-panel/', '/admin-panel/users/', '/admin-panel/analytics/', '/admin-panel/security/']),
+                status=self.rng.choice(ADMIN_STATUSES),
+                user_agent='Mozilla/5.0 (synthetic)',
+                timestamp=self.random_time(),
+            )
+            for _ in range(count)
+        ), count, 'admin logs')
+
+    def bulk_insert(self, model, objects, total, label):
+        """bulk_create a generator of objects in chunks."""
+        written = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.chunk_size:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+                self.progress(label, written, total)
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            written += len(batch)
+            self.progress(label, written, total)
+
+    def chunks(self, items):
+        for offset in range(0, len(items), self.chunk_size):
+            yield items[offset:offset + self.chunk_size]
+
+    def poisson(self, mean):
+        # Knuth's method is fine for the small means used here
+        limit = math.exp(-mean)
+        count, product = 0, self.rng.random()
+        while product > limit:
+            count += 1
+            product *= self.rng.random()
+        return count
+
+    def progress(self, label, done, total, extra=''):
+        if done == total or done % (self.chunk_size * 10) == 0:
+            suffix = f" ({extra})" if extra else ''
+            self.stdout.write(f"  {label}: {done}/{total}{suffix}")
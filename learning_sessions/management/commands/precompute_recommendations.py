@@ -0,0 +1,29 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from learning_sessions.recommendation_batch import DEFAULT_TOP_K, SHARD_SIZE, precompute_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Precompute the top recommended sessions of every active learner (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                            help='Sessions stored per learner')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes scoring learner shards')
+        parser.add_argument('--shard-size', type=int, default=SHARD_SIZE,
+                            help='Learners scored together in one matrix product')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        counts = precompute_recommendations(
+            top_k=options['top_k'], workers=options['workers'], shard_size=options['shard_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked sessions for {counts['learners']} learners in {counts['shards']} shards: "
+            f"{counts['rows_written']} rows written, {counts['rows_deleted']} stale rows deleted "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from learning_sessions.learner_stats import rebuild_learner_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute learner hours, completion counts and streaks from completed bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learner', type=int, action='append', dest='learner_ids',
+                            help='Only rebuild this learner (user id); can be repeated')
+
+    def handle(self, *args, **options):
+        written = rebuild_learner_stats(options['learner_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {written} learners"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from learning_sessions.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text session search index from the session table'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt session search index ({connection.vendor})"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from learning_sessions.popularity import update_popularity_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute the time-decayed popularity scores of upcoming sessions (run from cron)'
+
+    def handle(self, *args, **options):
+        scored = update_popularity_scores()
+        self.stdout.write(self.style.SUCCESS(f"Updated popularity scores: {scored} sessions with recent bookings"))
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# The schema and rebuild SQL are copied here rather than imported from
+# learning_sessions.search, so later edits to that module cannot change
+# what this migration does.
+
+FTS_TABLE = 'learning_sessions_session_fts'
+PG_TABLE = 'learning_sessions_session_search'
+
+DOCUMENT_SELECT = """
+    SELECT s.id, s.title, s.description, s.topics_to_cover,
+           REPLACE(s.tags, ',', ' '), m.expertise
+    FROM learning_sessions_session s
+    JOIN users_mentorprofile m ON m.id = s.mentor_id
+"""
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(d.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(d.tags, '') || ' ' || coalesce(d.expertise, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(d.topics, '') || ' ' || coalesce(d.description, '')), 'C')"
+)
+
+
+def create_index(apps, schema_editor):
+    """Create the full-text index and fill it from existing sessions."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, topics, tags, expertise, "
+            "tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, topics, tags, expertise) "
+            + DOCUMENT_SELECT
+        )
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+            "session_id bigint PRIMARY KEY REFERENCES learning_sessions_session (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_gin ON {PG_TABLE} USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {PG_TABLE} (session_id, document) "
+            f"SELECT id, {PG_DOCUMENT} FROM ({DOCUMENT_SELECT}) "
+            "AS d (id, title, description, topics, tags, expertise)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {PG_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0002_session_thumbnail_session_topics_to_cover'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0003_session_search_index'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['status', 'start_time', 'id'], name='learning_se_status_868d46_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0004_session_catalog_index'),
+        ('users', '0002_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['updated_at'], name='learning_se_updated_820ebc_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0005_session_updated_at_index'),
+        ('users', '0002_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['status', 'end_time'], name='learning_se_status_077e6b_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-19 11:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0006_session_status_end_time_index'),
+        ('users', '0002_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerStats',
+            fields=[
+                ('learner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='learner_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_minutes', models.PositiveIntegerField(default=0, verbose_name='total minutes')),
+                ('completed_sessions', models.PositiveIntegerField(default=0, verbose_name='completed sessions')),
+                ('current_streak', models.PositiveIntegerField(default=0, verbose_name='current streak')),
+                ('longest_streak', models.PositiveIntegerField(default=0, verbose_name='longest streak')),
+                ('last_activity_date', models.DateField(blank=True, null=True, verbose_name='last activity date')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'learner stats',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 12:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0007_learner_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='rank')),
+                ('score', models.FloatField(verbose_name='score')),
+                ('computed_at', models.DateTimeField(verbose_name='computed at')),
+                ('learner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_recommendations', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='learning_sessions.session')),
+            ],
+            options={
+                'ordering': ['learner', 'rank'],
+                'indexes': [models.Index(fields=['computed_at'], name='learning_se_compute_b6425c_idx')],
+                'unique_together': {('learner', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0008_session_recommendations'),
+        ('users', '0002_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='popularity_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='popularity score'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['status', '-popularity_score'], name='learning_se_status_0cc241_idx'),
+        ),
+    ]
@@ -3,114 +3,58 @@ ML-powered session recommendation system.
 
 This module provides recommendation algorithms for suggesting relevant sessions
 to learners based on their interests, past sessions, and behavioral patterns.
+
+The compute_* functions run the algorithms against the database; views use
+the get_* wrappers, which keep each learner's results in
+learning_sessions.recommendation_cache. Personalized recommendations are
+read from the rankings stored by the nightly precompute_recommendations
+job (learning_sessions.recommendation_batch) and only computed live for
+learners it has not covered yet.
 """
 
-import numpy as np
-from django.db.models import Q
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, F, OuterRef
 from django.utils import timezone
 
-from .models import Session, Booking, Feedback
-from users.models import LearnerProfile
+from .models import Session, Booking, Feedback, SessionRecommendation
+from .recommendation_cache import cached_recommendations
 
 User = get_user_model()
 
+# Extra content-based candidates ranked beyond the requested limit
+CANDIDATE_PADDING = 5
 
-def get_content_based_recommendations(user, limit=5):
+
+def compute_content_based_recommendations(user, limit=5):
     """
     Generate content-based recommendations for a user.
     
-    Analyzes the user's past bookings, interests, and profile data to suggest
-    similar sessions they might be interested in.
+    Ranks upcoming sessions by the cosine similarity of their TF-IDF vectors
+    to the user's booking history and career goals (see
+    learning_sessions.content_model).
     
     Args:
         user: The User object to generate recommendations for
         limit: Maximum number of recommendations to return
         
     Returns:
-        QuerySet of recommended Session objects
+        List of recommended Session objects, most relevant first
     """
-    # Get user's past bookings
-    past_bookings = Booking.objects.filter(
-        learner=user,
-        status__in=['confirmed', 'completed']
-    ).select_related('session')
-    
-    # If user has no past bookings, fall back to other recommendation methods
-    if not past_bookings.exists():
-        try:
-            # Get learner profile
-            learner_profile = LearnerProfile.objects.get(user=user)
-            
-            # Use career goals as a source of interests since we don't have a dedicated interests field
-            career_goals = getattr(learner_profile, 'career_goals', '') or ''
-            
-            # Find sessions that match the user's career goals
-            interest_keywords = [kw.strip() for kw in career_goals.split(',') if kw.strip()]
-            
-            if interest_keywords:
-                # Build a query that checks if any keyword is in the session tags or title
-                query = Q()
-                for keyword in interest_keywords:
-                    query |= Q(tags__icontains=keyword) | Q(title__icontains=keyword)
-                    
-                # Filter upcoming sessions with approved mentors
-                recommendations = Session.objects.filter(
-                    query,
-                    status='scheduled',
-                    start_time__gt=timezone.now(),
-                    mentor__is_approved=True
-                ).exclude(
-                    # Exclude sessions the user has already booked
-                    id__in=Booking.objects.filter(learner=user).values_list('session_id', flat=True)
-                ).order_by('start_time')[:limit]
-                
-                if recommendations.exists():
-                    return recommendations
-        except (LearnerProfile.DoesNotExist, AttributeError) as e:
-            # Log the error for debugging
-            print(f"ML career goals recommendation error: {str(e)}")
-            pass
-    
-    # If user has past bookings, recommend similar sessions
-    else:
-        # Extract tags from past sessions
-        tags_list = []
-        for booking in past_bookings:
-            if booking.session.tags:
-                tags_list.extend([tag.strip() for tag in booking.session.tags.split(',')])
-        
-        # Count tag frequencies
-        tag_counts = {}
-        for tag in tags_list:
-            if tag:
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # If we have tags, find sessions with similar tags
-        if tag_counts:
-            # Sort tags by frequency (most frequent first)
-            sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-            top_tags = [tag for tag, count in sorted_tags[:5]]  # Use top 5 tags
-            
-            # Build query for sessions with top tags
-            query = Q()
-            for tag in top_tags:
-                query |= Q(tags__icontains=tag)
-            
-            # Filter upcoming sessions with the top tags
-            recommendations = Session.objects.filter(
-                query,
-                status='scheduled',
-                start_time__gt=timezone.now(),
-                mentor__is_approved=True
-            ).exclude(
-                # Exclude sessions the user has already booked
-                id__in=Booking.objects.filter(learner=user).values_list('session_id', flat=True)
-            ).order_by('start_time')[:limit]
-            
+    # Imported here so that loading this module does not load NumPy
+    from .content_model import rank_sessions_for
+
+    # Rank a few extra sessions in case some belong to mentors no longer approved
+    ranked_ids = rank_sessions_for(user, limit + CANDIDATE_PADDING)
+    if ranked_ids:
+        sessions = Session.objects.filter(mentor__is_approved=True).in_bulk(ranked_ids)
+        recommendations = [sessions[session_id] for session_id in ranked_ids if session_id in sessions][:limit]
+        if recommendations:
             return recommendations
     
-    # Fallback to popular sessions if no recommendations were generated
+    # Fallback to popular sessions if nothing matches the user's interests
     return get_popular_sessions(limit)
 
 
@@ -136,7 +80,7 @@ def get_collaborative_filtering_recommendations(user, limit=5):
     
     # If user has no bookings, fall back to content-based recommendations
     if not user_sessions:
-        return get_content_based_recommendations(user, limit)
+        return compute_content_based_recommendations(user, limit)
     
     # Find other users who booked at least one of the same sessions
     similar_users = User.objects.filter(
@@ -146,7 +90,7 @@ def get_collaborative_filtering_recommendations(user, limit=5):
     
     # If no similar users found, fall back to content-based recommendations
     if not similar_users.exists():
-        return get_content_based_recommendations(user, limit)
+        return compute_content_based_recommendations(user, limit)
     
     # Get sessions booked by similar users that the current user hasn't booked
     recommendations = Session.objects.filter(
@@ -161,7 +105,7 @@ def get_collaborative_filtering_recommendations(user, limit=5):
     
     # If we couldn't find enough recommendations, supplement with content-based
     if recommendations.count() < limit:
-        content_recommendations = get_content_based_recommendations(
+        content_recommendations = compute_content_based_recommendations(
             user, limit - recommendations.count()
         )
         
@@ -179,43 +123,33 @@ def get_collaborative_filtering_recommendations(user, limit=5):
     return recommendations
 
 
-def get_popular_sessions(limit=5):
+def get_popular_sessions(limit=5, learner=None):
     """
-    Get the most popular upcoming sessions based on booking counts.
+    Get the most popular upcoming sessions that still have free seats.
+    
+    Sessions are ordered by their time-decayed popularity score (see
+    learning_sessions.popularity); sessions without recent bookings follow,
+    newest first, so new users always get a full list.
     
     Args:
         limit: Maximum number of sessions to return
+        learner: If given, sessions this user has booked are left out
         
     Returns:
         QuerySet of popular Session objects
     """
-    # Get upcoming scheduled sessions with approved mentors
-    upcoming_sessions = Session.objects.filter(
+    sessions = Session.objects.filter(
         status='scheduled',
         start_time__gt=timezone.now(),
-        mentor__is_approved=True
+        mentor__is_approved=True,
+        current_participants__lt=F('max_participants'),
     )
-    
-    # Annotate with booking count and order by popularity
-    popular_sessions = upcoming_sessions.filter(
-        bookings__status__in=['confirmed', 'completed']
-    ).distinct().order_by('-current_participants', 'start_time')[:limit]
-    
-    # If we don't have enough popular sessions, add some recent ones
-    if popular_sessions.count() < limit:
-        # Get additional sessions, sorted by recently created
-        additional_sessions = upcoming_sessions.exclude(
-            id__in=popular_sessions.values_list('id', flat=True)
-        ).order_by('-created_at')[:limit - popular_sessions.count()]
-        
-        # Convert popular_sessions to a list and extend it
-        popular_sessions = list(popular_sessions)
-        popular_sessions.extend(additional_sessions)
-    
-    return popular_sessions
+    if learner is not None:
+        sessions = sessions.exclude(Exists(Booking.objects.filter(session=OuterRef('pk'), learner=learner)))
+    return sessions.select_related('mentor__user').order_by('-popularity_score', '-created_at')[:limit]
 
 
-def get_personalized_recommendations(user, limit=10):
+def compute_personalized_recommendations(user, limit=10):
     """
     Generate personalized session recommendations for a user.
     
@@ -241,7 +175,7 @@ def get_personalized_recommendations(user, limit=10):
     collaborative_recommendations = get_collaborative_filtering_recommendations(user, collaborative_count)
     
     # Get content-based recommendations
-    content_recommendations = get_content_based_recommendations(user, content_count)
+    content_recommendations = compute_content_based_recommendations(user, content_count)
     
     # Combine the recommendations (avoiding duplicates)
     recommendation_ids = set()
@@ -261,10 +195,80 @@ def get_personalized_recommendations(user, limit=10):
     
     # If we still don't have enough, add popular sessions
     if len(final_recommendations) < limit:
-        popular_sessions = get_popular_sessions(limit - len(final_recommendations))
+        popular_sessions = get_popular_sessions(limit - len(final_recommendations), learner=user)
         for session in popular_sessions:
             if session.id not in recommendation_ids and len(final_recommendations) < limit:
                 recommendation_ids.add(session.id)
                 final_recommendations.append(session)
     
-    return final_recommendations
\ No newline at end of file
+    return final_recommendations
+
+def precomputed_session_ids(user, limit=10):
+    """
+    Ids of the sessions ranked for the user by the precompute_recommendations job.
+    
+    Sessions that can no longer be booked (started, cancelled, full or
+    with a mentor no longer approved) and sessions the user booked since
+    the job ran are left out. Returns None when the job has not covered
+    the user recently, e.g. new learners.
+    """
+    now = timezone.now()
+    fresh_since = now - timedelta(seconds=settings.RECOMMENDATION_PRECOMPUTE_MAX_AGE)
+    rows = SessionRecommendation.objects.filter(learner=user, computed_at__gte=fresh_since)
+    session_ids = list(rows.filter(
+        session__status='scheduled',
+        session__start_time__gt=now,
+        session__current_participants__lt=F('session__max_participants'),
+        session__mentor__is_approved=True,
+    ).exclude(
+        Exists(Booking.objects.filter(session=OuterRef('session'), learner=user))
+    ).order_by('rank').values_list('session_id', flat=True)[:limit])
+    if not session_ids and not rows.exists():
+        return None
+    return session_ids
+
+
+def personalized_session_ids(user, limit=10):
+    """
+    Ranked ids of personalized recommendations.
+    
+    Read from the precomputed rankings, padded with popular sessions the
+    user has not booked when bookings or session changes since the last
+    run have used some up;
+    users the job has not covered get recommendations computed live.
+    """
+    session_ids = precomputed_session_ids(user, limit)
+    if session_ids is None:
+        return [session.id for session in compute_personalized_recommendations(user, limit)]
+    if len(session_ids) < limit:
+        # Enough extra candidates to skip the ones already in the list
+        for session in get_popular_sessions(limit + len(session_ids), learner=user):
+            if session.id not in session_ids and len(session_ids) < limit:
+                session_ids.append(session.id)
+    return session_ids
+
+
+def content_based_session_ids(user, limit=5):
+    """Ranked ids of content-based recommendations."""
+    return [session.id for session in compute_content_based_recommendations(user, limit)]
+
+
+def get_content_based_recommendations(user, limit=5):
+    """
+    Content-based recommendations for a learner, served from the per-learner cache.
+    
+    Returns a list of Session objects with mentor and mentor user loaded.
+    """
+    return cached_recommendations(user, 'content', limit, content_based_session_ids)
+
+
+def get_personalized_recommendations(user, limit=10):
+    """
+    Personalized recommendations, served from the per-learner cache.
+    
+    Anonymous users and non-learners get popular sessions, which are not
+    cached per user. Returns a list of Session objects.
+    """
+    if not user.is_authenticated or user.role != 'learner':
+        return get_popular_sessions(limit)
+    return cached_recommendations(user, 'personalized', limit, personalized_session_ids)
@@ -33,6 +33,8 @@ class Session(models.Model):
     status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='scheduled')
     tags = models.CharField(_('tags'), max_length=255, blank=True, help_text=_("Comma-separated tags"))
     thumbnail = models.ImageField(_('thumbnail'), upload_to='session_thumbnails/', blank=True, null=True)
+    # Time-decayed booking velocity, recomputed by learning_sessions.popularity
+    popularity_score = models.FloatField(_('popularity score'), default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -41,6 +43,14 @@ class Session(models.Model):
         indexes = [
             models.Index(fields=['start_time']),
             models.Index(fields=['status']),
+            # Keyset pagination of the upcoming session catalog
+            models.Index(fields=['status', 'start_time', 'id']),
+            # Bulk completion of ended sessions (learning_sessions.lifecycle)
+            models.Index(fields=['status', 'end_time']),
+            # Incremental reloads of the session reminder scheduler
+            models.Index(fields=['updated_at']),
+            # Popular and trending session lists
+            models.Index(fields=['status', '-popularity_score']),
         ]
     
     def __str__(self):
@@ -126,3 +136,65 @@ class Feedback(models.Model):
     
     def __str__(self):
         return f"Feedback: {self.booking.session.title} - {self.rating}/5"
+
+
+class LearnerStats(models.Model):
+    """
+    Running totals of a learner's completed sessions, for the dashboard.
+    
+    Updated by learning_sessions.learner_stats as bookings complete, and
+    rebuilt from booking history by the rebuild_learner_stats command.
+    Streaks count consecutive local calendar days with a completed session.
+    """
+    
+    learner = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='learner_stats')
+    total_minutes = models.PositiveIntegerField(_('total minutes'), default=0)
+    completed_sessions = models.PositiveIntegerField(_('completed sessions'), default=0)
+    current_streak = models.PositiveIntegerField(_('current streak'), default=0)
+    longest_streak = models.PositiveIntegerField(_('longest streak'), default=0)
+    last_activity_date = models.DateField(_('last activity date'), null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = _('learner stats')
+    
+    def __str__(self):
+        return f"Stats: {self.learner.email}"
+    
+    @property
+    def total_hours(self):
+        """Total learning time in hours, to one decimal place."""
+        return round(self.total_minutes / 60, 1)
+    
+    def streak_on(self, date):
+        """The current streak as of date; it lapses once a whole day passes without a session."""
+        if self.last_activity_date is None or (date - self.last_activity_date).days > 1:
+            return 0
+        return self.current_streak
+
+
+class SessionRecommendation(models.Model):
+    """
+    A learner's top-ranked upcoming sessions, precomputed in bulk.
+    
+    Written by the precompute_recommendations command (see
+    learning_sessions.recommendation_batch); every row of one run shares the
+    same computed_at, and rows left over from earlier runs are deleted.
+    """
+    
+    learner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='session_recommendations')
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name='recommendations')
+    rank = models.PositiveSmallIntegerField(_('rank'))
+    score = models.FloatField(_('score'))
+    computed_at = models.DateTimeField(_('computed at'))
+    
+    class Meta:
+        ordering = ['learner', 'rank']
+        unique_together = ('learner', 'rank')
+        indexes = [
+            # Removal of rows left over from earlier runs
+            models.Index(fields=['computed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.learner.email} #{self.rank}: {self.session.title}"
@@ -0,0 +1,70 @@
+"""
+Time-decayed popularity of upcoming sessions.
+
+A session's popularity_score is its recent booking velocity: every
+confirmed or completed booking counts exp(-age / tau), so its weight halves
+every HALF_LIFE and a burst of bookings this week outranks a pile of them
+from last month. The sum is divided by the square root of the session's
+capacity, so a small session filling up is not outranked by a large one
+merely for having more seats.
+
+update_popularity_scores() reads the bookings of upcoming sessions made
+within WINDOW in one grouped query, bucketed by hour, and writes the
+scores in bulk; the update_popularity_scores command runs it from cron and
+the nightly recommendation precompute runs it first. Popular lists are then
+one ORDER BY popularity_score LIMIT on the (status, popularity_score)
+index. Scores are written without touching updated_at, which would make
+the content model and reminder scheduler reload every session.
+"""
+
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Booking, Session
+
+HALF_LIFE = timedelta(days=3)
+# Bookings older than this weigh less than 1/256 and are ignored
+WINDOW = 8 * HALF_LIFE
+
+WRITE_BATCH_SIZE = 500
+
+
+def decay_weight(age):
+    """Weight of a booking made age ago."""
+    return 0.5 ** (max(age.total_seconds(), 0) / HALF_LIFE.total_seconds())
+
+
+def update_popularity_scores(now=None):
+    """Recompute the popularity of every upcoming session; returns the number scored."""
+    now = now or timezone.now()
+    buckets = Booking.objects.filter(
+        status__in=['confirmed', 'completed'],
+        created_at__gte=now - WINDOW,
+        session__status='scheduled',
+        session__start_time__gt=now,
+    ).values(
+        'session_id', 'session__max_participants', hour=TruncHour('created_at'),
+    ).annotate(bookings=Count('id')).order_by()
+
+    velocity = defaultdict(float)
+    capacity = {}
+    for bucket in buckets:
+        # Bookings in a bucket are taken to be made in the middle of the hour
+        age = now - bucket['hour'] - timedelta(minutes=30)
+        velocity[bucket['session_id']] += bucket['bookings'] * decay_weight(age)
+        capacity[bucket['session_id']] = bucket['session__max_participants']
+
+    sessions = [
+        Session(id=session_id, popularity_score=score / math.sqrt(max(capacity[session_id], 1)))
+        for session_id, score in velocity.items()
+    ]
+    with transaction.atomic():
+        Session.objects.filter(popularity_score__gt=0).update(popularity_score=0)
+        Session.objects.bulk_update(sessions, ['popularity_score'], batch_size=WRITE_BATCH_SIZE)
+    return len(sessions)
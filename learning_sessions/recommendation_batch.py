@@ -0,0 +1,137 @@
+"""
+Bulk precompute of personalized recommendations for every active learner.
+
+The precompute_recommendations command runs this nightly. Active learners
+are split into shards of SHARD_SIZE and scored in a process pool. Each
+shard loads the bookings and career goals of all its learners and the
+ids of the sessions that can still be booked in three queries, and
+ranks those sessions for the whole shard with one matrix product against
+the TF-IDF content model (see learning_sessions.content_model). The model
+is rebuilt and saved before the pool starts, so every worker reads the
+same one. Learners whose
+ranking comes up short are padded with popular sessions, after the
+popularity scores are brought up to date.
+
+The parent process writes each shard's rows as they arrive, upserting on
+(learner, rank), then deletes every row from earlier runs, which also
+removes learners who are no longer active. Workers never write, so SQLite
+databases are safe too. Cached recommendations of the learners written
+are invalidated; with a per-process cache such as the default LocMemCache,
+web workers pick the new rows up when their entries expire.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import django
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import User
+from .content_model import get_content_model, rebuild_content_model
+from .ml_recommendations import get_popular_sessions
+from .models import Session, SessionRecommendation
+from .popularity import update_popularity_scores
+from .recommendation_cache import invalidate_recommendations
+
+SHARD_SIZE = 500
+DEFAULT_TOP_K = 20
+WRITE_BATCH_SIZE = 2000
+
+
+def active_learner_ids():
+    """Ids of the learners the precompute covers."""
+    return list(
+        User.objects.filter(role='learner', is_active=True).order_by('id').values_list('id', flat=True)
+    )
+
+
+def score_shard(learner_ids, top_k, popular_ids):
+    """
+    Rank sessions for one shard of learners.
+
+    Returns (learner_id, session ids, scores) per learner, best first.
+    Sessions that cannot be booked (full, or with an unapproved mentor)
+    are skipped. Popular sessions the learner has not booked fill any
+    remaining slots with a score of 0.
+    """
+    model = get_content_model()
+    profiles, booked_ids = model.profile_vectors(learner_ids)
+    bookable_ids = set(Session.objects.filter(
+        status='scheduled',
+        current_participants__lt=F('max_participants'),
+        mentor__is_approved=True,
+    ).values_list('id', flat=True))
+    unbookable_ids = set(model.ids.tolist()) - bookable_ids
+    excluded_ids = [booked | unbookable_ids for booked in booked_ids]
+    results = []
+    for learner_id, booked, (session_ids, scores) in zip(
+        learner_ids, booked_ids, model.rank_many(profiles, excluded_ids, top_k)
+    ):
+        for session_id in popular_ids:
+            if len(session_ids) >= top_k:
+                break
+            if session_id not in booked and session_id not in session_ids:
+                session_ids.append(session_id)
+                scores.append(0.0)
+        results.append((learner_id, session_ids, scores))
+    return results
+
+
+def save_shard(results, computed_at):
+    """Upsert one shard's rankings and return the number of rows written."""
+    rows = [
+        SessionRecommendation(
+            learner_id=learner_id, session_id=session_id, rank=rank, score=score, computed_at=computed_at
+        )
+        for learner_id, session_ids, scores in results
+        for rank, (session_id, score) in enumerate(zip(session_ids, scores), start=1)
+    ]
+    SessionRecommendation.objects.bulk_create(
+        rows,
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['learner', 'rank'],
+        update_fields=['session', 'score', 'computed_at'],
+    )
+    invalidate_recommendations([learner_id for learner_id, _session_ids, _scores in results])
+    return len(rows)
+
+
+def _init_worker():
+    # Needed with the spawn start method; a no-op in forked workers
+    django.setup()
+
+
+def precompute_recommendations(top_k=DEFAULT_TOP_K, workers=1, shard_size=SHARD_SIZE):
+    """
+    Recompute and store the top_k recommendations of every active learner.
+
+    Returns a dict of counts for reporting.
+    """
+    computed_at = timezone.now()
+    rebuild_content_model()
+    update_popularity_scores()
+    popular_ids = [session.id for session in get_popular_sessions(top_k)]
+    learner_ids = active_learner_ids()
+    shards = [learner_ids[start:start + shard_size] for start in range(0, len(learner_ids), shard_size)]
+
+    written = 0
+    if workers > 1 and len(shards) > 1:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for results in pool.map(score_shard, shards, repeat(top_k), repeat(popular_ids)):
+                written += save_shard(results, computed_at)
+    else:
+        for shard in shards:
+            written += save_shard(score_shard(shard, top_k, popular_ids), computed_at)
+
+    deleted, _counts = SessionRecommendation.objects.filter(computed_at__lt=computed_at).delete()
+    return {
+        'learners': len(learner_ids),
+        'shards': len(shards),
+        'rows_written': written,
+        'rows_deleted': deleted,
+    }
@@ -0,0 +1,85 @@
+"""
+Per-learner cache of ranked session recommendations.
+
+Computing recommendations takes a dozen or more queries, so each learner's
+results are kept in the default cache as ranked session ids, one entry per
+recommendation kind and size, for RECOMMENDATION_CACHE_TTL seconds. A hit
+is hydrated with a single in_bulk query that also loads the mentor and
+their user for the templates.
+
+Entries are dropped when the learner books, cancels or removes a booking,
+or changes their career goals (see learning_sessions.signals). With the
+default per-process LocMemCache that only reaches the worker that handled
+the change, so the entry is also checked when it is hydrated: every
+session is checked against the loaded row, which is annotated with
+whether the learner has booked it, and an entry that lost any session
+is recomputed. Sessions that were booked, fill up, are cancelled or
+start are caught this way without a reverse index from sessions to
+learners, in every worker, and after bulk updates, which send no
+signals.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Booking, Session
+
+
+def cache_key(user_id):
+    """Cache key holding all of one learner's recommendation entries."""
+    return f'recommendations:{user_id}'
+
+
+def is_recommendable(session, now):
+    """Whether a session can still be offered to a learner."""
+    return (
+        session.status == 'scheduled'
+        and session.start_time > now
+        and not session.is_full
+        and session.mentor.is_approved
+    )
+
+
+def hydrate(session_ids, user):
+    """Load sessions in ranked order, skipping any booked by the user or no longer recommendable."""
+    sessions = Session.objects.select_related('mentor__user').annotate(
+        booked=Exists(Booking.objects.filter(session=OuterRef('pk'), learner=user))
+    ).in_bulk(session_ids)
+    now = timezone.now()
+    return [
+        sessions[session_id] for session_id in session_ids
+        if session_id in sessions
+        and not sessions[session_id].booked
+        and is_recommendable(sessions[session_id], now)
+    ]
+
+
+def cached_recommendations(user, kind, limit, compute):
+    """
+    Return a learner's recommendations of one kind from the cache.
+
+    On a miss, or when a cached session was booked by the user or is no
+    longer recommendable, compute(user, limit) is called for the ranked
+    session ids to store.
+    """
+    key = cache_key(user.pk)
+    entries = cache.get(key) or {}
+    entry = f'{kind}:{limit}'
+
+    session_ids = entries.get(entry)
+    if session_ids is not None:
+        sessions = hydrate(session_ids, user)
+        if len(sessions) == len(session_ids):
+            return sessions
+
+    sessions = hydrate(compute(user, limit), user)
+    entries[entry] = [session.id for session in sessions]
+    cache.set(key, entries, settings.RECOMMENDATION_CACHE_TTL)
+    return sessions
+
+
+def invalidate_recommendations(user_ids):
+    """Drop the cached recommendations of the given learners."""
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
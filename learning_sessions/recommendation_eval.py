@@ -0,0 +1,199 @@
+"""
+Offline evaluation of the recommendation strategies.
+
+Bookings are split in time at a cutoff, by default the point after which
+TEST_FRACTION of them were made. Inside a transaction that is always
+rolled back, the database is rewound to the cutoff:
+- bookings and sessions created after it are deleted
+- sessions starting after it are scheduled again, with their participant
+  counts recomputed
+- popularity scores and the content model are rebuilt as of the cutoff
+- timezone.now() returns the cutoff
+
+Each strategy then recommends K sessions to a sample of learners who went
+on to book at least one session that was open at the cutoff, and is
+scored against those later bookings:
+
+precision@k / recall@k  share of the K recommendations that were booked /
+                        share of the later bookings that were recommended
+coverage                share of the open sessions recommended to anyone
+diversity               1 - mean pairwise tag Jaccard similarity within a list
+latency p50 / p95       wall time per call, in milliseconds
+queries                 mean SQL queries per call
+
+Learner profiles (career goals) are used as they are now. Run it against
+the synthetic dataset (generate_synthetic_data) or a copy of production;
+nothing is changed either way.
+"""
+
+import random
+import time
+from collections import defaultdict
+from itertools import combinations
+from unittest import mock
+
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from . import content_model
+from .ml_recommendations import (
+    compute_content_based_recommendations, compute_personalized_recommendations,
+    get_collaborative_filtering_recommendations, get_popular_sessions,
+)
+from .models import Booking, Session
+from .popularity import update_popularity_scores
+
+DEFAULT_K = 10
+TEST_FRACTION = 0.2
+DEFAULT_SAMPLE_SIZE = 200
+
+
+def _popular(user, limit):
+    return get_popular_sessions(limit)
+
+
+# name: function(user, limit) returning recommended Session objects
+STRATEGIES = {
+    'content': compute_content_based_recommendations,
+    'collaborative': get_collaborative_filtering_recommendations,
+    'popular': _popular,
+    'hybrid': compute_personalized_recommendations,
+}
+
+
+def default_cutoff(test_fraction=TEST_FRACTION):
+    """The booking time after which test_fraction of all bookings were made."""
+    bookings = Booking.objects.order_by('created_at').values_list('created_at', flat=True)
+    total = bookings.count()
+    if not total:
+        return None
+    return bookings[min(int(total * (1 - test_fraction)), total - 1)]
+
+
+def rewind_to(cutoff):
+    """Make the database look as it did at cutoff, as far as recommendations see it."""
+    Booking.objects.filter(created_at__gte=cutoff).delete()
+    Session.objects.filter(created_at__gte=cutoff).delete()
+    upcoming = Session.objects.filter(start_time__gt=cutoff)
+    upcoming.exclude(status='cancelled').update(status='scheduled')
+    upcoming.update(current_participants=Coalesce(Subquery(
+        Booking.objects.filter(session=OuterRef('pk'), status__in=['pending', 'confirmed', 'completed'])
+        .values('session').annotate(count=Count('id')).values('count')
+    ), Value(0)))
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def intra_list_diversity(session_ids, tags):
+    """1 - mean pairwise Jaccard similarity of the sessions' tag sets."""
+    pairs = list(combinations(session_ids, 2))
+    if not pairs:
+        return None
+    similarity = 0.0
+    for first, second in pairs:
+        union = tags[first] | tags[second]
+        similarity += len(tags[first] & tags[second]) / len(union) if union else 1.0
+    return 1 - similarity / len(pairs)
+
+
+def evaluate_strategy(recommend, learners, relevant, candidates, tags, k):
+    """Run one strategy for every learner and return its metrics."""
+    precision, recall, diversity, latency, queries = [], [], [], [], []
+    recommended = set()
+    for learner in learners:
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            session_ids = [session.id for session in recommend(learner, k)][:k]
+            latency.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+
+        hits = len(set(session_ids) & relevant[learner.pk])
+        precision.append(hits / k)
+        recall.append(hits / len(relevant[learner.pk]))
+        recommended.update(session_id for session_id in session_ids if session_id in candidates)
+        list_diversity = intra_list_diversity(session_ids, tags)
+        if list_diversity is not None:
+            diversity.append(list_diversity)
+
+    def mean(values):
+        return round(sum(values) / len(values), 4) if values else None
+
+    return {
+        'precision_at_k': mean(precision),
+        'recall_at_k': mean(recall),
+        'coverage': round(len(recommended) / len(candidates), 4) if candidates else None,
+        'diversity': mean(diversity),
+        'latency_p50_ms': round(percentile(latency, 0.5), 2) if latency else None,
+        'latency_p95_ms': round(percentile(latency, 0.95), 2) if latency else None,
+        'queries_per_call': mean(queries),
+    }
+
+
+def evaluate(k=DEFAULT_K, cutoff=None, test_fraction=TEST_FRACTION, sample_size=DEFAULT_SAMPLE_SIZE,
+             seed=0, strategies=None):
+    """
+    Replay bookings up to a cutoff and score each strategy on the bookings after it.
+
+    Returns a report dict; the database is left unchanged.
+    """
+    strategies = strategies or list(STRATEGIES)
+    with transaction.atomic():
+        cutoff = cutoff or default_cutoff(test_fraction)
+        if cutoff is None:
+            return {'cutoff': None, 'k': k, 'learners': 0, 'strategies': {}}
+
+        # Held out: sessions open at the cutoff that learners booked after it
+        held_out = Booking.objects.filter(
+            created_at__gte=cutoff,
+            session__created_at__lt=cutoff,
+            session__start_time__gt=cutoff,
+            status__in=['confirmed', 'completed'],
+        ).values_list('learner_id', 'session_id')
+        booked_later = defaultdict(set)
+        for learner_id, session_id in held_out:
+            booked_later[learner_id].add(session_id)
+
+        rewind_to(cutoff)
+        open_sessions = Session.objects.filter(
+            status='scheduled', start_time__gt=cutoff, mentor__is_approved=True,
+        ).values_list('id', 'tags')
+        candidates = set()
+        tags = defaultdict(set)
+        for session_id, session_tags in open_sessions:
+            candidates.add(session_id)
+            tags[session_id] = {tag.strip().lower() for tag in (session_tags or '').split(',') if tag.strip()}
+
+        relevant = {
+            learner_id: session_ids & candidates
+            for learner_id, session_ids in booked_later.items() if session_ids & candidates
+        }
+        learner_ids = sorted(relevant)
+        random.Random(seed).shuffle(learner_ids)
+        learners = list(User.objects.filter(id__in=learner_ids[:sample_size], role='learner').order_by('id'))
+
+        update_popularity_scores(now=cutoff)
+        model = content_model.ContentModel.build(now=cutoff)
+        results = {}
+        with mock.patch('django.utils.timezone.now', return_value=cutoff), \
+                mock.patch.object(content_model, 'get_content_model', return_value=model):
+            for name in strategies:
+                results[name] = evaluate_strategy(STRATEGIES[name], learners, relevant, candidates, tags, k)
+
+        transaction.set_rollback(True)
+
+    return {
+        'cutoff': cutoff.isoformat(),
+        'k': k,
+        'learners': len(learners),
+        'open_sessions': len(candidates),
+        'strategies': results,
+    }
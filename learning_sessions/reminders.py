@@ -0,0 +1,190 @@
+"""
+Server-side countdown reminders for upcoming sessions.
+
+A single asyncio task per ASGI process keeps a heap of (fire time, session)
+entries for every scheduled session starting within
+SESSION_REMINDER_HORIZON, one entry per offset in REMINDER_OFFSETS. When an
+entry is due, the confirmed learners and the mentor of the session are
+looked up and a session_reminder event is sent to each of their
+notification groups, so every open page hears it without polling.
+
+Reloads are incremental. Each reload reads only the sessions whose start
+time has entered the horizon since the previous reload, plus the sessions
+saved since then (cancelled or rescheduled; found through updated_at).
+Heap entries are invalidated lazily: an entry fires only if its session is
+still tracked with the same start time.
+
+The task starts with the first NotificationConsumer connection of the
+process. With a channel layer shared between several processes, enable
+SESSION_REMINDERS_ENABLED in only one of them, or reminders are sent once
+per process.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.urls import reverse
+from django.utils import timezone
+
+from users.notifications import notification_group, send_events
+from .models import Booking, Session
+
+logger = logging.getLogger(__name__)
+
+# (seconds before the start, sound played by the client)
+REMINDER_OFFSETS = (
+    (300, 'sounds/notification-5min.mp3'),
+    (60, 'sounds/notification-1min.mp3'),
+    (10, 'sounds/notification-10sec.mp3'),
+)
+# Rows saved while a reload runs could be missed without some overlap
+RELOAD_OVERLAP = timedelta(seconds=2)
+
+_scheduler = None
+
+
+def start_reminder_scheduler():
+    """Start the reminder task on the running event loop, once per process."""
+    global _scheduler
+    if not getattr(settings, 'SESSION_REMINDERS_ENABLED', True):
+        return None
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler.loop is not loop or _scheduler.task.done():
+        _scheduler = ReminderScheduler()
+        _scheduler.start(loop)
+    return _scheduler
+
+
+class ReminderScheduler:
+    """Heap of pending reminders, refreshed incrementally from the database."""
+
+    def __init__(self, horizon=None, reload_interval=None):
+        self.horizon = timedelta(seconds=horizon or getattr(settings, 'SESSION_REMINDER_HORIZON', 3600))
+        self.reload_interval = reload_interval or getattr(settings, 'SESSION_REMINDER_RELOAD_INTERVAL', 30)
+        self.loop = None
+        self.task = None
+        # (fire_at, sequence, session_id, start_time, offset, sound)
+        self._heap = []
+        self._sequence = itertools.count()
+        # session_id -> start_time of every session with pending reminders
+        self._sessions = {}
+        self._loaded_until = None
+        self._synced_at = None
+
+    def start(self, loop):
+        self.loop = loop
+        self.task = loop.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        next_reload = timezone.now()
+        while True:
+            now = timezone.now()
+            if now >= next_reload:
+                try:
+                    await self.reload(now)
+                except Exception:
+                    logger.exception("Could not reload session reminders")
+                next_reload = now + timedelta(seconds=self.reload_interval)
+
+            due = self.pop_due(timezone.now())
+            if due:
+                try:
+                    await self.send(due)
+                except Exception:
+                    logger.exception("Could not send session reminders")
+
+            wake_at = next_reload
+            if self._heap and self._heap[0][0] < wake_at:
+                wake_at = self._heap[0][0]
+            await asyncio.sleep(max((wake_at - timezone.now()).total_seconds(), 0))
+
+    async def reload(self, now):
+        new_sessions, changed_sessions = await database_sync_to_async(self.load_changes)(now)
+        for session_id, start_time in new_sessions:
+            self.track(session_id, start_time, now)
+        for session_id, start_time, status in changed_sessions:
+            if status == 'scheduled' and now < start_time <= now + self.horizon:
+                self.track(session_id, start_time, now)
+            else:
+                self._sessions.pop(session_id, None)
+        # Forget sessions whose last reminder is behind us
+        for session_id, start_time in list(self._sessions.items()):
+            if start_time <= now:
+                del self._sessions[session_id]
+
+    def load_changes(self, now):
+        """Sessions that entered the horizon, and sessions saved, since the last reload."""
+        horizon_end = now + self.horizon
+        window_start = self._loaded_until or now
+        new_sessions = list(
+            Session.objects.filter(
+                status='scheduled', start_time__gt=window_start, start_time__lte=horizon_end,
+            ).values_list('id', 'start_time')
+        )
+        changed_sessions = []
+        if self._synced_at is not None:
+            changed_sessions = list(
+                Session.objects.filter(updated_at__gte=self._synced_at).values_list('id', 'start_time', 'status')
+            )
+        self._loaded_until = horizon_end
+        self._synced_at = now - RELOAD_OVERLAP
+        return new_sessions, changed_sessions
+
+    def track(self, session_id, start_time, now):
+        """Queue the reminders of a session unless it is already queued for that start time."""
+        if self._sessions.get(session_id) == start_time:
+            return
+        self._sessions[session_id] = start_time
+        for offset, sound in REMINDER_OFFSETS:
+            fire_at = start_time - timedelta(seconds=offset)
+            if fire_at > now:
+                heapq.heappush(self._heap, (fire_at, next(self._sequence), session_id, start_time, offset, sound))
+
+    def pop_due(self, now):
+        """Remove and return the due reminders that are still valid."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _fire_at, _sequence, session_id, start_time, offset, sound = heapq.heappop(self._heap)
+            if self._sessions.get(session_id) == start_time:
+                due.append((session_id, start_time, offset, sound))
+        return due
+
+    async def send(self, due):
+        recipients, titles = await database_sync_to_async(self.load_recipients)(
+            {session_id for session_id, _start_time, _offset, _sound in due}
+        )
+        events = []
+        for session_id, start_time, offset, sound in due:
+            event = {
+                'type': 'session_reminder',
+                'session_id': session_id,
+                'title': titles.get(session_id, ''),
+                'start_time': start_time.isoformat(),
+                'seconds_left': offset,
+                'sound': staticfiles_storage.url(sound),
+                'link': reverse('session_room', args=[session_id]),
+            }
+            events.extend((notification_group(user_id), event) for user_id in recipients.get(session_id, ()))
+        await send_events(events)
+
+    def load_recipients(self, session_ids):
+        """Mentor and confirmed learner user ids, and titles, of the given sessions."""
+        recipients = {}
+        titles = {}
+        for session_id, title, mentor_user_id in Session.objects.filter(
+            pk__in=session_ids, status='scheduled',
+        ).values_list('id', 'title', 'mentor__user_id'):
+            recipients[session_id] = {mentor_user_id}
+            titles[session_id] = title
+        for session_id, learner_id in Booking.objects.filter(
+            session_id__in=recipients, status='confirmed',
+        ).values_list('session_id', 'learner_id'):
+            recipients[session_id].add(learner_id)
+        return recipients, titles
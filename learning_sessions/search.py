@@ -0,0 +1,272 @@
+"""
+Full-text search over sessions.
+
+On SQLite the index is an FTS5 virtual table whose rowid is the session id;
+on PostgreSQL it is a table of weighted tsvector documents with a GIN index.
+Both index the session title, description, topics, tags and the mentor's
+expertise, are kept in sync by signals, and are queried with a keyset
+cursor on (score, id) so deep pages cost the same as the first one. Other
+database backends fall back to unranked icontains matching.
+"""
+
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Session
+
+FTS_TABLE = 'learning_sessions_session_fts'
+PG_TABLE = 'learning_sessions_session_search'
+
+# BM25 column weights: title, description, topics, tags, expertise
+FTS_WEIGHTS = (10.0, 2.0, 3.0, 6.0, 4.0)
+
+SEARCH_PAGE_SIZE = 20
+MAX_QUERY_TERMS = 8
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Document columns selected from the session and mentor profile tables
+DOCUMENT_SELECT = """
+    SELECT s.id, s.title, s.description, s.topics_to_cover,
+           REPLACE(s.tags, ',', ' '), m.expertise
+    FROM learning_sessions_session s
+    JOIN users_mentorprofile m ON m.id = s.mentor_id
+"""
+
+
+def create_search_schema(schema_editor):
+    """Create the search index for the current database backend."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, topics, tags, expertise, "
+            "tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+            "session_id bigint PRIMARY KEY REFERENCES learning_sessions_session (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_gin ON {PG_TABLE} USING GIN (document)"
+        )
+
+
+def drop_search_schema(schema_editor):
+    """Remove the search index created by create_search_schema."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {PG_TABLE}")
+
+
+def rebuild_index(using=None):
+    """
+    Rebuild the whole index from the session table in one statement.
+
+    Needed after bulk loads, which bypass the signals that normally keep
+    the index in sync.
+    """
+    conn = _connection(using)
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, topics, tags, expertise) "
+                + DOCUMENT_SELECT
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        elif conn.vendor == 'postgresql':
+            cursor.execute(f"TRUNCATE {PG_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {PG_TABLE} (session_id, document) "
+                f"SELECT id, {_pg_document_sql('d')} FROM ({DOCUMENT_SELECT}) "
+                "AS d (id, title, description, topics, tags, expertise)"
+            )
+
+
+def index_sessions(session_ids, using=None):
+    """(Re)index the given sessions, reading their current rows."""
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+    conn = _connection(using)
+    placeholders = ', '.join(['%s'] * len(session_ids))
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", session_ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, topics, tags, expertise) "
+                f"{DOCUMENT_SELECT} WHERE s.id IN ({placeholders})",
+                session_ids,
+            )
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                f"INSERT INTO {PG_TABLE} (session_id, document) "
+                f"SELECT id, {_pg_document_sql('d')} FROM ({DOCUMENT_SELECT} WHERE s.id IN ({placeholders})) "
+                "AS d (id, title, description, topics, tags, expertise) "
+                "ON CONFLICT (session_id) DO UPDATE SET document = EXCLUDED.document",
+                session_ids,
+            )
+
+
+def remove_sessions(session_ids, using=None):
+    """Drop the given sessions from the index."""
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+    conn = _connection(using)
+    placeholders = ', '.join(['%s'] * len(session_ids))
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", session_ids)
+        elif conn.vendor == 'postgresql':
+            cursor.execute(f"DELETE FROM {PG_TABLE} WHERE session_id IN ({placeholders})", session_ids)
+
+
+def search_sessions(query, cursor=None, limit=SEARCH_PAGE_SIZE, upcoming_only=True):
+    """
+    Return a page of sessions matching a free-text query, best match first.
+
+    Args:
+        query: Free text typed by the user; only word characters are used
+        cursor: Value of next_cursor from the previous page, if any
+        limit: Maximum number of sessions to return
+        upcoming_only: Only include scheduled sessions that have not started
+
+    Returns:
+        Tuple of (list of Session objects, cursor for the next page or None)
+    """
+    terms = TERM_PATTERN.findall(query or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], None
+
+    after = decode_cursor(cursor)
+    if connection.vendor == 'sqlite':
+        rows = _search_sqlite(terms, after, limit + 1, upcoming_only)
+    elif connection.vendor == 'postgresql':
+        rows = _search_postgresql(terms, after, limit + 1, upcoming_only)
+    else:
+        rows = _search_fallback(terms, after, limit + 1, upcoming_only)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    sessions_by_id = Session.objects.select_related('mentor', 'mentor__user').in_bulk(
+        [session_id for session_id, _ in rows]
+    )
+    sessions = []
+    for session_id, score in rows:
+        session = sessions_by_id.get(session_id)
+        if session is not None:
+            session.search_score = score
+            sessions.append(session)
+
+    next_cursor = encode_cursor(*rows[-1]) if has_more and rows else None
+    return sessions, next_cursor
+
+
+def encode_cursor(session_id, score):
+    """Encode the position after a result as an opaque cursor string."""
+    return f"{score!r}_{session_id}"
+
+
+def decode_cursor(cursor):
+    """Return (score, session_id) from a cursor, or None if it is invalid."""
+    if not cursor:
+        return None
+    try:
+        score, session_id = cursor.rsplit('_', 1)
+        return float(score), int(session_id)
+    except ValueError:
+        return None
+
+
+def _search_sqlite(terms, after, limit, upcoming_only):
+    # Quote every term so FTS5 operators in user input are treated as text;
+    # the last term is a prefix match to support search-as-you-type
+    match = ' '.join(f'"{term}"' for term in terms[:-1])
+    match = f'{match} "{terms[-1]}"*'.strip()
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+
+    sql = (
+        f"SELECT hits.id, hits.score FROM ("
+        f"  SELECT {FTS_TABLE}.rowid AS id, bm25({FTS_TABLE}, {weights}) AS score"
+        f"  FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        f") AS hits"
+    )
+    params = [match]
+    sql, params = _add_filters(sql, params, after, upcoming_only)
+    with connection.cursor() as cursor:
+        cursor.execute(sql + " ORDER BY hits.score, hits.id LIMIT %s", params + [limit])
+        return cursor.fetchall()
+
+
+def _search_postgresql(terms, after, limit, upcoming_only):
+    # Terms are word characters only, so they are safe inside to_tsquery
+    tsquery = ' & '.join(terms[:-1] + [f"{terms[-1]}:*"])
+    sql = (
+        f"SELECT hits.id, hits.score FROM ("
+        f"  SELECT session_id AS id, -ts_rank_cd(document, query) AS score"
+        f"  FROM {PG_TABLE}, to_tsquery('english', %s) AS query WHERE document @@ query"
+        f") AS hits"
+    )
+    params = [tsquery]
+    sql, params = _add_filters(sql, params, after, upcoming_only)
+    with connection.cursor() as cursor:
+        cursor.execute(sql + " ORDER BY hits.score, hits.id LIMIT %s", params + [limit])
+        return cursor.fetchall()
+
+
+def _add_filters(sql, params, after, upcoming_only):
+    conditions = []
+    if upcoming_only:
+        sql += (
+            " JOIN learning_sessions_session s ON s.id = hits.id"
+            " JOIN users_mentorprofile m ON m.id = s.mentor_id"
+        )
+        conditions.append("s.status = 'scheduled' AND s.start_time > %s AND m.is_approved")
+        params.append(timezone.now())
+    if after is not None:
+        # Scores sort ascending (lower is better), ties broken by id
+        conditions.append("(hits.score > %s OR (hits.score = %s AND hits.id > %s))")
+        params.extend([after[0], after[0], after[1]])
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql, params
+
+
+def _search_fallback(terms, after, limit, upcoming_only):
+    queryset = Session.objects.all()
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term)
+            | Q(topics_to_cover__icontains=term) | Q(tags__icontains=term)
+            | Q(mentor__expertise__icontains=term)
+        )
+    if upcoming_only:
+        queryset = queryset.filter(
+            status='scheduled', start_time__gt=timezone.now(), mentor__is_approved=True
+        )
+    if after is not None:
+        queryset = queryset.filter(id__gt=after[1])
+    return [(session_id, 0.0) for session_id in queryset.order_by('id').values_list('id', flat=True)[:limit]]
+
+
+def _pg_document_sql(alias):
+    """Weighted tsvector expression over a DOCUMENT_SELECT row alias."""
+    return (
+        f"setweight(to_tsvector('english', coalesce({alias}.title, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({alias}.tags, '') || ' ' || coalesce({alias}.expertise, '')), 'B') || "
+        f"setweight(to_tsvector('english', coalesce({alias}.topics, '') || ' ' || coalesce({alias}.description, '')), 'C')"
+    )
+
+
+def _connection(using):
+    return connection if using is None else connections[using]
@@ -2,7 +2,135 @@
 Signal handlers for the learning_sessions app.
 """
 
-from django.db.models.signals import post_save, pre_delete
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
+from django.utils.translation import gettext as _
 
-# Define signal handlers as needed
\ No newline at end of file
+from peerlearn.images import has_derivatives, schedule_delete_derivatives, schedule_derivatives
+from users.models import LearnerProfile, MentorProfile
+from users.notifications import notify
+from .catalog import invalidate_facets
+from .models import Booking, Session
+from .recommendation_cache import invalidate_recommendations
+from .search import index_sessions, remove_sessions
+
+
+@receiver(post_save, sender=Session)
+def index_saved_session(sender, instance, raw=False, using=None, **kwargs):
+    """Keep the full-text search index in sync with session edits."""
+    if not raw:
+        index_sessions([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Session)
+def unindex_deleted_session(sender, instance, using=None, **kwargs):
+    """Remove deleted sessions from the full-text search index."""
+    remove_sessions([instance.pk], using=using)
+
+
+@receiver(post_save, sender=MentorProfile)
+def reindex_mentor_sessions(sender, instance, created, raw=False, using=None, **kwargs):
+    """Mentor expertise is indexed with each session, so reindex on change."""
+    if created or raw:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'expertise' not in update_fields:
+        return
+    index_sessions(
+        Session.objects.using(using).filter(mentor=instance).values_list('id', flat=True),
+        using=using,
+    )
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=MentorProfile)
+def invalidate_catalog_facets(sender, instance, raw=False, **kwargs):
+    """Session fields and mentor approval and ratings decide the catalog facet counts."""
+    if not raw:
+        # After commit, so a concurrent request cannot re-cache the old counts
+        transaction.on_commit(invalidate_facets)
+
+
+@receiver(post_init, sender=Session)
+def remember_thumbnail(sender, instance, **kwargs):
+    """Keep the loaded thumbnail name so the old derivatives can be removed on replace."""
+    # Read from __dict__ so a deferred thumbnail field is not fetched
+    thumbnail = instance.__dict__.get('thumbnail')
+    instance._loaded_thumbnail = getattr(thumbnail, 'name', thumbnail) or ''
+
+
+@receiver(post_save, sender=Session)
+def generate_thumbnail_derivatives(sender, instance, created, raw=False, **kwargs):
+    """Create the resized thumbnail images after a thumbnail upload."""
+    update_fields = kwargs.get('update_fields')
+    if raw or (update_fields is not None and 'thumbnail' not in update_fields):
+        return
+    name = instance.thumbnail.name or ''
+    # A new row (e.g. a copy saved with pk=None) replaces nothing
+    if not created and instance._loaded_thumbnail and instance._loaded_thumbnail != name:
+        schedule_delete_derivatives(instance._loaded_thumbnail, 'thumbnail')
+    instance._loaded_thumbnail = name
+    if name and not has_derivatives(name, 'thumbnail'):
+        schedule_derivatives(name, 'thumbnail')
+
+
+@receiver(post_delete, sender=Session)
+def delete_thumbnail_derivatives(sender, instance, **kwargs):
+    """Remove the resized thumbnail images of a deleted session."""
+    if instance.thumbnail:
+        schedule_delete_derivatives(instance.thumbnail.name, 'thumbnail')
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_status(sender, instance, **kwargs):
+    """Keep the loaded status so a change to 'confirmed' can be detected on save."""
+    # Read from __dict__ so a deferred status field is not fetched
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Booking)
+def notify_booking_confirmed(sender, instance, created, raw=False, **kwargs):
+    """Tell the learner when their booking becomes confirmed, whichever view confirmed it."""
+    if raw or instance.status != 'confirmed':
+        return
+    if not created and instance._loaded_status == 'confirmed':
+        return
+    instance._loaded_status = instance.status
+    session = instance.session
+    notify(
+        [instance.learner_id],
+        title=_('Booking confirmed'),
+        message=_('Your booking for "%(title)s" is confirmed.') % {'title': session.title},
+        category='booking',
+        link=session.get_absolute_url(),
+        data={'session_id': session.pk, 'booking_id': instance.pk},
+    )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_learner_recommendations(sender, instance, raw=False, **kwargs):
+    """Booked sessions are excluded from recommendations, so recompute after any booking change."""
+    if raw:
+        return
+    learner_id = instance.learner_id
+    # After commit, so a concurrent request cannot re-cache the old bookings
+    transaction.on_commit(lambda: invalidate_recommendations([learner_id]))
+
+
+@receiver(post_init, sender=LearnerProfile)
+def remember_career_goals(sender, instance, **kwargs):
+    """Keep the loaded career goals so a change can be detected on save."""
+    instance._loaded_career_goals = instance.__dict__.get('career_goals')
+
+
+@receiver(post_save, sender=LearnerProfile)
+def invalidate_recommendations_on_goals(sender, instance, created, raw=False, **kwargs):
+    """Career goals seed recommendations for learners without bookings."""
+    if raw or created or instance.career_goals == instance._loaded_career_goals:
+        return
+    instance._loaded_career_goals = instance.career_goals
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_recommendations([user_id]))
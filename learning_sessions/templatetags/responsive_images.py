@@ -0,0 +1,65 @@
+"""
+Template tags for serving resized image derivatives with srcset.
+"""
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from peerlearn.images import DERIVATIVE_SIZES, derivative_name, has_derivatives, srcset
+
+register = template.Library()
+
+# Default sizes attribute per kind: thumbnails fill a card column, avatars
+# are drawn at a fixed size
+DEFAULT_SIZES = {
+    'thumbnail': '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw',
+    'avatar': '48px',
+}
+
+
+@register.simple_tag
+def responsive_image(image, kind='thumbnail', sizes=None, **attrs):
+    """
+    Render a <picture> serving WebP and JPEG derivatives of an uploaded image.
+
+    Falls back to the original file while derivatives are not generated yet.
+    Extra keyword arguments become attributes of the <img> element.
+
+    Usage in template:
+    {% responsive_image session.thumbnail 'thumbnail' alt=session.title class="w-full h-40 object-cover" %}
+    {% responsive_image user.profile_picture 'avatar' sizes="80px" alt=user.get_full_name class="w-20 h-20 rounded-full" %}
+    """
+    if not image:
+        return ''
+    attrs.setdefault('alt', '')
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    img_attrs = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+
+    if not has_derivatives(image.name, kind):
+        return format_html('<img src="{}" {}>', image.url, img_attrs)
+
+    sizes = sizes or DEFAULT_SIZES[kind]
+    # Browsers that ignore srcset get the medium JPEG
+    fallback = default_storage.url(derivative_name(image.name, 'medium', 'jpeg'))
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}>'
+        '</picture>',
+        srcset(image.name, kind, 'webp'), sizes,
+        fallback, srcset(image.name, kind, 'jpeg'), sizes, img_attrs,
+    )
+
+
+@register.simple_tag
+def image_srcset(image, kind='thumbnail', image_format='webp'):
+    """
+    Return the srcset value for one format of an image's derivatives.
+
+    Usage in template:
+    <img srcset="{% image_srcset session.thumbnail 'thumbnail' 'jpeg' %}" ...>
+    """
+    if not image or kind not in DERIVATIVE_SIZES:
+        return ''
+    return srcset(image.name, kind, image_format)
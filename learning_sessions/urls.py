@@ -10,6 +10,8 @@ from . import test_views
 urlpatterns = [
     # Session browsing
     path('', views.session_list, name='session_list'),
+    path('catalog/', views.session_catalog, name='session_catalog'),
+    path('search/', views.session_search, name='session_search'),
     path('<int:session_id>/', views.session_detail, name='session_detail'),
     
     # Session management (for mentors)
@@ -2,19 +2,33 @@
 Views for the sessions app.
 """
 
+from decimal import Decimal
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponseForbidden
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.db.models import Q, Avg
+from django.utils.formats import date_format
+from django.db import transaction
+from django.db.models import Q, Avg, Count, Sum
 from django.views.decorators.http import require_POST
 from django.conf import settings
+from django.utils.http import urlencode
 
 from .models import Session, Booking, Feedback
 from .forms import SessionForm, BookingForm, FeedbackForm
+from .catalog import get_catalog_page
+from .search import search_sessions
 from users.models import MentorProfile
+from users.notifications import notify
+
+# Live sessions shown at the top of the session list
+LIVE_SESSIONS_LIMIT = 12
+
+# Share of a booking's final price paid out to the mentor
+MENTOR_EARNINGS_SHARE = Decimal('0.8')
 
 
 def session_list(request):
@@ -23,24 +37,24 @@ def session_list(request):
     if request.user.is_authenticated and request.user.role == 'mentor':
         return redirect('mentor_sessions')
     
-    # Get current time for filtering
-    now = timezone.now()
-    
     # Get live sessions (in progress right now)
-    live_sessions = Session.objects.filter(
+    live_sessions = list(Session.objects.filter(
         status='in_progress',
         mentor__is_approved=True
-    ).select_related('mentor', 'mentor__user').order_by('start_time').distinct()
+    ).select_related('mentor', 'mentor__user').order_by('start_time')[:LIVE_SESSIONS_LIMIT])
     
-    # Get upcoming sessions (scheduled for future)
-    upcoming_sessions = Session.objects.filter(
-        status='scheduled',
-        start_time__gt=now,
-        mentor__is_approved=True
-    ).select_related('mentor', 'mentor__user').order_by('start_time').distinct()
+    # Get one keyset page of upcoming sessions with facet counts
+    catalog = _get_catalog_from_request(request)
+    upcoming_sessions = catalog['sessions']
+    
+    # Topic filters come from the tag facet instead of a fixed list
+    categories = [facet['key'] for facet in catalog['facets']['tags']]
     
-    # Extract categories for the visual filtering system
-    categories = ['programming', 'data-science', 'design', 'web-development', 'mobile-development']
+    # Links that toggle one facet value while keeping the other filters
+    filters = catalog['filters']
+    for name, facet_name in (('tag', 'tags'), ('price', 'price'), ('rating', 'rating')):
+        for facet in catalog['facets'][facet_name]:
+            facet['query'] = _catalog_query(filters, **{name: None if facet['selected'] else facet['key']})
     
     # For authenticated learners, get their booked sessions
     my_sessions = []
@@ -50,7 +64,7 @@ def session_list(request):
         # Get bookings for this learner
         my_bookings = Booking.objects.filter(
             learner=request.user,
-            status='confirmed'
+            status__in=['confirmed', 'completed']
         ).select_related('session', 'session__mentor', 'session__mentor__user')
         
         # Extract sessions from bookings
@@ -66,24 +80,29 @@ def session_list(request):
             from .ml_recommendations import get_personalized_recommendations
             recommended_sessions = get_personalized_recommendations(request.user, limit=8)
         except Exception as e:
-            # Fallback to random upcoming sessions if ML fails
-            recommended_sessions = upcoming_sessions.order_by('?')[:8]
+            # Fallback to the first upcoming sessions if ML fails
+            recommended_sessions = upcoming_sessions[:8]
             # Log the error
             print(f"Error getting recommendations: {str(e)}")
     
-    # Add topics_list to all sessions for better display
-    for session in list(live_sessions) + list(upcoming_sessions) + recommended_sessions:
+    # Add topics_list to the remaining sessions for better display
+    for session in live_sessions + list(recommended_sessions):
         if hasattr(session, 'tags') and session.tags:
             session.topics_list = [tag.strip() for tag in session.tags.split(',')][:3]  # Limit to 3 tags
     
     # Get mentor profiles for mentor section
-    mentor_profiles = MentorProfile.objects.filter(is_approved=True).annotate(
-        avg_rating=Avg('feedback__rating')
-    ).select_related('user').order_by('-avg_rating')[:4]
+    mentor_profiles = MentorProfile.objects.filter(
+        is_approved=True
+    ).select_related('user').order_by('-average_rating')[:4]
     
     context = {
         'live_sessions': live_sessions,
         'upcoming_sessions': upcoming_sessions,
+        'next_cursor': catalog['next_cursor'],
+        'facets': catalog['facets'],
+        'filters': filters,
+        'filter_query': _catalog_query(filters),
+        'all_topics_query': _catalog_query(filters, tag=None),
         'my_sessions': my_sessions,
         'liked_sessions': liked_sessions,
         'recommended_sessions': recommended_sessions,
@@ -94,6 +113,62 @@ def session_list(request):
     return render(request, 'sessions/session_list_improved.html', context)
 
 
+def session_catalog(request):
+    """Return a keyset page of upcoming sessions with facet counts as JSON."""
+    catalog = _get_catalog_from_request(request)
+    return JsonResponse({
+        'results': [_session_summary(session) for session in catalog['sessions']],
+        'next_cursor': catalog['next_cursor'],
+        'facets': catalog['facets'],
+        'filters': catalog['filters'],
+    })
+
+
+def _catalog_query(filters, **changes):
+    """Build a query string for the catalog filters with some values changed."""
+    params = {**filters, **changes}
+    return urlencode({name: value for name, value in params.items() if value})
+
+
+def _get_catalog_from_request(request):
+    """Read catalog filters and the cursor from the query string."""
+    return get_catalog_page(
+        tag=request.GET.get('tag'),
+        price=request.GET.get('price'),
+        rating=request.GET.get('rating'),
+        cursor=request.GET.get('cursor'),
+    )
+
+
+def session_search(request):
+    """Return ranked full-text search results as JSON, one keyset page at a time."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': _('Enter something to search for.')}, status=400)
+
+    sessions, next_cursor = search_sessions(query, cursor=request.GET.get('cursor'))
+    return JsonResponse({
+        'query': query,
+        'results': [_session_summary(session) for session in sessions],
+        'next_cursor': next_cursor,
+    })
+
+
+def _session_summary(session):
+    """Serialize the fields of a session shown in listings."""
+    return {
+        'id': session.id,
+        'title': session.title,
+        'url': session.get_absolute_url(),
+        'mentor': session.mentor.user.get_full_name(),
+        'expertise': session.mentor.expertise,
+        'start_time': session.start_time.isoformat(),
+        'price': str(session.price),
+        'tags': [tag.strip() for tag in session.tags.split(',') if tag.strip()],
+        'is_full': session.is_full,
+    }
+
+
 @login_required
 def mentor_sessions(request):
     """View for mentors to manage their own sessions."""
@@ -125,23 +200,21 @@ def mentor_sessions(request):
         session.starts_soon = time_until_start.total_seconds() < 3600  # 1 hour
     
     # Past sessions (completed or cancelled)
+    # Attendees, earnings and ratings are aggregated in the same query
+    paid_bookings = Q(bookings__status__in=['confirmed', 'completed'], bookings__payment_complete=True)
     past_sessions = Session.objects.filter(
         mentor=mentor_profile,
         status__in=['completed', 'cancelled']
+    ).annotate(
+        attendees=Count('bookings', filter=paid_bookings),
+        gross_earnings=Sum('bookings__final_price', filter=paid_bookings),
+        feedback_rating=Avg('bookings__feedback__rating'),
     ).order_by('-start_time')[:10]  # Last 10 sessions
     
-    # Add earnings and attendees to past sessions
+    # Add earnings (minus platform fees) and average rating to past sessions
     for session in past_sessions:
-        # Get confirmed bookings
-        confirmed_bookings = session.bookings.filter(status='confirmed', payment_complete=True)
-        session.attendees = confirmed_bookings.count()
-        
-        # Calculate earnings (minus platform fees)
-        session.earnings = sum(booking.final_price * 0.8 for booking in confirmed_bookings)
-        
-        # Get average rating if any
-        feedback_ratings = Feedback.objects.filter(booking__session=session).values_list('rating', flat=True)
-        session.avg_rating = round(sum(feedback_ratings) / len(feedback_ratings), 1) if feedback_ratings else None
+        session.earnings = (session.gross_earnings or 0) * MENTOR_EARNINGS_SHARE
+        session.avg_rating = round(session.feedback_rating, 1) if session.feedback_rating is not None else None
     
     # Recent activities (bookings, feedbacks, payments)
     recent_activities = []
@@ -182,12 +255,13 @@ def mentor_sessions(request):
     completed_count = Session.objects.filter(mentor=mentor_profile, status='completed').count()
     
     # Calculate total earnings
-    total_earnings = 0
-    completed_sessions = Session.objects.filter(mentor=mentor_profile, status='completed')
-    for session in completed_sessions:
-        confirmed_bookings = session.bookings.filter(status='confirmed', payment_complete=True)
-        session_earnings = sum(booking.final_price * 0.8 for booking in confirmed_bookings)  # 80% to mentor
-        total_earnings += session_earnings
+    gross_earnings = Booking.objects.filter(
+        session__mentor=mentor_profile,
+        session__status='completed',
+        status__in=['confirmed', 'completed'],
+        payment_complete=True
+    ).aggregate(total=Sum('final_price'))['total'] or 0
+    total_earnings = gross_earnings * MENTOR_EARNINGS_SHARE  # 80% to mentor
     
     context = {
         'mentor_profile': mentor_profile,
@@ -317,9 +391,9 @@ def create_session(request):
             
             # If both are provided, prioritize the uploaded thumbnail
             if thumbnail:
-                # Process uploaded thumbnail
-                # Here you would save the image to a specific location or pass it to a service
-                pass  # Implementation depends on your image storage system
+                # The uploaded thumbnail was saved with the session; its
+                # resized derivatives are generated by a post_save signal
+                pass
             elif selected_thumbnail:
                 # Store reference to the selected preset thumbnail
                 # This might involve copying from static files or saving a reference
@@ -390,15 +464,25 @@ def cancel_session(request, session_id):
         return redirect('session_detail', session_id=session.id)
     
     if request.method == 'POST':
-        session.status = 'cancelled'
-        session.save()
-        
-        # Notify all participants
-        bookings = session.bookings.filter(status='confirmed')
-        for booking in bookings:
-            # In a real app, send email notifications
-            booking.status = 'cancelled'
-            booking.save()
+        with transaction.atomic():
+            session.status = 'cancelled'
+            session.save()
+            
+            # Cancel the bookings and notify all participants in bulk
+            bookings = session.bookings.filter(status='confirmed')
+            learner_ids = list(bookings.values_list('learner_id', flat=True))
+            bookings.update(status='cancelled')
+            notify(
+                learner_ids,
+                title=_('Session cancelled'),
+                message=_('"%(title)s" on %(date)s was cancelled by the mentor.') % {
+                    'title': session.title,
+                    'date': date_format(timezone.localtime(session.start_time), 'DATETIME_FORMAT'),
+                },
+                category='session',
+                link=session.get_absolute_url(),
+                data={'session_id': session.pk},
+            )
         
         messages.success(request, _('Session cancelled successfully.'))
         return redirect('mentor_dashboard')
@@ -823,15 +907,6 @@ def session_room(request, session_id):
             # In development mode, allow access regardless of timing
             print("DEV MODE: Bypassing time restrictions for session room access")
         
-        # Update session status if it's starting
-        if session.status == 'scheduled' and session.start_time <= now:
-            try:
-                session.status = 'in_progress'
-                session.save()
-            except Exception as e:
-                print(f"Error updating session status: {str(e)}")
-                # Continue anyway - non-critical error
-        
         # WebRTC configuration
         try:
             stun_servers = settings.STUN_SERVERS
@@ -864,7 +939,7 @@ def session_room(request, session_id):
                 booking = Booking.objects.get(
                     session=session,
                     learner=request.user,
-                    status='confirmed'
+                    status__in=['confirmed', 'completed']
                 )
             except Exception as e:
                 print(f"Error finding booking for feedback link: {str(e)}")
@@ -961,10 +1036,12 @@ def my_booked_sessions(request):
     # Get past sessions (completed bookings for past sessions)
     past_sessions = Booking.objects.filter(
         learner=request.user,
-        status='confirmed',
+        status__in=['confirmed', 'completed'],
         payment_complete=True,
         session__end_time__lte=now
-    ).select_related('session', 'session__mentor', 'session__mentor__user').order_by('-session__start_time')
+    ).select_related(
+        'session', 'session__mentor', 'session__mentor__user', 'feedback'
+    ).order_by('-session__start_time')
     
     # Get pending bookings (in cart, not paid yet)
     pending_bookings = Booking.objects.filter(
@@ -3,8 +3,10 @@ Admin configuration for payments app.
 """
 
 from django.contrib import admin
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
+from users.notifications import notify
 from .models import Transaction, Coupon, WithdrawalRequest
 
 
@@ -39,12 +41,35 @@ class WithdrawalRequestAdmin(admin.ModelAdmin):
     
     def approve_withdrawals(self, request, queryset):
         """Approve selected withdrawal requests."""
-        updated = queryset.filter(status='pending').update(status='completed')
+        updated = self._set_pending_status(
+            queryset, 'completed',
+            _('Withdrawal approved'), _('Your withdrawal request has been approved and paid out.'),
+        )
         self.message_user(request, _(f'{updated} withdrawal requests were successfully approved.'))
     approve_withdrawals.short_description = _("Approve selected withdrawal requests")
     
     def reject_withdrawals(self, request, queryset):
         """Reject selected withdrawal requests."""
-        updated = queryset.filter(status='pending').update(status='rejected')
+        updated = self._set_pending_status(
+            queryset, 'rejected',
+            _('Withdrawal rejected'), _('Your withdrawal request was rejected. Contact support for details.'),
+        )
         self.message_user(request, _(f'{updated} withdrawal requests were successfully rejected.'))
     reject_withdrawals.short_description = _("Reject selected withdrawal requests")
+    
+    def _set_pending_status(self, queryset, status, title, message):
+        """Move pending requests to status and notify their mentors in bulk."""
+        with transaction.atomic():
+            pending = queryset.filter(status='pending').select_for_update()
+            requests = list(pending.values_list('id', 'mentor__user_id'))
+            updated = WithdrawalRequest.objects.filter(
+                id__in=[request_id for request_id, _user_id in requests]
+            ).update(status=status)
+            notify(
+                [user_id for _request_id, user_id in requests],
+                title=title,
+                message=message,
+                category='payment',
+                data={'status': status, 'withdrawal_ids': [request_id for request_id, _user_id in requests]},
+            )
+        return updated
@@ -3,7 +3,8 @@ Views for the payments app.
 """
 
 import json
-import razorpay
+from functools import lru_cache
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -19,10 +20,18 @@ from .models import Transaction, Coupon, WithdrawalRequest
 from learning_sessions.models import Booking, Session
 
 
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(
-    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-)
+@lru_cache(maxsize=1)
+def get_razorpay_client():
+    """
+    The Razorpay API client, created on first use.
+
+    The SDK pulls in requests and its dependencies, which every worker
+    would otherwise load at boot whether or not it takes a payment.
+    """
+    import razorpay
+    return razorpay.Client(
+        auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+    )
 
 
 @login_required
@@ -58,7 +67,7 @@ def cart_view(request):
         # Create a Razorpay order only for paid sessions
         if total > 0:
             try:
-                razorpay_order = razorpay_client.order.create({
+                razorpay_order = get_razorpay_client().order.create({
                     'amount': int(total * 100),  # Convert to paisa
                     'currency': settings.RAZORPAY_CURRENCY,
                     'payment_capture': 1  # Auto-capture payment
@@ -314,7 +323,7 @@ def payment_callback(request):
             return JsonResponse({'status': 'error', 'message': _('Missing payment information.')}, status=400)
         
         try:
-            razorpay_client.utility.verify_payment_signature({
+            get_razorpay_client().utility.verify_payment_signature({
                 'razorpay_payment_id': razorpay_payment_id,
                 'razorpay_order_id': razorpay_order_id,
                 'razorpay_signature': razorpay_signature
@@ -327,7 +336,7 @@ def payment_callback(request):
         
         try:
             # Get payment details from Razorpay
-            payment = razorpay_client.payment.fetch(razorpay_payment_id)
+            payment = get_razorpay_client().payment.fetch(razorpay_payment_id)
             
             # Check if payment was successful
             if payment['status'] != 'captured':
@@ -506,7 +515,7 @@ def transaction_history(request):
         mentor_profile = user.mentor_profile
         transactions = Transaction.objects.filter(
             booking__session__mentor=mentor_profile
-        ).select_related('booking__learner')
+        ).select_related('booking__session', 'booking__learner')
         
     else:
         messages.error(request, _('Access denied.'))
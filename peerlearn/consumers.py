@@ -3,10 +3,17 @@ WebSocket consumers for real-time functionality.
 """
 
 import json
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 
+from learning_sessions.reminders import start_reminder_scheduler
+from users.notifications import (
+    notification_group, notifications_after, parse_cursor, serialize_notification,
+)
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     """
@@ -19,7 +26,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
             
-        self.notification_group_name = f'notifications_{self.user.id}'
+        self.notification_group_name = notification_group(self.user.id)
         
         # Add user to their notification group
         await self.channel_layer.group_add(
@@ -28,6 +35,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         )
         
         await self.accept()
+
+        # Countdown reminders for upcoming sessions are pushed to this group
+        start_reminder_scheduler()
         
         # Send initial connection confirmation
         await self.send(text_data=json.dumps({
@@ -35,6 +45,11 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'message': 'Connected to notification service'
         }))
 
+        # A reconnecting client passes ?after=<last notification id it saw>
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        if 'after' in query:
+            await self.send_catch_up(parse_cursor(query['after'][0]))
+
     async def disconnect(self, close_code):
         # Remove user from their notification group
         if hasattr(self, 'notification_group_name'):
@@ -45,16 +60,56 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        pass  # Notifications are primarily server-initiated
+        # Notifications are server-initiated; clients only ask to catch up
+        try:
+            data = json.loads(text_data)
+        except (TypeError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('type') == 'catch_up':
+            await self.send_catch_up(parse_cursor(data.get('after')))
+
+    async def send_catch_up(self, cursor):
+        """Send the stored notifications newer than cursor, one page at a time."""
+        notifications, next_cursor, has_more, unread_count = await self.get_notifications_after(cursor)
+        await self.send(text_data=json.dumps({
+            'type': 'notification_backlog',
+            'notifications': notifications,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'unread_count': unread_count,
+        }))
+
+    @database_sync_to_async
+    def get_notifications_after(self, cursor):
+        notifications, next_cursor, has_more = notifications_after(self.user.id, cursor)
+        unread_count = type(self.user).objects.filter(pk=self.user.id).values_list(
+            'unread_notification_count', flat=True
+        ).first() or 0
+        return [serialize_notification(n) for n in notifications], next_cursor, has_more, unread_count
 
     # Receive message from notification group
     async def notification_message(self, event):
         # Send notification to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'notification',
+            'id': event.get('id'),
+            'category': event.get('category', 'system'),
             'message': event['message'],
             'title': event.get('title', 'Notification'),
-            'timestamp': timezone.now().isoformat(),
+            'timestamp': event.get('timestamp') or timezone.now().isoformat(),
             'link': event.get('link', None),
-            'data': event.get('data', {})
+            'data': event.get('data', {}),
+            'unread_count': event.get('unread_count'),
+        }))
+
+    # Receive countdown reminder from the session reminder scheduler
+    async def session_reminder(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'session_reminder',
+            'session_id': event['session_id'],
+            'title': event.get('title', ''),
+            'start_time': event['start_time'],
+            'seconds_left': event['seconds_left'],
+            'sound': event.get('sound'),
+            'link': event.get('link'),
         }))
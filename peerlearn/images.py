@@ -0,0 +1,234 @@
+"""
+Responsive image derivatives for uploaded thumbnails and avatars.
+
+Every uploaded image gets fixed-size derivatives (small, medium and retina)
+in WebP and JPEG, stored next to the original as
+``<original name>.<size>.<format>`` (e.g. ``me.png.small.webp``), plus a
+``<original name>.derivatives.json`` manifest of the widths actually
+written. They are generated with Pillow in a small
+thread pool after the upload is committed; Pillow releases the GIL while
+resizing and encoding, so the threads run in parallel. Templates use the
+``responsive_image`` tag to serve them through ``srcset``, which lets list
+pages load a few kilobytes per card instead of the full-size upload.
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Derivative sizes per kind of image as (name, width, height); images are
+# scaled and center-cropped to exactly this size
+DERIVATIVE_SIZES = {
+    'thumbnail': (('small', 320, 180), ('medium', 640, 360), ('retina', 1280, 720)),
+    'avatar': (('small', 48, 48), ('medium', 96, 96), ('retina', 192, 192)),
+}
+
+# (format, file extension, Pillow save options), preferred format first
+DERIVATIVE_FORMATS = (
+    ('webp', 'webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    ('jpeg', 'jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+# Derivative widths by size name, per original name whose derivatives are
+# known to exist; bounded so it cannot grow forever
+_known_derivatives = {}
+MAX_KNOWN_DERIVATIVES = 10000
+
+# Names found without a manifest, with the monotonic time until which that
+# answer is reused, so rendering or saving an image that has no
+# derivatives yet does not hit storage every time
+_missing_derivatives = {}
+MISSING_DERIVATIVES_TTL = 30  # seconds
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def derivative_name(name, size, image_format):
+    """
+    Return the storage name of one derivative of an original image.
+
+    The full original name is kept, so me.png and me.jpg get their own
+    derivatives.
+    """
+    extension = next(ext for fmt, ext, options in DERIVATIVE_FORMATS if fmt == image_format)
+    return f"{name}.{size}.{extension}"
+
+
+def manifest_name(name):
+    """Return the storage name of the manifest listing an image's derivative widths."""
+    return f"{name}.derivatives.json"
+
+
+def derivative_names(name, kind):
+    """Return every derivative name of an original image."""
+    return [
+        derivative_name(name, size, image_format)
+        for size, width, height in DERIVATIVE_SIZES[kind]
+        for image_format, ext, options in DERIVATIVE_FORMATS
+    ]
+
+
+def has_derivatives(name, kind, storage=default_storage):
+    """
+    Return True when an image's derivatives have been generated.
+
+    The manifest is written last, so a partly processed image counts as
+    missing.
+    """
+    return derivative_widths(name, kind, storage) is not None
+
+
+def derivative_widths(name, kind, storage=default_storage):
+    """
+    Return the width of each derivative size of an image, or None if missing.
+
+    Small originals are not upscaled, so the widths can be below the
+    nominal DERIVATIVE_SIZES. Found manifests are remembered per process,
+    missing ones for MISSING_DERIVATIVES_TTL seconds.
+    """
+    if name in _known_derivatives:
+        return _known_derivatives[name]
+    if _missing_derivatives.get(name, 0) > time.monotonic():
+        return None
+    try:
+        with storage.open(manifest_name(name), 'rb') as manifest:
+            widths = json.load(manifest)
+    except (OSError, ValueError):
+        widths = None
+    if widths is None or set(widths) != {size for size, width, height in DERIVATIVE_SIZES[kind]}:
+        if len(_missing_derivatives) >= MAX_KNOWN_DERIVATIVES:
+            _missing_derivatives.clear()
+        _missing_derivatives[name] = time.monotonic() + MISSING_DERIVATIVES_TTL
+        return None
+    _remember(name, widths)
+    return widths
+
+
+def generate_derivatives(name, kind, storage=default_storage):
+    """Create (or replace) all derivatives of a stored image."""
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image)
+        image = _flatten(image)
+
+    widths = {}
+    for size, width, height in DERIVATIVE_SIZES[kind]:
+        # Upscaling small uploads only adds bytes; cap at the original size
+        target = _fit_within((width, height), image.size)
+        resized = ImageOps.fit(image, target, method=Image.LANCZOS)
+        for image_format, ext, options in DERIVATIVE_FORMATS:
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            _replace(storage, derivative_name(name, size, image_format), buffer.getvalue())
+        widths[size] = resized.width
+
+    _replace(storage, manifest_name(name), json.dumps(widths).encode())
+    _remember(name, widths)
+
+
+def delete_derivatives(name, kind, storage=default_storage):
+    """Remove the derivatives of an image, e.g. when the original is replaced or deleted."""
+    _known_derivatives.pop(name, None)
+    _missing_derivatives.pop(name, None)
+    # Manifest first, so a half-deleted image counts as missing
+    for target_name in [manifest_name(name)] + derivative_names(name, kind):
+        if storage.exists(target_name):
+            storage.delete(target_name)
+
+
+def schedule_derivatives(name, kind):
+    """
+    Generate derivatives in the worker pool once the current transaction commits.
+
+    With IMAGE_DERIVATIVES_ASYNC disabled they are generated immediately,
+    which keeps scripts and tests deterministic.
+    """
+    if not getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True):
+        _generate_logged(name, kind)
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_generate_logged, name, kind))
+
+
+def schedule_delete_derivatives(name, kind):
+    """Remove an image's derivatives once the current transaction commits."""
+    transaction.on_commit(lambda: delete_derivatives(name, kind))
+
+
+def srcset(name, kind, image_format):
+    """
+    Return a srcset attribute value listing every size in one format.
+
+    Uses the widths actually written; sizes that came out the same width
+    (small originals are not upscaled) are listed once.
+    """
+    widths = derivative_widths(name, kind) or {
+        size: width for size, width, height in DERIVATIVE_SIZES[kind]
+    }
+    candidates = {}
+    for size, width, height in DERIVATIVE_SIZES[kind]:
+        candidates.setdefault(widths[size], size)
+    return ', '.join(
+        f"{default_storage.url(derivative_name(name, size, image_format))} {width}w"
+        for width, size in candidates.items()
+    )
+
+
+def _replace(storage, name, content):
+    # Storage would rename on collision; replace the old file instead
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def _remember(name, widths):
+    _missing_derivatives.pop(name, None)
+    if len(_known_derivatives) >= MAX_KNOWN_DERIVATIVES:
+        _known_derivatives.clear()
+    _known_derivatives[name] = widths
+
+
+def _generate_logged(name, kind):
+    try:
+        generate_derivatives(name, kind)
+    except Exception:
+        logger.exception(f"Could not generate image derivatives for {name}")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2),
+                thread_name_prefix='image-derivatives',
+            )
+        return _executor
+
+
+def _flatten(image):
+    """Convert to RGB, compositing transparency onto white (JPEG has no alpha)."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _fit_within(target, available):
+    """Scale the target size down, keeping its aspect ratio, to fit the original."""
+    width, height = target
+    scale = min(1.0, available[0] / width, available[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
@@ -0,0 +1,226 @@
+"""
+Conservative JavaScript and CSS minifiers for the static build.
+
+rjsmin and rcssmin are used when installed. Otherwise the built-in
+minifiers below remove comments and redundant whitespace only. They keep
+line breaks between statements, so automatic semicolon insertion behaves
+exactly as in the source. Strings, template literals and regular expression
+literals are copied unchanged, and /*! ... */ license comments are kept.
+"""
+
+import re
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+# A space next to one of these can never be needed to separate two tokens
+JS_TIGHT_CHARS = set('{}()[];,:=?<>&|!')
+# After these, a newline cannot end a statement, so it can be dropped
+JS_CONTINUATION_CHARS = set('{;,(')
+# A '/' after one of these characters starts a regular expression, not a division
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'throw', 'new',
+    'instanceof', 'yield', 'await',
+}
+IDENTIFIER_CHAR = re.compile(r'[\w$]')
+
+
+def minify_js(source):
+    """Return minified JavaScript source."""
+    if rjsmin is not None:
+        return rjsmin.jsmin(source, keep_bang_comments=True)
+    return _JsMinifier(source).run()
+
+
+def minify_css(source):
+    """Return minified CSS source."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source, keep_bang_comments=True)
+
+    out = []
+    i = 0
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char in '"\'':
+            end = _string_end(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if source.startswith('/*!', i):
+                out.append(source[i:end])
+            i = end
+        elif char.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = source[i:i + 1]
+            if previous and following and previous not in '{};,>' and following not in '{};,>':
+                out.append(' ')
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).replace(';}', '}').strip() + '\n'
+
+
+def _string_end(source, start):
+    """Index just past the quoted string starting at start."""
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == quote or source[i] == '\n':
+            return i + 1
+        i += 1
+    return len(source)
+
+
+class _JsMinifier:
+    """Single-pass scanner that strips JavaScript comments and whitespace."""
+
+    def __init__(self, source):
+        self.source = source
+        self.out = []
+        # One brace depth per open ${...} of a template literal
+        self.template_braces = []
+
+    def last(self):
+        return self.out[-1][-1:] if self.out else ''
+
+    def last_word(self):
+        text = ''.join(self.out[-3:])
+        match = re.search(r'[\w$]+$', text)
+        return match.group(0) if match else ''
+
+    def emit_space(self, newline, following):
+        previous = self.last()
+        if not previous or previous == '\n':
+            return
+        if newline:
+            if previous == ' ':
+                self.out.pop()
+                previous = self.last()
+            if previous not in JS_CONTINUATION_CHARS and previous != '\n':
+                self.out.append('\n')
+        elif previous not in JS_TIGHT_CHARS and following not in JS_TIGHT_CHARS:
+            self.out.append(' ')
+
+    def run(self):
+        source = self.source
+        n = len(source)
+        i = 0
+        while i < n:
+            char = source[i]
+            if char in '"\'':
+                end = _string_end(source, i)
+                self.out.append(source[i:end])
+                i = end
+            elif char == '`':
+                i = self.template(i + 1)
+            elif source.startswith('//', i):
+                end = source.find('\n', i)
+                i = n if end == -1 else end
+            elif source.startswith('/*', i):
+                end = source.find('*/', i + 2)
+                end = n if end == -1 else end + 2
+                if source.startswith('/*!', i):
+                    self.out.append(source[i:end])
+                else:
+                    # A comment spanning lines still separates statements
+                    self.emit_space('\n' in source[i:end], source[end:end + 1])
+                i = end
+            elif char == '/' and self.starts_regex():
+                i = self.regex(i)
+            elif char.isspace():
+                start = i
+                while i < n and source[i].isspace():
+                    i += 1
+                self.emit_space('\n' in source[start:i], source[i:i + 1])
+            elif char == '}' and self.template_braces and self.template_braces[-1] == 0:
+                # End of a ${...} expression: continue the template literal
+                self.template_braces.pop()
+                self.out.append(char)
+                i = self.template(i + 1)
+            else:
+                if self.template_braces:
+                    if char == '{':
+                        self.template_braces[-1] += 1
+                    elif char == '}':
+                        self.template_braces[-1] -= 1
+                if char == '}' and self.out and self.out[-1] == '\n':
+                    self.out.pop()
+                self.out.append(char)
+                i += 1
+        return ''.join(self.out).strip() + '\n'
+
+    def starts_regex(self):
+        previous = self.last()
+        if not previous or previous == '\n':
+            return True
+        if previous in JS_REGEX_PRECEDERS:
+            return True
+        if IDENTIFIER_CHAR.match(previous):
+            return self.last_word() in JS_REGEX_KEYWORDS
+        return False
+
+    def regex(self, start):
+        """Copy a regular expression literal and its flags; return the index after it."""
+        source = self.source
+        i = start + 1
+        in_class = False
+        while i < len(source) and source[i] != '\n':
+            char = source[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                i += 1
+                while i < len(source) and IDENTIFIER_CHAR.match(source[i]):
+                    i += 1
+                break
+            i += 1
+        self.out.append(source[start:i])
+        return i
+
+    def template(self, start):
+        """
+        Copy template literal text from start (just after ` or }).
+
+        Returns the index after the closing backtick, or after the ${ that
+        opens an embedded expression, which is then scanned as code.
+        """
+        source = self.source
+        i = start
+        if source[start - 1] == '`':
+            self.out.append('`')
+        while i < len(source):
+            char = source[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char == '`':
+                self.out.append(source[start:i + 1])
+                return i + 1
+            if source.startswith('${', i):
+                self.out.append(source[start:i + 2])
+                self.template_braces.append(0)
+                return i + 2
+            i += 1
+        self.out.append(source[start:])
+        return len(source)
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'admin_panel.profiling.RequestProfilingMiddleware',  # No-op unless REQUEST_PROFILING_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # For i18n
@@ -93,6 +94,33 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Countdown reminders (T-5 min, T-1 min, T-10 s) pushed to session participants
+# by an asyncio task in the ASGI process; see learning_sessions.reminders
+SESSION_REMINDERS_ENABLED = os.getenv('SESSION_REMINDERS_ENABLED', 'True') == 'True'
+SESSION_REMINDER_HORIZON = 3600  # seconds of upcoming sessions kept in memory
+SESSION_REMINDER_RELOAD_INTERVAL = 30  # seconds between incremental reloads
+
+# Session catalog facet counts (tags, price and rating bands) in the default
+# cache; see learning_sessions.catalog
+CATALOG_FACET_CACHE_TTL = 60  # seconds
+
+# Per-learner recommendation cache (ranked session ids in the default cache);
+# see learning_sessions.recommendation_cache
+RECOMMENDATION_CACHE_TTL = int(os.getenv('RECOMMENDATION_CACHE_TTL', '900'))  # seconds
+
+# TF-IDF vectors of upcoming sessions for content-based recommendations,
+# saved so new workers start warm; see learning_sessions.content_model
+CONTENT_MODEL_PATH = os.getenv('CONTENT_MODEL_PATH', str(BASE_DIR / 'var' / 'content_model.npz'))
+CONTENT_MODEL_REFRESH_INTERVAL = 60  # seconds between incremental refreshes
+
+# Rankings stored by the nightly precompute_recommendations job are used
+# while younger than this; older ones are ignored and computed live
+RECOMMENDATION_PRECOMPUTE_MAX_AGE = 2 * 24 * 3600  # seconds
+
+# Analytics page results (revenue forecast, learner engagement) stored by
+# the precompute_analytics job; older ones are recomputed on the next page view
+ANALYTICS_SNAPSHOT_MAX_AGE = 2 * 3600  # seconds
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -132,10 +160,29 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic minifies, fingerprints and precompresses (gzip/Brotli) assets
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'peerlearn.storage.MinifiedManifestStaticFilesStorage',
+    },
+}
+
+# Serve STATIC_ROOT from Django when no front-end web server does it;
+# fingerprinted files get immutable one-year cache headers
+SERVE_STATIC = os.getenv('SERVE_STATIC', 'False') == 'True'
+STATIC_MAX_AGE = 300  # seconds, for files without a content hash
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resized WebP/JPEG derivatives of uploaded thumbnails and avatars
+IMAGE_DERIVATIVES_ASYNC = os.getenv('IMAGE_DERIVATIVES_ASYNC', 'True') == 'True'
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', '2'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -170,6 +217,27 @@ X_FRAME_OPTIONS = 'DENY'
 # Admin security
 ADMIN_SECURITY_LOG_FILE = BASE_DIR / 'logs' / 'admin_security.log'
 
+# Admin audit log writer: entries are buffered and written in batches
+ADMIN_AUDIT_LOG_ASYNC = os.getenv('ADMIN_AUDIT_LOG_ASYNC', 'True') == 'True'
+ADMIN_AUDIT_LOG_BATCH_SIZE = 200
+ADMIN_AUDIT_LOG_FLUSH_INTERVAL = 2.0  # seconds
+ADMIN_AUDIT_LOG_QUEUE_SIZE = 10000  # entries beyond this are dropped and counted
+
+# Audit log retention: older rows are moved to monthly gzip JSONL archives
+ADMIN_AUDIT_LOG_RETENTION_DAYS = int(os.getenv('ADMIN_AUDIT_LOG_RETENTION_DAYS', '90'))
+ADMIN_AUDIT_LOG_ARCHIVE_DIR = BASE_DIR / 'logs' / 'audit_archive'
+
+# Request profiling: a sampled share of requests is timed (SQL, templates,
+# views); slow ones go to a rotating log. With SERVER_TIMING, staff users
+# also get the breakdown in a Server-Timing header
+REQUEST_PROFILING_ENABLED = os.getenv('REQUEST_PROFILING_ENABLED', 'False') == 'True'
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', '0.05'))
+REQUEST_PROFILING_SLOW_MS = int(os.getenv('REQUEST_PROFILING_SLOW_MS', '500'))
+REQUEST_PROFILING_SERVER_TIMING = os.getenv('REQUEST_PROFILING_SERVER_TIMING', 'False') == 'True'
+REQUEST_PROFILING_LOG_FILE = BASE_DIR / 'logs' / 'slow_requests.log'
+REQUEST_PROFILING_LOG_MAX_BYTES = 10 * 1024 * 1024
+REQUEST_PROFILING_LOG_BACKUP_COUNT = 5
+
 # Logging configuration for security events
 LOGGING = {
     'version': 1,
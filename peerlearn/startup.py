@@ -0,0 +1,126 @@
+"""
+Cold-start benchmark for workers.
+
+A new worker sets Django up and loads the URLconf before it serves its
+first request, which imports every app, model, signal handler and view
+module. measure_startup() does the same in a fresh interpreter run with
+``python -X importtime`` and parses the per-module timings it prints.
+
+Two budgets are checked against the median of several runs:
+- MAX_STARTUP_MS, the total import time
+- LAZY_MODULES, heavy dependencies that must only be imported by the code
+  paths that use them (analytics, the payment gateway)
+
+NumPy is not in LAZY_MODULES: daphne's app config imports the Twisted
+server, whose WebSocket library (autobahn) imports NumPy, so every worker
+loads it with daphne in INSTALLED_APPS.
+
+The first run also writes bytecode caches, so it is not counted.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+# What a worker runs before serving its first request
+STARTUP_CODE = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+# Maximum total import time of a worker, in milliseconds
+MAX_STARTUP_MS = 1500
+
+# Top-level packages that must not be imported at startup
+LAZY_MODULES = ('pandas', 'razorpay', 'requests')
+
+DEFAULT_RUNS = 5
+
+# import time: <self us> | <cumulative us> | <indentation><module>
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns (module, self_us, cumulative_us, depth) per imported module, in
+    the order printed. Modules at depth 0 were imported directly rather than
+    by another module, so their cumulative times add up to the total.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def run_startup(python=sys.executable):
+    """Boot Django once in a fresh interpreter and return the parsed import timings."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'peerlearn.settings'))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f'Worker startup failed:\n{result.stderr[-2000:]}')
+    return parse_importtime(result.stderr)
+
+
+def measure_startup(runs=DEFAULT_RUNS, top=15):
+    """
+    Measure worker startup over several runs.
+
+    Returns a report dict with the median total import time, the median
+    self time per top-level package and the slowest modules (by cumulative
+    time) of the median run, and the LAZY_MODULES that were imported.
+    """
+    run_startup()  # warm the bytecode caches
+    timings = [run_startup() for _ in range(runs)]
+    totals = [sum(cumulative for _module, _self, cumulative, depth in modules if depth == 0) for modules in timings]
+    median_run = timings[totals.index(sorted(totals)[len(totals) // 2])]
+
+    packages = defaultdict(list)
+    for modules in timings:
+        per_package = defaultdict(int)
+        for module, self_us, _cumulative, _depth in modules:
+            per_package[module.split('.')[0]] += self_us
+        for package, self_us in per_package.items():
+            packages[package].append(self_us)
+
+    imported = {module.split('.')[0] for modules in timings for module, *_rest in modules}
+    slowest = sorted(median_run, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        'runs': runs,
+        'total_ms': round(statistics.median(totals) / 1000, 1),
+        'max_total_ms': MAX_STARTUP_MS,
+        'modules_imported': len(median_run),
+        'packages': sorted(
+            ({'package': package, 'self_ms': round(statistics.median(values) / 1000, 1)}
+             for package, values in packages.items()),
+            key=lambda row: row['self_ms'], reverse=True,
+        )[:top],
+        'slowest_modules': [
+            {'module': module, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+            for module, self_us, cumulative_us, _depth in slowest
+        ],
+        'lazy_modules_imported': sorted(imported & set(LAZY_MODULES)),
+    }
+
+
+def budget_problems(report):
+    """Return the startup budget violations in a measure_startup() report."""
+    problems = []
+    if report['total_ms'] > MAX_STARTUP_MS:
+        problems.append(f"startup imports take {report['total_ms']}ms > budget of {MAX_STARTUP_MS}ms")
+    for module in report['lazy_modules_imported']:
+        problems.append(f'{module} is imported at startup')
+    return problems
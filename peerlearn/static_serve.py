@@ -0,0 +1,108 @@
+"""
+Serve collected static files with precompressed variants and cache headers.
+
+Meant for deployments where Daphne serves everything and no front-end web
+server sits in front of it; enable with SERVE_STATIC. Fingerprinted files
+from the manifest are served with an immutable one-year Cache-Control,
+other files with a short max-age. When the client accepts it, the Brotli or
+gzip copy written by MinifiedManifestStaticFilesStorage is sent instead of
+the original.
+"""
+
+import mimetypes
+import os
+import posixpath
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# (Accept-Encoding token, file suffix), preferred encoding first
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@lru_cache(maxsize=1)
+def _hashed_names():
+    """Names of fingerprinted files in the manifest, which never change content."""
+    return frozenset(staticfiles_storage.hashed_files.values())
+
+
+def accepted_encodings(header):
+    """
+    Return the set of content codings an Accept-Encoding header allows.
+
+    Codings listed with q=0 are refused; a '*' entry allows every
+    precompressed coding not listed explicitly.
+    """
+    qualities = {}
+    for item in header.split(','):
+        token, *params = [part.strip() for part in item.split(';')]
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _sep, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token.lower()] = quality
+
+    wildcard = qualities.pop('*', None)
+    accepted = {token for token, quality in qualities.items() if quality > 0}
+    if wildcard:
+        accepted.update(token for token, suffix in PRECOMPRESSED_ENCODINGS if token not in qualities)
+    return accepted
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve one file from STATIC_ROOT."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except Exception:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_type, _encoding = mimetypes.guess_type(full_path)
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    served_path = full_path
+    content_encoding = None
+    for token, suffix in PRECOMPRESSED_ENCODINGS:
+        if token in accepted and os.path.isfile(full_path + suffix):
+            served_path = full_path + suffix
+            content_encoding = token
+            break
+
+    stat = os.stat(served_path)
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            if int(parsedate_to_datetime(if_modified_since).timestamp()) >= int(stat.st_mtime):
+                return HttpResponseNotModified()
+        except (TypeError, ValueError, OverflowError):
+            pass
+
+    response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+    # FileResponse would name the .br/.gz file here
+    del response['Content-Disposition']
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Content-Length'] = stat.st_size
+    response['Vary'] = 'Accept-Encoding'
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    if path in _hashed_names():
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response['Cache-Control'] = f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 300)}"
+    return response
@@ -0,0 +1,112 @@
+"""
+Static files storage that minifies, fingerprints and precompresses assets.
+
+collectstatic copies the assets into STATIC_ROOT, then post_process:
+
+1. minifies JavaScript and CSS in place,
+2. lets ManifestStaticFilesStorage add content hashes to the file names
+   and rewrite url() references in CSS,
+3. writes gzip (and, when the brotli package is installed, Brotli) copies
+   of every hashed text asset next to it as <name>.gz and <name>.br.
+
+Hashed names change whenever the content changes, so they can be served
+with immutable far-future cache headers (see peerlearn.static_serve).
+"""
+
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .minify import minify_css, minify_js
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MINIFIERS = {
+    '.js': minify_js,
+    '.css': minify_css,
+}
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json', '.map', '.txt', '.xml', '.html', '.ico')
+# Files below this size are not worth a compressed copy
+MIN_COMPRESS_SIZE = 256
+# Keep a compressed copy only if it saves at least this share of the bytes
+MIN_COMPRESS_SAVING = 0.05
+
+
+class MinifiedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also minifies and precompresses."""
+
+    # Only the final hashed names are referenced, so drop intermediate copies
+    keep_intermediate_files = False
+
+    _warned_no_manifest = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        for name in paths:
+            self._minify(name)
+        # Hash the minified copies in STATIC_ROOT rather than the sources
+        paths = {name: (self, name) for name in paths}
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        for hashed_name in set(self.hashed_files.values()):
+            self._compress(hashed_name)
+
+    def stored_name(self, name):
+        if self.hashed_files:
+            # After collectstatic a missing entry is a broken reference
+            return super().stored_name(name)
+        # Without a manifest (development, tests) assets are served under
+        # their source name
+        if not self._warned_no_manifest:
+            self._warned_no_manifest = True
+            logger.warning(f"No static files manifest in {self.location}; run collectstatic. "
+                           f"Serving unhashed names such as {name}")
+        return name
+
+    def _minify(self, name):
+        minifier = MINIFIERS.get(os.path.splitext(name)[1].lower())
+        if minifier is None or '.min.' in name:
+            return
+        with self.open(name) as source_file:
+            try:
+                source = source_file.read().decode('utf-8')
+            except UnicodeDecodeError:
+                return
+        try:
+            minified = minifier(source)
+        except Exception:
+            logger.exception(f"Could not minify {name}; keeping the original")
+            return
+        if len(minified) < len(source):
+            self.delete(name)
+            self._save(name, ContentFile(minified.encode('utf-8')))
+
+    def _compress(self, name):
+        if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as source_file:
+            content = source_file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) <= len(content) * (1 - MIN_COMPRESS_SAVING):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
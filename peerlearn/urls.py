@@ -4,10 +4,11 @@ Main URL Configuration for peerlearn project.
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic import TemplateView
 from django.utils.translation import gettext_lazy as _
 
+from peerlearn.static_serve import serve_static
 from users.views import landing_page, role_selection_view
 
 urlpatterns = [
@@ -29,3 +30,7 @@ handler500 = 'users.views.handler500'
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+elif settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+    ]
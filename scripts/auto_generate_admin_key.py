@@ -7,7 +7,6 @@ This version doesn't require user input and can be run in an automated environme
 import os
 import sys
 import secrets
-import hashlib
 import datetime
 
 # Add the project root directory to Python path
@@ -22,6 +21,7 @@ django.setup()
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from admin_panel.models import AdminAccessKey, AllowedIP
+from admin_panel.access_keys import hash_access_key
 
 User = get_user_model()
 
@@ -60,7 +60,7 @@ def create_admin_access_key(key_name, expiry_days=None, admin_username=None):
     # Create the key record
     key_obj = AdminAccessKey.objects.create(
         key_name=key_name,
-        key_value=plain_text_key,  # Storing plain text for simplicity - in production use proper hashing
+        key_value=hash_access_key(plain_text_key),  # Only the hash is stored
         expires_at=expires_at,
         created_by=admin_user
     )
@@ -7,7 +7,6 @@ Run this script to create the initial admin access key for secure login.
 import os
 import sys
 import secrets
-import hashlib
 import datetime
 
 # Add the project root directory to Python path
@@ -22,6 +21,7 @@ django.setup()
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from admin_panel.models import AdminAccessKey, AllowedIP
+from admin_panel.access_keys import hash_access_key
 
 User = get_user_model()
 
@@ -45,8 +45,7 @@ def create_admin_access_key(key_name, expiry_days=None, admin_username=None):
     plain_text_key = generate_secure_key(32)
     
     # Store only the hashed version in the database for security
-    # In a real app, we'd use a more sophisticated approach like bcrypt
-    hashed_key = hashlib.sha256(plain_text_key.encode()).hexdigest()
+    hashed_key = hash_access_key(plain_text_key)
     
     # Set expiry date if provided
     expires_at = None
@@ -64,7 +63,7 @@ def create_admin_access_key(key_name, expiry_days=None, admin_username=None):
     # Create the key record
     key_obj = AdminAccessKey.objects.create(
         key_name=key_name,
-        key_value=plain_text_key,  # Storing plain text for simplicity - in production use proper hashing
+        key_value=hashed_key,
         expires_at=expires_at,
         created_by=admin_user
     )
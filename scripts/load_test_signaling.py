@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+"""
+Load test for the WebRTC signaling WebSocket (SessionRTCConsumer).
+
+Opens many simulated clients, grouped into session rooms of one mentor and
+one or more learners, and replays the traffic of a real call: join, the
+mentor's offer, the learners' answers, a burst of ICE candidates from both
+sides and then chat messages until the test ends. Every relayed message
+carries its send time, so each client measures the end-to-end relay latency
+of what it receives. The report lists latency percentiles per message type,
+messages per second and memory per connection.
+
+Two modes:
+
+  In-process (default): the ASGI application runs inside this process with
+  the configured channel layer, through channels' WebsocketCommunicator. No
+  server is needed, which makes it the quickest way to compare consumer or
+  channel layer changes.
+
+      python scripts/load_test_signaling.py --clients 200 --duration 30
+
+  Network: clients connect to a running server over real sockets (needs the
+  websockets package). Pass the server's pid to also measure its memory.
+
+      daphne -b 127.0.0.1 -p 8001 peerlearn.asgi:application
+      python scripts/load_test_signaling.py --url ws://127.0.0.1:8001 \\
+          --clients 500 --server-pid $(pgrep -f "daphne.*8001")
+
+In network mode the load generator shares the machine with the server; with
+hundreds of clients check that this script is not the bottleneck (its CPU
+stays below 100%) before drawing conclusions.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Key under which relayed payloads carry their send time
+PROBE_KEY = 'loadtest_sent'
+
+ICE_CANDIDATE_TEMPLATE = (
+    "candidate:{foundation} 1 udp {priority} 203.0.113.{host} {port} typ srflx "
+    "raddr 10.0.0.{host} rport {port} generation 0 ufrag {ufrag} network-cost 999"
+)
+
+
+class Metrics:
+    """Measurements shared by all simulated clients."""
+
+    def __init__(self):
+        self.connect_times = []
+        self.join_times = []
+        self.latencies = defaultdict(list)
+        self.sent = Counter()
+        self.received = Counter()
+        self.errors = Counter()
+        self.connected = 0
+        # Steady phase window, in time.perf_counter() seconds
+        self.steady_started = None
+        self.steady_stop_at = None
+        self.steady_sent = 0
+        self.steady_received = 0
+
+    def in_steady_phase(self, at):
+        """Whether a time falls inside the steady phase, which excludes ramp-up, leaving and draining."""
+        return self.steady_started is not None and self.steady_started <= at < self.steady_stop_at
+
+
+class InProcessTransport:
+    """WebSocket client talking to the ASGI application inside this process."""
+
+    def __init__(self, application, path):
+        from channels.testing import WebsocketCommunicator
+
+        self.communicator = WebsocketCommunicator(
+            application, path, headers=[(b'host', b'localhost'), (b'origin', b'http://localhost')]
+        )
+
+    async def connect(self):
+        connected, _ = await self.communicator.connect(timeout=10)
+        if not connected:
+            raise ConnectionError('connection rejected')
+
+    async def send(self, text):
+        await self.communicator.send_to(text_data=text)
+
+    async def recv(self):
+        # No timeout: a timed-out receive cancels the application
+        message = await self.communicator.receive_output(timeout=None)
+        if message['type'] == 'websocket.close':
+            raise ConnectionError('closed by server')
+        return message.get('text')
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class NetworkTransport:
+    """WebSocket client connecting to a running server."""
+
+    def __init__(self, url):
+        self.url = url
+        self.websocket = None
+
+    async def connect(self):
+        import websockets
+
+        self.websocket = await websockets.connect(self.url, open_timeout=10, max_size=None)
+
+    async def send(self, text):
+        await self.websocket.send(text)
+
+    async def recv(self):
+        return await self.websocket.recv()
+
+    async def close(self):
+        await self.websocket.close()
+
+
+class SimulatedClient:
+    """One participant of a session room."""
+
+    def __init__(self, transport, room, index, is_mentor, options, metrics, rng):
+        self.transport = transport
+        self.room = room
+        self.user_id = f"load-{room}-{index}"
+        self.user_name = f"{'Mentor' if is_mentor else 'Learner'} {room}-{index}"
+        self.is_mentor = is_mentor
+        self.options = options
+        self.metrics = metrics
+        self.rng = rng
+        self.join_sent = None
+        self.joined = asyncio.Event()
+
+    async def send(self, message_type, **fields):
+        message = {'type': message_type, 'userId': self.user_id, 'userName': self.user_name,
+                   'isMentor': self.is_mentor, **fields}
+        await self.transport.send(json.dumps(message))
+        self.metrics.sent[message_type] += 1
+        if self.metrics.in_steady_phase(time.perf_counter()):
+            self.metrics.steady_sent += 1
+
+    def probe(self, **fields):
+        fields[PROBE_KEY] = time.perf_counter()
+        return fields
+
+    async def send_offer(self):
+        await self.send('offer', offer=self.probe(type='offer', sdp=fake_sdp(self.rng, self.options.sdp_bytes)))
+
+    async def send_answer(self):
+        await self.send('answer', answer=self.probe(type='answer', sdp=fake_sdp(self.rng, self.options.sdp_bytes)))
+
+    async def send_ice_candidates(self):
+        for _ in range(self.options.ice_candidates):
+            candidate = ICE_CANDIDATE_TEMPLATE.format(
+                foundation=self.rng.getrandbits(32), priority=self.rng.getrandbits(31),
+                host=self.rng.randint(1, 254), port=self.rng.randint(1024, 65535),
+                ufrag=f'{self.rng.getrandbits(32):08x}',
+            )
+            await self.send('ice_candidate', candidate=self.probe(candidate=candidate, sdpMid='0', sdpMLineIndex=0))
+            # Candidates trickle in as the browser gathers them
+            await asyncio.sleep(self.rng.uniform(0.005, 0.05))
+
+    async def read_loop(self):
+        while True:
+            try:
+                text = await self.transport.recv()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.metrics.errors['receive'] += 1
+                return
+            received_at = time.perf_counter()
+            try:
+                data = json.loads(text)
+            except (TypeError, ValueError):
+                self.metrics.errors['invalid_json'] += 1
+                continue
+
+            message_type = data.get('type')
+            self.metrics.received[message_type] += 1
+            if self.metrics.in_steady_phase(received_at):
+                self.metrics.steady_received += 1
+
+            if message_type == 'join_ack' and self.join_sent is not None:
+                self.metrics.join_times.append(received_at - self.join_sent)
+                self.joined.set()
+                continue
+
+            payload = data.get({'offer': 'offer', 'answer': 'answer', 'ice_candidate': 'candidate',
+                                'chat_message': 'message'}.get(message_type, ''), None)
+            if isinstance(payload, dict) and PROBE_KEY in payload:
+                self.metrics.latencies[message_type].append(received_at - payload[PROBE_KEY])
+
+            # Answer offers from the mentor; the mentor trickles ICE once answered
+            if message_type == 'offer' and not self.is_mentor and data.get('isMentor'):
+                asyncio.create_task(self.answer_offer())
+            elif message_type == 'answer' and self.is_mentor:
+                asyncio.create_task(self.send_ice_candidates())
+
+    async def answer_offer(self):
+        await self.send_answer()
+        await self.send_ice_candidates()
+
+    async def run(self, start_event, ready, stop_at):
+        started = time.perf_counter()
+        try:
+            await self.transport.connect()
+        except Exception:
+            self.metrics.errors['connect'] += 1
+            ready()
+            return
+        self.metrics.connect_times.append(time.perf_counter() - started)
+        self.metrics.connected += 1
+
+        reader = asyncio.create_task(self.read_loop())
+        try:
+            self.join_sent = time.perf_counter()
+            await self.send('join')
+            try:
+                await asyncio.wait_for(self.joined.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.metrics.errors['join_timeout'] += 1
+            ready()
+
+            await start_event.wait()
+            if self.is_mentor:
+                await self.send_offer()
+
+            while True:
+                delay = self.rng.expovariate(self.options.chat_rate) if self.options.chat_rate > 0 else math.inf
+                if time.perf_counter() + delay >= stop_at():
+                    break
+                await asyncio.sleep(delay)
+                await self.send('chat_message', message=self.probe(text=f"Message from {self.user_name}"))
+
+            await asyncio.sleep(max(stop_at() - time.perf_counter(), 0))
+            await self.send('leave')
+            # Let in-flight relays arrive before closing
+            await asyncio.sleep(self.options.drain)
+        except Exception:
+            self.metrics.errors['send'] += 1
+        finally:
+            reader.cancel()
+            try:
+                await self.transport.close()
+            except Exception:
+                pass
+
+
+def fake_sdp(rng, size):
+    """Return an SDP-like string of roughly the given size in bytes."""
+    header = f"v=0\r\no=- {rng.getrandbits(62)} 2 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n"
+    attribute = "a=rtcp-fb:96 nack pli\r\n"
+    return header + attribute * max((size - len(header)) // len(attribute), 0)
+
+
+def rss_bytes(pid='self'):
+    """Resident memory of a process from /proc, or None where unavailable."""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(math.ceil(pct / 100 * len(ordered)) - 1, 0))]
+
+
+def summarize(values, scale=1000):
+    """Count and percentiles of durations in seconds, reported in milliseconds."""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * scale, 2),
+        'p90_ms': round(percentile(values, 90) * scale, 2),
+        'p99_ms': round(percentile(values, 99) * scale, 2),
+        'max_ms': round(max(values) * scale, 2),
+    }
+
+
+async def run_load_test(options):
+    rng = random.Random(options.seed)
+    metrics = Metrics()
+    memory_pid = options.server_pid if options.url else 'self'
+
+    if options.url:
+        base_url = options.url.rstrip('/')
+
+        def make_transport(session_id):
+            return NetworkTransport(f"{base_url}/ws/session/{session_id}/")
+    else:
+        from peerlearn.asgi import application
+
+        def make_transport(session_id):
+            return InProcessTransport(application, f"/ws/session/{session_id}/")
+
+    rooms = math.ceil(options.clients / options.room_size)
+    start_event = asyncio.Event()
+    pending = options.clients
+    steady = {'stop_at': math.inf}
+
+    def ready():
+        nonlocal pending
+        pending -= 1
+        if pending == 0:
+            # Open the steady window before any client is released
+            metrics.steady_started = time.perf_counter()
+            metrics.steady_stop_at = steady['stop_at'] = metrics.steady_started + options.duration
+            start_event.set()
+
+    rss_before = rss_bytes(memory_pid) if memory_pid else None
+    clients = []
+    for number in range(options.clients):
+        room, index = divmod(number, options.room_size)
+        session_id = options.first_session_id + room
+        clients.append(SimulatedClient(
+            make_transport(session_id), room, index, index == 0, options, metrics,
+            random.Random(rng.getrandbits(64)),
+        ))
+
+    tasks = []
+    ramp_started = time.perf_counter()
+    for client in clients:
+        tasks.append(asyncio.create_task(client.run(start_event, ready, lambda: steady['stop_at'])))
+        if options.ramp_up:
+            await asyncio.sleep(options.ramp_up / options.clients)
+
+    await start_event.wait()
+    ramp_time = metrics.steady_started - ramp_started
+    rss_connected = rss_bytes(memory_pid) if memory_pid else None
+
+    await asyncio.gather(*tasks)
+    # Only the steady window counts; leaving, draining and closing come after it
+    steady_time = metrics.steady_stop_at - metrics.steady_started
+
+    report = {
+        'mode': 'network' if options.url else 'in-process',
+        'clients': options.clients,
+        'connected': metrics.connected,
+        'rooms': rooms,
+        'room_size': options.room_size,
+        'ramp_up_s': round(ramp_time, 2),
+        'duration_s': round(steady_time, 2),
+        'connect': summarize(metrics.connect_times),
+        'join_ack': summarize(metrics.join_times),
+        'relay_latency': {message_type: summarize(values) for message_type, values in sorted(metrics.latencies.items())},
+        'messages_sent': dict(metrics.sent),
+        'messages_received': dict(metrics.received),
+        'received_per_second': round(metrics.steady_received / steady_time, 1) if steady_time else None,
+        'sent_per_second': round(metrics.steady_sent / steady_time, 1) if steady_time else None,
+        'errors': dict(metrics.errors),
+    }
+    if rss_before is not None and rss_connected is not None and metrics.connected:
+        report['memory'] = {
+            'measured_process': 'server' if options.url else 'load generator and application',
+            'rss_before_mb': round(rss_before / 2 ** 20, 1),
+            'rss_connected_mb': round(rss_connected / 2 ** 20, 1),
+            'per_connection_kb': round((rss_connected - rss_before) / metrics.connected / 1024, 1),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n===== SIGNALING LOAD TEST ({report['mode']}) =====")
+    print(f"Clients: {report['connected']}/{report['clients']} connected in {report['rooms']} rooms "
+          f"of {report['room_size']}, ramp-up {report['ramp_up_s']}s, steady phase {report['duration_s']}s")
+
+    print("\n{:<20} {:>8} {:>10} {:>10} {:>10} {:>10}".format('Latency', 'Count', 'p50 ms', 'p90 ms', 'p99 ms', 'Max ms'))
+    print("-" * 72)
+    rows = [('connect', report['connect']), ('join_ack', report['join_ack'])]
+    rows += [(f"relay {message_type}", stats) for message_type, stats in report['relay_latency'].items()]
+    for label, stats in rows:
+        if stats['count']:
+            print("{:<20} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+                label, stats['count'], stats['p50_ms'], stats['p90_ms'], stats['p99_ms'], stats['max_ms']
+            ))
+
+    print(f"\nMessages sent: {sum(report['messages_sent'].values())} "
+          f"({report['sent_per_second']}/s during the steady phase)")
+    print(f"Messages received: {sum(report['messages_received'].values())} "
+          f"({report['received_per_second']}/s during the steady phase)")
+    if 'memory' in report:
+        memory = report['memory']
+        print(f"Memory ({memory['measured_process']}): {memory['rss_before_mb']} MB -> "
+              f"{memory['rss_connected_mb']} MB, {memory['per_connection_kb']} KB per connection")
+    if report['errors']:
+        print(f"Errors: {report['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the session signaling WebSocket')
+    parser.add_argument('--url', help='Server base URL such as ws://127.0.0.1:8001; omit to run in-process')
+    parser.add_argument('--clients', type=int, default=100, help='Number of simulated clients')
+    parser.add_argument('--room-size', type=int, default=2, help='Clients per session room (one mentor)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of chat traffic after everyone joined')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which clients connect')
+    parser.add_argument('--chat-rate', type=float, default=0.2, help='Chat messages per second per client')
+    parser.add_argument('--ice-candidates', type=int, default=8, help='ICE candidates sent per peer')
+    parser.add_argument('--sdp-bytes', type=int, default=2500, help='Approximate size of offers and answers')
+    parser.add_argument('--drain', type=float, default=1.0, help='Seconds to wait for in-flight messages at the end')
+    parser.add_argument('--first-session-id', type=int, default=900000, help='Session id of the first room')
+    parser.add_argument('--server-pid', type=int, help='Server process id for memory measurement (network mode)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', help='Also write the report as JSON to this file')
+    options = parser.parse_args()
+
+    if options.clients < 1 or options.room_size < 1:
+        parser.error('--clients and --room-size must be at least 1')
+    if not options.url:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'peerlearn.settings')
+
+    report = asyncio.run(run_load_test(options))
+    print_report(report)
+    if options.json_path:
+        with open(options.json_path, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nReport written to {options.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,10 @@ document.addEventListener('DOMContentLoaded', () => {
         notificationsContainer: null,
         notificationCount: 0,
         
+        // Id of the newest stored notification seen, for catching up on reconnect
+        cursorKey: 'peerlearn.notificationCursor',
+        maxBacklogToasts: 3,
+        
         // Initialize the notification system
         init() {
             // Create notifications container if it doesn't exist
@@ -105,6 +109,53 @@ document.addEventListener('DOMContentLoaded', () => {
             console.log('WebSocket connection established');
             this.connected = true;
             this.reconnectAttempts = 0;
+            
+            // Fetch anything stored while this page was not connected
+            const cursor = this.getCursor();
+            if (cursor !== null) {
+                this.socket.send(JSON.stringify({ type: 'catch_up', after: cursor }));
+            }
+        },
+        
+        getCursor() {
+            try {
+                const value = window.localStorage.getItem(this.cursorKey);
+                return value === null ? null : parseInt(value, 10);
+            } catch (e) {
+                return null;
+            }
+        },
+        
+        setCursor(id) {
+            if (!id) return;
+            const cursor = this.getCursor();
+            if (cursor === null || id > cursor) {
+                try {
+                    window.localStorage.setItem(this.cursorKey, String(id));
+                } catch (e) {
+                    // Storage may be unavailable (private mode); catch-up is skipped
+                }
+            }
+        },
+        
+        // Update every unread badge on the page
+        updateUnreadCount(count) {
+            if (typeof count !== 'number') return;
+            document.querySelectorAll('[data-notification-count]').forEach(el => {
+                el.textContent = count > 99 ? '99+' : String(count);
+                el.classList.toggle('hidden', count === 0);
+            });
+        },
+        
+        // Stored notifications missed while disconnected
+        handleBacklog(data) {
+            const unread = data.notifications.filter(n => !n.is_read);
+            unread.slice(-this.maxBacklogToasts).forEach(n => this.showNotification(n));
+            data.notifications.forEach(n => this.setCursor(n.id));
+            this.updateUnreadCount(data.unread_count);
+            if (data.has_more && this.connected) {
+                this.socket.send(JSON.stringify({ type: 'catch_up', after: data.next_cursor }));
+            }
         },
         
         handleSocketMessage(event) {
@@ -113,7 +164,13 @@ document.addEventListener('DOMContentLoaded', () => {
                 
                 // Handle different types of notifications
                 if (data.type === 'notification') {
+                    this.setCursor(data.id);
+                    this.updateUnreadCount(data.unread_count);
                     this.showNotification(data);
+                } else if (data.type === 'notification_backlog') {
+                    this.handleBacklog(data);
+                } else if (data.type === 'session_reminder') {
+                    this.handleSessionReminder(data);
                 } else if (data.type === 'session_update') {
                     this.handleSessionUpdate(data);
                 } else if (data.type === 'system_message') {
@@ -311,6 +368,36 @@ document.addEventListener('DOMContentLoaded', () => {
             });
         },
         
+        // Countdown reminder pushed by the server before a session starts
+        handleSessionReminder(data) {
+            // The session room plays its own countdown sounds
+            if (window.location.pathname.indexOf(`/sessions/${data.session_id}/room`) === 0) {
+                return;
+            }
+            
+            const seconds = data.seconds_left;
+            const when = seconds >= 60
+                ? `${Math.round(seconds / 60)} minute${seconds >= 120 ? 's' : ''}`
+                : `${seconds} seconds`;
+            
+            if (data.sound) {
+                const audio = new Audio(data.sound);
+                const playPromise = audio.play();
+                if (playPromise !== undefined) {
+                    playPromise.catch(error => console.log('Reminder sound blocked:', error));
+                }
+            }
+            
+            this.showNotification({
+                title: data.title || 'Session reminder',
+                message: `Your session starts in ${when}.`,
+                type: 'warning',
+                icon: 'clock',
+                duration: seconds > 10 ? 10000 : 8000,
+                actions: data.link ? [{ text: 'Join session', url: data.link, primary: true }] : null
+            });
+        },
+        
         // Display a system message
         showSystemMessage(data) {
             this.showNotification({
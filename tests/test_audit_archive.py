@@ -0,0 +1,142 @@
+"""
+Archival, compaction and search of the admin audit log (admin_panel.audit_archive).
+"""
+
+import gzip
+import tempfile
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from admin_panel import audit_archive
+from admin_panel.audit_archive import (
+    _append_rows, archive_old_logs, archive_path, compact_archive, iter_archive, search_archived_logs,
+)
+from admin_panel.models import AdminAccessLog
+from users.models import User
+
+
+def stamp(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def member_count(path):
+    """Number of gzip members in an archive file."""
+    data, members = Path(path).read_bytes(), 0
+    while data:
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+    return members
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AuditArchiveTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive_dir = Path(directory.name)
+        settings_override = override_settings(ADMIN_AUDIT_LOG_ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password', is_staff=True
+        )
+        for timestamp, ip in (
+            (stamp(2020, 1, 15, 9, 0), '10.0.0.1'),
+            (stamp(2020, 1, 31, 23, 30), '10.0.0.2'),
+            (stamp(2020, 2, 1, 0, 10), '10.0.0.1'),
+            (stamp(2020, 2, 20, 12, 0), '10.0.0.3'),
+        ):
+            self.log(timestamp, ip)
+        self.recent = self.log(timezone.now(), '10.0.0.1')
+
+    def log(self, timestamp, ip):
+        return AdminAccessLog.objects.create(
+            user=self.admin, ip_address=ip, action='page_view', path='/admin-panel/',
+            status='success', timestamp=timestamp, details='',
+        )
+
+    def test_rows_land_in_their_monthly_member(self):
+        result = archive_old_logs(retention_days=30, batch_size=3)
+        self.assertEqual(result['archived'], 4)
+        january, february = archive_path(None, 2020, 1), archive_path(None, 2020, 2)
+        self.assertEqual(result['files'], sorted([str(january), str(february)]))
+        self.assertEqual([record['ip_address'] for record in iter_archive(january)], ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual([record['ip_address'] for record in iter_archive(february)], ['10.0.0.1', '10.0.0.3'])
+        record = next(iter_archive(january))
+        self.assertEqual(record['user_email'], 'admin@example.com')
+        self.assertEqual(record['timestamp'], '2020-01-15T09:00:00+00:00')
+        # Only the recent row is left in the database
+        self.assertEqual(list(AdminAccessLog.objects.values_list('id', flat=True)), [self.recent.id])
+
+    def test_batches_are_appended_as_members(self):
+        archive_old_logs(retention_days=30, batch_size=1)
+        self.assertEqual(member_count(archive_path(None, 2020, 1)), 2)
+
+    def test_dry_run_writes_and_deletes_nothing(self):
+        result = archive_old_logs(retention_days=30, dry_run=True)
+        self.assertEqual(result['archived'], 4)
+        self.assertEqual(list(self.archive_dir.iterdir()), [])
+        self.assertEqual(AdminAccessLog.objects.count(), 5)
+
+    def test_rows_are_kept_when_archiving_fails(self):
+        with mock.patch.object(audit_archive.os, 'fsync', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                archive_old_logs(retention_days=30)
+        self.assertEqual(AdminAccessLog.objects.count(), 5)
+
+    def test_rerun_after_interruption_does_not_duplicate_after_compaction(self):
+        # A run that wrote a batch but was interrupted before deleting it
+        rows = list(
+            AdminAccessLog.objects.filter(timestamp__lt=stamp(2020, 2, 1))
+            .order_by('timestamp').values(*audit_archive.ARCHIVE_FIELDS)
+        )
+        _append_rows(rows, None)
+
+        archive_old_logs(retention_days=30, compact=True)
+        january = archive_path(None, 2020, 1)
+        self.assertEqual(member_count(january), 1)
+        self.assertEqual(
+            [record['id'] for record in iter_archive(january)], [row['id'] for row in rows]
+        )
+        # Compacting again keeps the same rows
+        self.assertEqual(compact_archive(january), 2)
+
+    def test_compaction_produces_a_valid_single_member_file(self):
+        archive_old_logs(retention_days=30, batch_size=1)
+        february = archive_path(None, 2020, 2)
+        self.assertEqual(compact_archive(february), 2)
+        with gzip.open(february, 'rt', encoding='utf-8') as archive:
+            self.assertEqual(len(archive.read().splitlines()), 2)
+        self.assertFalse(february.with_name(february.name + '.tmp').exists())
+
+    def test_search_filters_by_ip_and_date(self):
+        archive_old_logs(retention_days=30)
+        by_ip = list(search_archived_logs(ip='10.0.0.1'))
+        self.assertEqual([record['timestamp'] for record in by_ip],
+                         ['2020-01-15T09:00:00+00:00', '2020-02-01T00:10:00+00:00'])
+
+        in_range = list(search_archived_logs(since=stamp(2020, 1, 31), until=stamp(2020, 2, 20)))
+        self.assertEqual([record['ip_address'] for record in in_range], ['10.0.0.2', '10.0.0.1'])
+
+        combined = list(search_archived_logs(since=stamp(2020, 2, 1), ip='10.0.0.1'))
+        self.assertEqual(len(combined), 1)
+        self.assertEqual(list(search_archived_logs(ip='10.0.0.9')), [])
+
+    def test_search_matches_user_and_text(self):
+        archive_old_logs(retention_days=30)
+        self.assertEqual(len(list(search_archived_logs(user='admin@example.com'))), 4)
+        self.assertEqual(len(list(search_archived_logs(user=str(self.admin.id)))), 4)
+        self.assertEqual(len(list(search_archived_logs(contains='ADMIN-PANEL'))), 4)
+        self.assertEqual(list(search_archived_logs(status='failed')), [])
+
+    def test_search_without_archives(self):
+        self.assertEqual(list(search_archived_logs()), [])
@@ -0,0 +1,175 @@
+"""
+TF-IDF content model of upcoming sessions (learning_sessions.content_model).
+"""
+
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from learning_sessions import content_model
+from learning_sessions.content_model import ContentModel
+from learning_sessions.models import Booking, Session
+from users.models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ContentModelTestCase(TestCase):
+    """Four upcoming sessions on distinct topics and a learner without bookings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        mentor = User.objects.create_user(email='mentor@example.com', password='password', role='mentor')
+        cls.mentor = mentor.mentor_profile
+        cls.python = cls.create_session('Python web apps', 'python, django', 'Views and models in django')
+        cls.react = cls.create_session('React interfaces', 'react, javascript', 'Components and hooks in react')
+        cls.painting = cls.create_session('Watercolour painting', 'art, painting', 'Brushes and paper')
+        cls.more_python = cls.create_session('Advanced python', 'python, testing', 'Testing django apps')
+        cls.learner = User.objects.create_user(email='learner@example.com', password='password', role='learner')
+        # Saved well before any model is built, so a refresh only finds the
+        # sessions a test saves
+        Session.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    @classmethod
+    def create_session(cls, title, tags, description):
+        start = timezone.now() + timedelta(days=3)
+        return Session.objects.create(
+            mentor=cls.mentor, title=title, tags=tags, description=description,
+            start_time=start, end_time=start + timedelta(hours=1), price=Decimal('100.00'),
+        )
+
+    def rank(self, model, words, exclude=(), limit=10):
+        profile = model.vectorize(Counter(words))[None, :]
+        session_ids, _scores = model.rank_many(profile, [set(exclude)], limit)[0]
+        return session_ids
+
+
+class ContentModelTests(ContentModelTestCase):
+
+    def test_build_covers_upcoming_scheduled_sessions(self):
+        started = self.create_session('Python history', 'python', 'Old news')
+        Session.objects.filter(pk=started.pk).update(start_time=timezone.now() - timedelta(hours=1))
+        model = ContentModel.build()
+        self.assertEqual(
+            sorted(model.ids.tolist()),
+            sorted([self.python.id, self.react.id, self.painting.id, self.more_python.id]),
+        )
+        norms = np.linalg.norm(model.matrix, axis=1)
+        np.testing.assert_allclose(norms, 1.0, rtol=1e-5)
+
+    def test_refresh_without_changes_returns_the_same_model(self):
+        model = ContentModel.build()
+        later = timezone.now() + timedelta(seconds=10)
+        self.assertIs(model.refreshed(now=later), model)
+        self.assertEqual(model.refreshed_at, later)
+
+    def test_saved_session_is_revectorised(self):
+        model = ContentModel.build()
+        self.assertEqual(self.rank(model, ['react'])[0], self.react.id)
+
+        self.painting.title = 'React for designers'
+        self.painting.tags = 'react'
+        self.painting.description = 'React react react'
+        self.painting.save()
+
+        refreshed = model.refreshed()
+        self.assertIsNot(refreshed, model)
+        self.assertEqual(self.rank(refreshed, ['react'])[0], self.painting.id)
+        self.assertEqual(len(refreshed), len(model))
+        self.assertEqual(refreshed.stale_rows, 1)
+        # The vocabulary is kept until the next rebuild
+        self.assertEqual(refreshed.vocabulary, model.vocabulary)
+
+    def test_cancelled_session_is_dropped(self):
+        model = ContentModel.build()
+        self.python.status = 'cancelled'
+        self.python.save()
+
+        refreshed = model.refreshed()
+        self.assertNotIn(self.python.id, refreshed.ids.tolist())
+        self.assertEqual(len(refreshed), len(model) - 1)
+        self.assertNotIn(self.python.id, self.rank(refreshed, ['python', 'django']))
+
+    def test_started_sessions_are_dropped_on_refresh(self):
+        model = ContentModel.build()
+        refreshed = model.refreshed(now=timezone.now() + timedelta(days=10))
+        self.assertEqual(len(refreshed), 0)
+
+    def test_rebuild_is_due_after_enough_changes(self):
+        model = ContentModel.build()
+        self.painting.save()
+        refreshed = model.refreshed()
+        # One re-vectorised row out of four is not more than REBUILD_FRACTION
+        self.assertFalse(refreshed.needs_rebuild())
+        self.react.save()
+        self.assertTrue(refreshed.refreshed().needs_rebuild())
+
+    def test_booked_sessions_are_never_ranked(self):
+        Booking.objects.create(session=self.python, learner=self.learner, status='confirmed')
+        model = ContentModel.build()
+        profiles, booked_ids = model.profile_vectors([self.learner.pk])
+        self.assertEqual(booked_ids, [{self.python.id}])
+
+        session_ids, scores = model.rank_many(profiles, booked_ids, limit=10)[0]
+        self.assertNotIn(self.python.id, session_ids)
+        # The profile comes from the booked python session
+        self.assertEqual(session_ids[0], self.more_python.id)
+        self.assertTrue(all(score > 0 for score in scores))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_learner_without_history_or_goals_gets_nothing(self):
+        model = ContentModel.build()
+        profiles, booked_ids = model.profile_vectors([self.learner.pk])
+        self.assertEqual(model.rank_many(profiles, booked_ids)[0], ([], []))
+
+    def test_career_goals_shape_the_profile(self):
+        profile = self.learner.learner_profile
+        profile.career_goals = 'Frontend developer working with react'
+        profile.save()
+        model = ContentModel.build()
+        profiles, booked_ids = model.profile_vectors([self.learner.pk])
+        self.assertEqual(model.rank_many(profiles, booked_ids)[0][0], [self.react.id])
+
+
+class ContentModelFileTests(ContentModelTestCase):
+    """Persistence of the model to CONTENT_MODEL_PATH."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'content_model.npz'
+
+    def test_save_and_load_round_trip(self):
+        model = ContentModel.build()
+        model.save(self.path)
+        loaded = ContentModel.load(self.path)
+        self.assertEqual(loaded.vocabulary, model.vocabulary)
+        np.testing.assert_array_equal(loaded.matrix, model.matrix)
+        np.testing.assert_array_equal(loaded.ids, model.ids)
+        self.assertEqual(loaded.built_at, model.built_at)
+        self.assertEqual(loaded.stale_rows, model.stale_rows)
+        self.assertEqual(self.rank(loaded, ['react']), self.rank(model, ['react']))
+
+    def test_missing_file_is_ignored(self):
+        self.assertIsNone(ContentModel.load(self.path))
+
+    def test_file_from_another_database_is_ignored(self):
+        ContentModel.build().save(self.path)
+        with mock.patch.object(content_model, 'database_name', return_value='/elsewhere/db.sqlite3'):
+            self.assertIsNone(ContentModel.load(self.path))
+
+    def test_file_of_another_format_is_ignored(self):
+        ContentModel.build().save(self.path)
+        with mock.patch.object(content_model, 'FILE_FORMAT', content_model.FILE_FORMAT + 1):
+            self.assertIsNone(ContentModel.load(self.path))
+
+    def test_unreadable_file_is_ignored(self):
+        self.path.write_bytes(b'not a model')
+        with self.assertLogs('learning_sessions.content_model', 'WARNING'):
+            self.assertIsNone(ContentModel.load(self.path))
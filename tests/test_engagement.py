@@ -0,0 +1,100 @@
+"""
+Engagement rates and cohort retention (admin_panel.engagement) on a known dataset.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from admin_panel.engagement import compute_engagement
+from learning_sessions.models import Booking, Feedback, Session
+from users.models import User
+
+# A Wednesday; with days=14 the cohorts are the weeks starting on Monday
+# 2 March (week 0), 9 March (week 1) and 16 March (week 2), and the period
+# starts on 4 March
+NOW = datetime(2026, 3, 18, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def day(month, day_of_month):
+    return datetime(2026, month, day_of_month, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ComputeEngagementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        mentor = User.objects.create_user(email='mentor@example.com', password='password', role='mentor')
+        mentor.mentor_profile.is_approved = True
+        mentor.mentor_profile.save()
+
+        def learner(name, joined):
+            return User.objects.create_user(
+                email=f'{name}@example.com', password='password', role='learner', date_joined=joined
+            )
+
+        def book(user, created_at, status='confirmed'):
+            # One 90-minute session per booking; a learner books a session once
+            session = Session.objects.create(
+                mentor=mentor.mentor_profile, title='Session', description='Description',
+                start_time=created_at, end_time=created_at + timedelta(minutes=90),
+                price=Decimal('100.00'), max_participants=10,
+            )
+            booking = Booking.objects.create(session=session, learner=user, status=status)
+            # created_at is auto_now_add
+            Booking.objects.filter(pk=booking.pk).update(created_at=created_at)
+            return booking
+
+        # Cohort of week 0: books in weeks 0 (before the period) and 1
+        alice = learner('alice', day(3, 3))
+        book(alice, day(3, 3))
+        book(alice, day(3, 10))
+        # Cohort of week 0: one completed booking with feedback in week 2
+        bob = learner('bob', day(3, 5))
+        completed = book(bob, day(3, 17), status='completed')
+        Feedback.objects.create(booking=completed, rating=5, comments='Great')
+        # Cohort of week 1: two bookings in week 1
+        carol = learner('carol', day(3, 10))
+        book(carol, day(3, 11))
+        book(carol, day(3, 12))
+        # Cohort of week 2: no bookings
+        learner('dave', day(3, 17))
+        # Signed up before the oldest cohort: counts for the period only
+        erin = learner('erin', day(2, 1))
+        book(erin, day(3, 16))
+
+    def test_period_rates(self):
+        stats = compute_engagement(14, now=NOW)
+        self.assertEqual(stats['total_learners'], 5)
+        self.assertEqual(stats['active_learners'], 4)
+        self.assertEqual(stats['engagement_rate'], 80)
+        self.assertEqual(stats['repeat_learners'], 1)
+        self.assertEqual(stats['repeat_booking_rate'], 25)
+        self.assertEqual(stats['feedback_rate'], 20)
+        self.assertEqual(stats['completion_rate'], 20)
+        self.assertEqual(stats['avg_session_minutes'], 90)
+
+    def test_cohort_retention_cells(self):
+        stats = compute_engagement(14, now=NOW)
+        self.assertEqual(stats['cohort_offsets'], [0, 1, 2])
+        self.assertEqual(stats['cohort_retention'], [
+            {'week': '2026-03-02', 'learners': 2, 'retention': [50.0, 50.0, 50.0]},
+            {'week': '2026-03-09', 'learners': 1, 'retention': [100.0, 0.0, None]},
+            {'week': '2026-03-16', 'learners': 1, 'retention': [0.0, None, None]},
+        ])
+
+    def test_cohort_weeks_are_capped(self):
+        stats = compute_engagement(365, now=NOW)
+        self.assertEqual(len(stats['cohort_offsets']), 12)
+        self.assertEqual(stats['cohort_retention'][0]['week'], '2025-12-29')
+        # Every learner signed up within the last 12 weeks
+        self.assertEqual(sum(row['learners'] for row in stats['cohort_retention']), 5)
+
+    def test_empty_cohorts_are_unobserved(self):
+        stats = compute_engagement(365, now=NOW)
+        empty = [row for row in stats['cohort_retention'] if not row['learners']]
+        self.assertTrue(empty)
+        for row in empty:
+            self.assertEqual(row['retention'], [None] * 12)
@@ -0,0 +1,55 @@
+"""
+Behaviour of the exponential smoothing forecasts (admin_panel.forecasting).
+"""
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from admin_panel.forecasting import forecast
+
+WEEKLY_PATTERN = [120.0, 80.0, 95.0, 100.0, 150.0, 300.0, 260.0]
+
+
+class ForecastTests(SimpleTestCase):
+
+    def test_pure_weekly_pattern_is_repeated(self):
+        result = forecast(WEEKLY_PATTERN * 4, horizon=14)
+        self.assertEqual(result['method'], 'triple')
+        np.testing.assert_allclose(result['values'], WEEKLY_PATTERN * 2)
+        self.assertAlmostEqual(result['sigma'], 0.0)
+        np.testing.assert_allclose(result['lower_bound'], result['values'])
+        np.testing.assert_allclose(result['upper_bound'], result['values'])
+
+    def test_pattern_continues_from_where_the_series_stops(self):
+        # Three and a half weeks: the forecast starts mid-week
+        result = forecast((WEEKLY_PATTERN * 4)[:25], horizon=7)
+        np.testing.assert_allclose(result['values'], WEEKLY_PATTERN[4:] + WEEKLY_PATTERN[:4])
+
+    def test_short_series_uses_linear_trend(self):
+        result = forecast([10.0, 12.0, 14.0, 16.0, 18.0], horizon=3)
+        self.assertEqual(result['method'], 'double')
+        self.assertEqual(result['gamma'], 0.0)
+        np.testing.assert_allclose(result['values'], [20.0, 22.0, 24.0])
+
+    def test_single_value(self):
+        result = forecast([42.0], horizon=2)
+        np.testing.assert_allclose(result['values'], [42.0, 42.0])
+
+    def test_intervals_contain_forecast_and_widen(self):
+        rng = np.random.default_rng(7)
+        values = np.tile(WEEKLY_PATTERN, 8) + rng.normal(0, 10, 56)
+        result = forecast(values, horizon=14)
+        lower, predicted, upper = (np.array(result[key]) for key in ('lower_bound', 'values', 'upper_bound'))
+        self.assertGreater(result['sigma'], 0)
+        self.assertTrue((lower < predicted).all() and (predicted < upper).all())
+        widths = upper - lower
+        self.assertTrue((np.diff(widths) >= 0).all())
+        self.assertGreater(widths[-1], widths[0])
+        # Eight whole weeks of small noise: the busiest weekday survives
+        self.assertEqual(int(np.argmax(predicted[:7])), WEEKLY_PATTERN.index(max(WEEKLY_PATTERN)))
+
+    def test_returns_plain_floats(self):
+        result = forecast(np.arange(20, dtype=float), horizon=3)
+        for key in ('values', 'lower_bound', 'upper_bound'):
+            self.assertTrue(all(type(value) is float for value in result[key]))
+        self.assertIs(type(result['sigma']), float)
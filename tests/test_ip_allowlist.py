@@ -0,0 +1,76 @@
+"""
+Behaviour of the compiled admin IP allowlist (admin_panel.ip_allowlist).
+"""
+
+from django.test import SimpleTestCase
+
+from admin_panel.ip_allowlist import CompiledAllowlist, _merge_intervals
+
+
+class MergeIntervalsTests(SimpleTestCase):
+
+    def test_overlapping_and_adjacent_intervals_merge(self):
+        self.assertEqual(_merge_intervals([(10, 20), (0, 5), (15, 30), (31, 40), (50, 60)]),
+                         [(0, 5), (10, 40), (50, 60)])
+
+    def test_contained_interval_does_not_shrink_its_container(self):
+        self.assertEqual(_merge_intervals([(0, 100), (10, 20)]), [(0, 100)])
+
+
+class CompiledAllowlistTests(SimpleTestCase):
+
+    def test_single_address(self):
+        allowlist = CompiledAllowlist(['192.168.1.10'])
+        self.assertIn('192.168.1.10', allowlist)
+        self.assertNotIn('192.168.1.11', allowlist)
+        self.assertNotIn('192.168.1.9', allowlist)
+
+    def test_overlapping_cidrs(self):
+        allowlist = CompiledAllowlist(['10.0.0.0/8', '10.1.0.0/16', '10.255.255.0/24'])
+        self.assertIn('10.0.0.0', allowlist)
+        self.assertIn('10.1.2.3', allowlist)
+        self.assertIn('10.255.255.255', allowlist)
+        self.assertNotIn('11.0.0.0', allowlist)
+        self.assertNotIn('9.255.255.255', allowlist)
+
+    def test_adjacent_cidrs(self):
+        allowlist = CompiledAllowlist(['192.168.0.0/24', '192.168.1.0/24'])
+        self.assertIn('192.168.0.255', allowlist)
+        self.assertIn('192.168.1.0', allowlist)
+        self.assertIn('192.168.1.255', allowlist)
+        self.assertNotIn('192.168.2.0', allowlist)
+
+    def test_ipv6(self):
+        allowlist = CompiledAllowlist(['2001:db8::/32', '::1'])
+        self.assertIn('2001:db8::1', allowlist)
+        self.assertIn('2001:db8:ffff:ffff:ffff:ffff:ffff:ffff', allowlist)
+        self.assertIn('::1', allowlist)
+        self.assertNotIn('2001:db9::', allowlist)
+        self.assertNotIn('::2', allowlist)
+
+    def test_versions_are_kept_apart(self):
+        # ::a00:1 and 10.0.0.1 share an integer value
+        allowlist = CompiledAllowlist(['10.0.0.0/8'])
+        self.assertNotIn('::a00:1', allowlist)
+        self.assertNotIn('10.0.0.1', CompiledAllowlist(['::/96']))
+
+    def test_host_bits_and_whitespace_are_accepted(self):
+        allowlist = CompiledAllowlist([' 172.16.5.4/12 '])
+        self.assertIn('172.31.255.255', allowlist)
+        self.assertNotIn('172.32.0.0', allowlist)
+
+    def test_invalid_entries_are_ignored(self):
+        with self.assertLogs('admin_security', 'WARNING'):
+            allowlist = CompiledAllowlist(['not-an-ip', '127.0.0.1'])
+        self.assertTrue(allowlist.is_configured)
+        self.assertIn('127.0.0.1', allowlist)
+
+    def test_empty_allowlist(self):
+        allowlist = CompiledAllowlist([])
+        self.assertFalse(allowlist.is_configured)
+        self.assertNotIn('127.0.0.1', allowlist)
+        self.assertNotIn('::1', allowlist)
+
+    def test_invalid_address_raises(self):
+        with self.assertRaises(ValueError):
+            CompiledAllowlist(['127.0.0.1']).allows('999.1.1.1')
@@ -0,0 +1,142 @@
+"""
+Bulk precompute of recommendations (learning_sessions.recommendation_batch) and
+how the precomputed rows are read back (learning_sessions.ml_recommendations).
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from learning_sessions.ml_recommendations import (
+    get_popular_sessions, personalized_session_ids, precomputed_session_ids,
+)
+from learning_sessions.models import Booking, Session, SessionRecommendation
+from learning_sessions.recommendation_batch import precompute_recommendations
+from users.models import User
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    CONTENT_MODEL_PATH='',
+)
+class PrecomputeRecommendationsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = cls.create_mentor('mentor@example.com', approved=True)
+        cls.python = cls.create_session(cls.mentor, 'Python web apps', 'python, django')
+        cls.more_python = cls.create_session(cls.mentor, 'Advanced python', 'python, testing')
+        cls.react = cls.create_session(cls.mentor, 'React interfaces', 'react, javascript')
+        cls.painting = cls.create_session(cls.mentor, 'Watercolour painting', 'art, painting')
+        # Close matches for the learner below that cannot be booked
+        cls.full = cls.create_session(cls.mentor, 'Python packaging', 'python, django')
+        Session.objects.filter(pk=cls.full.pk).update(current_participants=5)
+        unapproved = cls.create_mentor('unapproved@example.com', approved=False)
+        cls.unapproved = cls.create_session(unapproved, 'Python scripting', 'python, django')
+
+        cls.learner = User.objects.create_user(email='learner@example.com', password='password', role='learner')
+        Booking.objects.create(session=cls.python, learner=cls.learner, status='confirmed')
+        cls.newcomer = User.objects.create_user(email='newcomer@example.com', password='password', role='learner')
+
+    @classmethod
+    def create_mentor(cls, email, approved):
+        user = User.objects.create_user(email=email, password='password', role='mentor')
+        profile = user.mentor_profile
+        profile.is_approved = approved
+        profile.save()
+        return profile
+
+    @classmethod
+    def create_session(cls, mentor, title, tags):
+        start = timezone.now() + timedelta(days=3)
+        return Session.objects.create(
+            mentor=mentor, title=title, tags=tags, description=title,
+            start_time=start, end_time=start + timedelta(hours=1), price=Decimal('100.00'),
+            max_participants=5,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def rows(self, learner):
+        return list(
+            SessionRecommendation.objects.filter(learner=learner).order_by('rank')
+            .values_list('rank', 'session_id', 'score')
+        )
+
+    def test_unbookable_and_booked_sessions_are_skipped(self):
+        precompute_recommendations(top_k=10)
+        session_ids = [session_id for _rank, session_id, _score in self.rows(self.learner)]
+        self.assertEqual(session_ids[0], self.more_python.id)
+        self.assertEqual(sorted(session_ids), sorted([self.more_python.id, self.react.id, self.painting.id]))
+
+    def test_learner_without_history_gets_popular_sessions(self):
+        precompute_recommendations(top_k=3)
+        rows = self.rows(self.newcomer)
+        self.assertEqual([rank for rank, _session_id, _score in rows], [1, 2, 3])
+        self.assertEqual(
+            [session_id for _rank, session_id, _score in rows],
+            [session.id for session in get_popular_sessions(3)],
+        )
+        self.assertTrue(all(score == 0 for _rank, _session_id, score in rows))
+
+    def test_rows_are_counted_per_shard(self):
+        result = precompute_recommendations(top_k=2, shard_size=1)
+        self.assertEqual(result, {'learners': 2, 'shards': 2, 'rows_written': 4, 'rows_deleted': 0})
+
+    def test_shorter_lists_overwrite_ranks_and_drop_the_rest(self):
+        precompute_recommendations(top_k=3)
+        first_run = SessionRecommendation.objects.get(learner=self.learner, rank=1).computed_at
+
+        result = precompute_recommendations(top_k=2)
+        # Ranks 1 and 2 are updated in place, rank 3 of both learners is stale
+        self.assertEqual(result['rows_written'], 4)
+        self.assertEqual(result['rows_deleted'], 2)
+        for learner in (self.learner, self.newcomer):
+            self.assertEqual([rank for rank, _session_id, _score in self.rows(learner)], [1, 2])
+        computed_at = set(SessionRecommendation.objects.values_list('computed_at', flat=True))
+        self.assertEqual(len(computed_at), 1)
+        self.assertGreater(computed_at.pop(), first_run)
+
+    def test_rows_of_inactive_learners_are_deleted(self):
+        precompute_recommendations(top_k=2)
+        User.objects.filter(pk=self.newcomer.pk).update(is_active=False)
+        result = precompute_recommendations(top_k=2)
+        self.assertEqual(result['learners'], 1)
+        self.assertEqual(result['rows_deleted'], 2)
+        self.assertEqual(self.rows(self.newcomer), [])
+
+    def test_precomputed_ids_follow_the_ranks(self):
+        precompute_recommendations(top_k=3)
+        ranked = [session_id for _rank, session_id, _score in self.rows(self.learner)]
+        self.assertEqual(precomputed_session_ids(self.learner, limit=10), ranked)
+        self.assertEqual(precomputed_session_ids(self.learner, limit=2), ranked[:2])
+
+    def test_precomputed_ids_skip_sessions_booked_or_filled_since(self):
+        precompute_recommendations(top_k=3)
+        Booking.objects.create(session=self.more_python, learner=self.learner, status='pending')
+        Session.objects.filter(pk=self.react.pk).update(current_participants=5)
+        self.assertEqual(precomputed_session_ids(self.learner), [self.painting.id])
+
+    def test_stale_rows_are_not_used(self):
+        precompute_recommendations(top_k=3)
+        max_age = timedelta(seconds=settings.RECOMMENDATION_PRECOMPUTE_MAX_AGE)
+        SessionRecommendation.objects.update(computed_at=timezone.now() - max_age - timedelta(minutes=1))
+        self.assertIsNone(precomputed_session_ids(self.learner))
+
+    def test_learners_joined_since_the_run_are_not_covered(self):
+        precompute_recommendations(top_k=3)
+        joined = User.objects.create_user(email='joined@example.com', password='password', role='learner')
+        self.assertIsNone(precomputed_session_ids(joined))
+
+    def test_short_lists_are_padded_with_unbooked_popular_sessions(self):
+        precompute_recommendations(top_k=1)
+        session_ids = personalized_session_ids(self.learner, limit=4)
+        self.assertEqual(session_ids[0], self.more_python.id)
+        self.assertEqual(sorted(session_ids), sorted([self.more_python.id, self.react.id, self.painting.id]))
+        # The booked session is the most popular one, but never padded in
+        self.assertEqual(get_popular_sessions(1)[0].id, self.python.id)
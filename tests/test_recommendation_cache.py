@@ -0,0 +1,72 @@
+"""
+Hydration checks of the per-learner recommendation cache (learning_sessions.recommendation_cache).
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from learning_sessions.models import Booking, Session
+from learning_sessions.recommendation_cache import cache_key, cached_recommendations
+from users.models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedRecommendationsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        mentor = User.objects.create_user(email='mentor@example.com', password='password', role='mentor')
+        mentor.mentor_profile.is_approved = True
+        mentor.mentor_profile.save()
+        start = timezone.now() + timedelta(days=1)
+        cls.sessions = [
+            Session.objects.create(
+                mentor=mentor.mentor_profile, title=f'Session {i}', description='Description',
+                start_time=start, end_time=start + timedelta(hours=1), price=Decimal('100.00'),
+                max_participants=5,
+            )
+            for i in range(4)
+        ]
+        cls.learner = User.objects.create_user(email='learner@example.com', password='password', role='learner')
+
+    def setUp(self):
+        cache.clear()
+        self.computed = 0
+
+    def compute(self, user, limit):
+        self.computed += 1
+        return [session.id for session in self.sessions[:limit]]
+
+    def recommended_ids(self, limit=3):
+        return [session.id for session in cached_recommendations(self.learner, 'test', limit, self.compute)]
+
+    def test_hit_is_served_from_the_cache(self):
+        self.assertEqual(self.recommended_ids(), [session.id for session in self.sessions[:3]])
+        self.assertEqual(self.recommended_ids(), [session.id for session in self.sessions[:3]])
+        self.assertEqual(self.computed, 1)
+
+    def test_booked_session_is_dropped_without_invalidation(self):
+        self.recommended_ids()
+        # A booking handled by another worker: this worker's entry was not
+        # invalidated, so the booking is only seen when it is hydrated
+        entries = cache.get(cache_key(self.learner.pk))
+        Booking.objects.create(session=self.sessions[1], learner=self.learner)
+        cache.set(cache_key(self.learner.pk), entries)
+
+        self.assertNotIn(self.sessions[1].id, self.recommended_ids())
+        self.assertEqual(self.computed, 2)
+
+    def test_full_and_cancelled_sessions_are_dropped(self):
+        self.recommended_ids()
+        Session.objects.filter(pk=self.sessions[0].pk).update(current_participants=5)
+        Session.objects.filter(pk=self.sessions[2].pk).update(status='cancelled')
+        self.assertEqual(self.recommended_ids(), [self.sessions[1].id])
+
+    def test_other_learners_bookings_do_not_matter(self):
+        other = User.objects.create_user(email='other@example.com', password='password', role='learner')
+        Booking.objects.create(session=self.sessions[0], learner=other)
+        self.assertEqual(self.recommended_ids(), [session.id for session in self.sessions[:3]])
@@ -0,0 +1,117 @@
+"""
+Full-text session search (learning_sessions.search) on the SQLite FTS5 index.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from learning_sessions.models import Session
+from learning_sessions.search import decode_cursor, encode_cursor, search_sessions
+from users.models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SearchSessionsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = cls.create_mentor('mentor@example.com', 'Cloud architecture')
+        # "kubernetes" in the title, the tags and only the description;
+        # the title carries the highest BM25 weight, then the tags
+        cls.in_title = cls.create_session('Kubernetes from scratch', 'Containers for beginners')
+        cls.in_tags = cls.create_session('Deploying services', 'Containers in production', tags='kubernetes, helm')
+        cls.in_description = cls.create_session('Cloud basics', 'A short look at kubernetes and more')
+        cls.unrelated = cls.create_session('Watercolour painting', 'Brushes and paper')
+
+    @classmethod
+    def create_mentor(cls, email, expertise):
+        user = User.objects.create_user(email=email, password='password', role='mentor')
+        profile = user.mentor_profile
+        profile.expertise = expertise
+        profile.is_approved = True
+        profile.save()
+        return profile
+
+    @classmethod
+    def create_session(cls, title, description, tags='', start=None):
+        start = start or timezone.now() + timedelta(days=2)
+        return Session.objects.create(
+            mentor=cls.mentor, title=title, description=description, tags=tags,
+            start_time=start, end_time=start + timedelta(hours=1), price=Decimal('100.00'),
+        )
+
+    def ids(self, query, **kwargs):
+        sessions, _cursor = search_sessions(query, **kwargs)
+        return [session.id for session in sessions]
+
+    def test_bm25_orders_by_field_weight(self):
+        self.assertEqual(
+            self.ids('kubernetes'), [self.in_title.id, self.in_tags.id, self.in_description.id]
+        )
+
+    def test_scores_are_attached_and_ascending(self):
+        sessions, _cursor = search_sessions('kubernetes')
+        scores = [session.search_score for session in sessions]
+        self.assertEqual(scores, sorted(scores))
+
+    def test_last_term_is_a_prefix(self):
+        self.assertEqual(self.ids('watercol'), [self.unrelated.id])
+        self.assertEqual(self.ids('containers kube'), [self.in_title.id, self.in_tags.id])
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(42, -1.25e-06)), (-1.25e-06, 42))
+        for invalid in (None, '', 'garbage', '1.5_x', 'nan-ish_'):
+            self.assertIsNone(decode_cursor(invalid))
+
+    def test_pages_follow_the_cursor(self):
+        first, cursor = search_sessions('kubernetes', limit=2)
+        self.assertEqual([session.id for session in first], [self.in_title.id, self.in_tags.id])
+        self.assertIsNotNone(cursor)
+        second, cursor = search_sessions('kubernetes', cursor=cursor, limit=2)
+        self.assertEqual([session.id for session in second], [self.in_description.id])
+        self.assertIsNone(cursor)
+
+    def test_invalid_cursor_starts_from_the_first_page(self):
+        self.assertEqual(self.ids('kubernetes', cursor='garbage', limit=1), [self.in_title.id])
+
+    def test_fts_operators_in_input_are_text(self):
+        for query in ('kubernetes OR painting', 'kubernetes AND', 'NEAR(kubernetes', '"kubernetes',
+                      'title:kubernetes', 'kubernetes*', '-kubernetes', '^kubernetes'):
+            with self.subTest(query=query):
+                ids = self.ids(query)
+                self.assertNotIn(self.unrelated.id, ids)
+        # OR is searched as a word, so nothing contains both words and "or"
+        self.assertEqual(self.ids('painting OR kubernetes'), [])
+
+    def test_queries_without_words(self):
+        self.assertEqual(search_sessions(''), ([], None))
+        self.assertEqual(search_sessions('"*()'), ([], None))
+
+    def test_upcoming_only(self):
+        past = self.create_session(
+            'Kubernetes retrospective', 'Old', start=timezone.now() - timedelta(days=1),
+        )
+        self.assertNotIn(past.id, self.ids('retrospective'))
+        self.assertEqual(self.ids('retrospective', upcoming_only=False), [past.id])
+
+    def test_saving_a_session_reindexes_it(self):
+        self.unrelated.title = 'Terraform workshop'
+        self.unrelated.save()
+        self.assertEqual(self.ids('terraform'), [self.unrelated.id])
+        self.assertEqual(self.ids('watercolour'), [])
+
+    def test_deleting_a_session_unindexes_it(self):
+        session_id = self.unrelated.id
+        self.unrelated.delete()
+        self.assertEqual(self.ids('watercolour', upcoming_only=False), [])
+        self.assertFalse(Session.objects.filter(id=session_id).exists())
+
+    def test_saving_mentor_expertise_reindexes_their_sessions(self):
+        self.assertEqual(self.ids('gardening'), [])
+        self.mentor.expertise = 'Gardening'
+        self.mentor.save(update_fields=['expertise'])
+        self.assertEqual(len(self.ids('gardening')), 4)
+        self.assertEqual(self.ids('architecture'), [])
@@ -0,0 +1,36 @@
+"""
+Worker cold-start budget.
+
+Boots Django in fresh interpreters under ``python -X importtime`` (see
+peerlearn.startup) and fails if a dependency in LAZY_MODULES is imported
+at startup. Import time depends on the machine and its load, so the
+MAX_STARTUP_MS budget is only checked when the STARTUP_BUDGET_TIMING
+environment variable is set; the startup_benchmark command always
+checks it.
+"""
+
+import os
+import unittest
+
+from django.test import SimpleTestCase
+
+from peerlearn.startup import LAZY_MODULES, budget_problems, measure_startup
+
+# Fewer runs than the startup_benchmark command, to keep the suite quick
+RUNS = 3
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Check worker startup against its lazy module and import time budgets."""
+
+    def test_lazy_modules_not_imported(self):
+        report = measure_startup(runs=1)
+        self.assertFalse(
+            report['lazy_modules_imported'],
+            f"must only be imported by the code paths that use them (LAZY_MODULES = {LAZY_MODULES})",
+        )
+
+    @unittest.skipUnless(os.environ.get('STARTUP_BUDGET_TIMING'), 'Set STARTUP_BUDGET_TIMING to check import time')
+    def test_startup_within_budget(self):
+        problems = budget_problems(measure_startup(runs=RUNS))
+        self.assertFalse(problems, '; '.join(problems))
@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import User, LearnerProfile, MentorProfile
+from .models import User, LearnerProfile, MentorProfile, Notification
 
 class CustomUserAdmin(UserAdmin):
     """Custom User Admin to handle custom user model."""
@@ -52,3 +52,13 @@ class MentorProfileAdmin(admin.ModelAdmin):
         updated = queryset.update(is_approved=True)
         self.message_user(request, _(f'{updated} mentors were successfully approved.'))
     approve_mentors.short_description = _("Approve selected mentors")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """Admin for Notification model."""
+    list_display = ('user', 'category', 'title', 'is_read', 'created_at')
+    list_filter = ('category', 'is_read')
+    search_fields = ('user__email', 'title')
+    raw_id_fields = ('user',)
+    readonly_fields = ('created_at',)
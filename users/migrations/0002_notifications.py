@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 11:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notification_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='unread notifications'),
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('booking', 'Booking'), ('session', 'Session'), ('payment', 'Payment'), ('system', 'System')], default='system', max_length=20, verbose_name='category')),
+                ('title', models.CharField(max_length=200, verbose_name='title')),
+                ('message', models.TextField(verbose_name='message')),
+                ('link', models.CharField(blank=True, max_length=500, verbose_name='link')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='data')),
+                ('is_read', models.BooleanField(default=False, verbose_name='read')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='users_notif_user_id_cb7070_idx'), models.Index(fields=['user', 'is_read'], name='users_notif_user_id_1be17e_idx')],
+            },
+        ),
+    ]
@@ -49,6 +49,8 @@ class User(AbstractUser):
     profile_picture = models.ImageField(_('profile picture'), upload_to='profile_pictures/', blank=True, null=True)
     role = models.CharField(_('role'), max_length=10, choices=ROLE_CHOICES, default='learner')
     two_factor_enabled = models.BooleanField(_('two-factor authentication'), default=False)
+    # Maintained with F() updates by users.notifications, never recounted on read
+    unread_notification_count = models.PositiveIntegerField(_('unread notifications'), default=0)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -108,3 +110,34 @@ class MentorProfile(models.Model):
     def get_absolute_url(self):
         """Return the URL for the mentor's profile."""
         return reverse('mentor_profile', args=[self.id])
+
+
+class Notification(models.Model):
+    """A stored notification for one user, also pushed over WebSocket when it is created."""
+    
+    CATEGORY_CHOICES = (
+        ('booking', _('Booking')),
+        ('session', _('Session')),
+        ('payment', _('Payment')),
+        ('system', _('System')),
+    )
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    category = models.CharField(_('category'), max_length=20, choices=CATEGORY_CHOICES, default='system')
+    title = models.CharField(_('title'), max_length=200)
+    message = models.TextField(_('message'))
+    link = models.CharField(_('link'), max_length=500, blank=True)
+    data = models.JSONField(_('data'), default=dict, blank=True)
+    is_read = models.BooleanField(_('read'), default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # Feed pages and reconnect catch-up are keyset scans on id per user
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['user', 'is_read']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.title}"
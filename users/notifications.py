@@ -0,0 +1,187 @@
+"""
+Stored notifications with bulk fan-out and per-user unread counters.
+
+notify() writes one Notification row per recipient with bulk_create and
+bumps User.unread_notification_count with a single UPDATE per batch, so
+notifying thousands of users costs a handful of queries rather than several
+per recipient. Once the transaction commits, each notification is pushed
+to the recipient's channel group; the group sends of a batch run
+concurrently on one event loop instead of one async_to_sync call each.
+
+Delivery over WebSocket is best effort. A client that was offline, or
+missed a push, catches up on reconnect by asking for everything after the
+id of the last notification it saw (see notifications_after()).
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Greatest
+
+from .models import Notification, User
+
+logger = logging.getLogger(__name__)
+
+# Recipients per bulk_create / counter UPDATE
+NOTIFY_BATCH_SIZE = 500
+# Channel layer group sends in flight at once
+GROUP_SEND_CONCURRENCY = 100
+# Most notifications returned by one catch-up or feed page
+NOTIFICATION_PAGE_SIZE = 50
+
+
+def notification_group(user_id):
+    """Channel layer group of the NotificationConsumer connections of a user."""
+    return f'notifications_{user_id}'
+
+
+def notify(users, title, message, category='system', link='', data=None):
+    """
+    Store a notification for each user and push it to their open connections.
+
+    users can be User instances, user ids or a User queryset. Returns the
+    number of notifications created.
+    """
+    if isinstance(users, QuerySet):
+        user_ids = list(users.values_list('pk', flat=True))
+    else:
+        user_ids = [getattr(user, 'pk', user) for user in users]
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    # Lazy translations cannot go through the channel layer
+    title, message, link = str(title), str(message), str(link)
+
+    events = []
+    with transaction.atomic():
+        for start in range(0, len(user_ids), NOTIFY_BATCH_SIZE):
+            batch = user_ids[start:start + NOTIFY_BATCH_SIZE]
+            created = Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id, category=category, title=title,
+                    message=message, link=link, data=data or {},
+                )
+                for user_id in batch
+            ])
+            User.objects.filter(pk__in=batch).update(
+                unread_notification_count=F('unread_notification_count') + 1
+            )
+            unread_counts = dict(
+                User.objects.filter(pk__in=batch).values_list('pk', 'unread_notification_count')
+            )
+            events.extend(
+                (notification_group(notification.user_id), {
+                    'type': 'notification_message',
+                    **serialize_notification(notification),
+                    'unread_count': unread_counts.get(notification.user_id, 0),
+                })
+                for notification in created
+            )
+        transaction.on_commit(lambda: push_events(events))
+    return len(user_ids)
+
+
+def push_events(events):
+    """Send (group, event) pairs through the channel layer, logging failures."""
+    if not events:
+        return
+    try:
+        async_to_sync(send_events)(events)
+    except Exception:
+        # Stored notifications still reach the user on the next catch-up
+        logger.exception("Could not push notifications")
+
+
+async def send_events(events):
+    """Send (group, event) pairs, GROUP_SEND_CONCURRENCY at a time."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    for start in range(0, len(events), GROUP_SEND_CONCURRENCY):
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, event)
+              for group, event in events[start:start + GROUP_SEND_CONCURRENCY]),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Notification push failed: {result}")
+
+
+def mark_read(user, notification_ids=None):
+    """
+    Mark some (or, without ids, all) of a user's notifications as read.
+
+    Returns the new unread count.
+    """
+    with transaction.atomic():
+        unread = Notification.objects.filter(user=user, is_read=False)
+        if notification_ids is not None:
+            unread = unread.filter(pk__in=notification_ids)
+        updated = unread.update(is_read=True)
+        if updated:
+            # Greatest() keeps the counter valid if it ever drifted low
+            User.objects.filter(pk=user.pk).update(
+                unread_notification_count=Greatest(F('unread_notification_count') - updated, Value(0))
+            )
+        count = User.objects.filter(pk=user.pk).values_list('unread_notification_count', flat=True).first()
+    user.unread_notification_count = count or 0
+    return user.unread_notification_count
+
+
+def notifications_after(user_id, cursor=None, limit=NOTIFICATION_PAGE_SIZE):
+    """
+    Notifications of a user newer than cursor (a notification id), oldest first.
+
+    Returns (notifications, next_cursor, has_more); next_cursor is the id to
+    pass on the next call, or the given cursor when nothing is newer.
+    """
+    notifications = Notification.objects.filter(user_id=user_id)
+    if cursor is not None:
+        notifications = notifications.filter(pk__gt=cursor)
+    page = list(notifications.order_by('pk')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = page[-1].pk if page else cursor
+    return page, next_cursor, has_more
+
+
+def notifications_before(user_id, cursor=None, limit=NOTIFICATION_PAGE_SIZE):
+    """
+    Notifications of a user older than cursor, newest first, for the feed.
+
+    Returns (notifications, next_cursor); next_cursor is None on the last page.
+    """
+    notifications = Notification.objects.filter(user_id=user_id)
+    if cursor is not None:
+        notifications = notifications.filter(pk__lt=cursor)
+    page = list(notifications.order_by('-pk')[:limit + 1])
+    next_cursor = page[limit - 1].pk if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def parse_cursor(value):
+    """Notification id from a query string or message value, or None."""
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if cursor >= 0 else None
+
+
+def serialize_notification(notification):
+    """Fields of a notification sent to clients."""
+    return {
+        'id': notification.pk,
+        'category': notification.category,
+        'title': notification.title,
+        'message': notification.message,
+        'link': notification.link or None,
+        'data': notification.data,
+        'is_read': notification.is_read,
+        'timestamp': notification.created_at.isoformat(),
+    }
@@ -2,11 +2,12 @@
 Signal handlers for the users app.
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
+from peerlearn.images import has_derivatives, schedule_delete_derivatives, schedule_derivatives
 from .models import User, MentorProfile, LearnerProfile
 
 
@@ -37,4 +38,34 @@ def save_user_profile(sender, instance, **kwargs):
     if instance.role == 'mentor' and hasattr(instance, 'mentor_profile'):
         instance.mentor_profile.save()
     elif instance.role == 'learner' and hasattr(instance, 'learner_profile'):
-        instance.learner_profile.save()
\ No newline at end of file
+        instance.learner_profile.save()
+
+
+@receiver(post_init, sender=User)
+def remember_profile_picture(sender, instance, **kwargs):
+    """Keep the loaded picture name so the old derivatives can be removed on replace."""
+    # Read from __dict__ so a deferred profile_picture field is not fetched
+    picture = instance.__dict__.get('profile_picture')
+    instance._loaded_profile_picture = getattr(picture, 'name', picture) or ''
+
+
+@receiver(post_save, sender=User)
+def generate_avatar_derivatives(sender, instance, created, raw=False, **kwargs):
+    """Create the resized avatar images after a profile picture upload."""
+    update_fields = kwargs.get('update_fields')
+    if raw or (update_fields is not None and 'profile_picture' not in update_fields):
+        return
+    name = instance.profile_picture.name or ''
+    # A new row (e.g. a copy saved with pk=None) replaces nothing
+    if not created and instance._loaded_profile_picture and instance._loaded_profile_picture != name:
+        schedule_delete_derivatives(instance._loaded_profile_picture, 'avatar')
+    instance._loaded_profile_picture = name
+    if name and not has_derivatives(name, 'avatar'):
+        schedule_derivatives(name, 'avatar')
+
+
+@receiver(post_delete, sender=User)
+def delete_avatar_derivatives(sender, instance, **kwargs):
+    """Remove the resized avatar images of a deleted user."""
+    if instance.profile_picture:
+        schedule_delete_derivatives(instance.profile_picture.name, 'avatar')
@@ -40,6 +40,10 @@ urlpatterns = [
     path('profile/settings/', views.profile_settings_view, name='profile_settings'),
     path('mentor/<int:mentor_id>/', views.mentor_profile_view, name='mentor_profile'),
     
+    # Notifications
+    path('notifications/', views.notification_list, name='notification_list'),
+    path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
+    
     # Booking management for mentors
     path('booking/<int:booking_id>/<str:action>/', views.accept_reject_booking, name='booking_action'),
 ]
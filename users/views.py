@@ -13,12 +13,15 @@ from django.http import HttpResponse, JsonResponse
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_protect
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 
 from .models import User, LearnerProfile, MentorProfile
+from .notifications import (
+    mark_read, notifications_after, notifications_before, parse_cursor, serialize_notification,
+)
 from .forms import (
     UserRegistrationForm, LearnerProfileForm, MentorProfileForm,
     CustomAuthenticationForm, UserProfilePictureForm, Two2FACodeForm,
@@ -41,7 +44,7 @@ def landing_page(request):
     # Get some featured mentors for the showcase section
     featured_mentors = MentorProfile.objects.filter(
         is_approved=True
-    ).order_by('-average_rating')[:8]
+    ).select_related('user').order_by('-average_rating')[:8]
     
     # Get upcoming featured sessions
     from learning_sessions.models import Session
@@ -61,12 +64,16 @@ def landing_page(request):
     popular_topics = []
     all_tags = {}
     
-    for session in Session.objects.filter(mentor__is_approved=True):
-        if session.tags:
-            tags = [tag.strip() for tag in session.tags.split(',')]
-            for tag in tags:
-                if tag:
-                    all_tags[tag] = all_tags.get(tag, 0) + 1
+    # Count distinct tag strings in the database rather than loading every session
+    tag_groups = Session.objects.filter(
+        mentor__is_approved=True
+    ).exclude(tags='').values('tags').annotate(count=Count('id')).order_by()
+    
+    for group in tag_groups:
+        tags = [tag.strip() for tag in group['tags'].split(',')]
+        for tag in tags:
+            if tag:
+                all_tags[tag] = all_tags.get(tag, 0) + group['count']
     
     # Sort by popularity and take top 8
     popular_topics = sorted(all_tags.items(), key=lambda x: x[1], reverse=True)[:8]
@@ -276,7 +283,7 @@ def learner_dashboard(request):
         return redirect(request.user.get_dashboard_url())
     
     # Import here to avoid circular imports
-    from learning_sessions.models import Session, Booking
+    from learning_sessions.models import Session, Booking, LearnerStats
     
     # Get all bookings for this learner, categorized by status
     from django.db.models import Min
@@ -300,7 +307,9 @@ def learner_dashboard(request):
     completed_bookings = Booking.objects.filter(
         learner=request.user,
         status='completed'
-    ).select_related('session', 'session__mentor', 'session__mentor__user').order_by('-session__end_time')
+    ).select_related(
+        'session', 'session__mentor', 'session__mentor__user', 'feedback'
+    ).order_by('-session__end_time')
     
     # All confirmed bookings (for backward compatibility)
     confirmed_bookings = Booking.objects.filter(
@@ -331,7 +340,7 @@ def learner_dashboard(request):
     # Get top-rated mentors
     top_mentors = MentorProfile.objects.filter(
         is_approved=True
-    ).order_by('-average_rating')[:6]
+    ).select_related('user').annotate(session_count=Count('sessions')).order_by('-average_rating')[:6]
     
     # Get today's date for session badge highlighting
     today = timezone.now().date()
@@ -344,32 +353,19 @@ def learner_dashboard(request):
     if not mentors.exists():
         mentors = top_mentors
     
-    # Add statistics for the dashboard
+    # Statistics for the dashboard come from the learner's rollup row,
+    # maintained as bookings complete
+    try:
+        learner_stats = request.user.learner_stats
+    except LearnerStats.DoesNotExist:
+        learner_stats = LearnerStats(learner=request.user)
     stats = {
-        'total_learning_hours': 0,
-        'completed_sessions_count': 0,
-        'learning_streak': 7,  # Default 7 days
+        'total_learning_hours': learner_stats.total_hours,
+        'completed_sessions_count': learner_stats.completed_sessions,
+        'learning_streak': learner_stats.streak_on(timezone.localdate()),
+        'longest_streak': learner_stats.longest_streak,
     }
     
-    # Count completed bookings
-    completed_count = Booking.objects.filter(
-        learner=request.user,
-        status='completed'
-    ).count()
-    
-    if completed_count:
-        stats['completed_sessions_count'] = completed_count
-        
-        # Sum up total hours (each session duration in minutes / 60)
-        from django.db.models import Sum
-        total_mins = Booking.objects.filter(
-            learner=request.user,
-            status='completed'
-        ).aggregate(total=Sum('session__duration_minutes'))
-        
-        if total_mins['total']:
-            stats['total_learning_hours'] = round(total_mins['total'] / 60, 1)
-    
     return render(request, 'dashboard/learner_dashboard_new.html', {
         'upcoming_bookings': upcoming_bookings,  # For backwards compatibility
         'live_session_bookings': live_session_bookings,
@@ -424,7 +420,7 @@ def mentor_dashboard(request):
         status='completed'
     )
     
-    total_earnings = sum(t.amount for t in earnings)
+    total_earnings = earnings.aggregate(total=Sum('amount'))['total'] or 0
     pending_withdrawals = Transaction.objects.filter(
         booking__session__mentor=mentor_profile,
         status='withdrawal_pending'
@@ -447,6 +443,8 @@ def mentor_profile_view(request, mentor_id):
     Args:
         mentor_id: ID of the MentorProfile to display
     """
+    from learning_sessions.models import Session
+    
     mentor_profile = get_object_or_404(MentorProfile, id=mentor_id)
     
     # Get upcoming public sessions
@@ -461,7 +459,7 @@ def mentor_profile_view(request, mentor_id):
     
     feedback_list = Feedback.objects.filter(
         booking__session__mentor=mentor_profile
-    ).select_related('booking__learner').order_by('-created_at')[:10]
+    ).select_related('booking__learner', 'booking__session').order_by('-created_at')[:10]
     
     # Check if the current user has booked a session with this mentor
     has_booked = False
@@ -518,6 +516,45 @@ def accept_reject_booking(request, booking_id, action):
     return redirect('mentor_dashboard')
 
 
+@login_required
+def notification_list(request):
+    """
+    Return the user's notifications as JSON.
+
+    With ?after=<id>, returns notifications newer than that id, oldest first,
+    for catching up after a reconnect. Otherwise returns the feed newest
+    first, paged backwards with ?before=<id>.
+    """
+    if 'after' in request.GET:
+        notifications, next_cursor, has_more = notifications_after(
+            request.user.id, parse_cursor(request.GET['after'])
+        )
+        page = {'next_cursor': next_cursor, 'has_more': has_more}
+    else:
+        notifications, next_cursor = notifications_before(
+            request.user.id, parse_cursor(request.GET.get('before'))
+        )
+        page = {'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+    return JsonResponse({
+        'notifications': [serialize_notification(n) for n in notifications],
+        'unread_count': request.user.unread_notification_count,
+        **page,
+    })
+
+
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """Mark the posted notification ids (or all notifications) as read."""
+    ids = request.POST.getlist('ids')
+    if ids:
+        ids = [cursor for cursor in map(parse_cursor, ids) if cursor is not None]
+        unread_count = mark_read(request.user, ids)
+    else:
+        unread_count = mark_read(request.user)
+    return JsonResponse({'unread_count': unread_count})
+
+
 def handler404(request, exception=None):
     """Custom 404 error handler."""
     return render(request, 'errors/404.html', status=404)